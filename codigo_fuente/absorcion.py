@@ -0,0 +1,196 @@
+"""Capas absorbentes (esponjas) en los lados de v2 y v3.
+
+Las paredes de v3 y los bordes libres de v2 reflejan las ondas, así que para
+estudiar un mar o una placa sin límites habría que agrandar el dominio y
+cortar antes de que vuelvan los rebotes. En una capa de `grosor` partículas
+junto a cada lado elegido, la velocidad se amortigua tras cada subpaso con
+v *= exp(-sigma h), donde sigma(d) = intensidad * (d / grosor)**orden crece
+desde casi 0 en el borde interior de la capa hasta `intensidad` en la orilla.
+El perfil gradual evita que la capa misma refleje; como el amortiguamiento se
+aplica aparte del integrador, sirve con todos.
+
+Sin `intensidad`, se elige con la fórmula habitual de las PML,
+(orden + 1) c ln(1 / REFLEXION_OBJETIVO) / (2 grosor), con c la mayor
+velocidad de grupo de la red en partículas por segundo.
+
+medir_reflexion() compara el interior de un dominio con capas contra el mismo
+trozo de un dominio tan grande que sus rebotes no alcanzan a volver: la
+diferencia, relativa a la onda que llega a las capas, es el coeficiente de
+reflexión.
+
+Uso:
+    motor.absorber(('izq', 'der'), grosor=40)
+    python absorcion.py v3 --grosor 10 20 40
+    python absorcion.py v2 --n 120 --grosor 10 20 --orden 2
+"""
+import argparse
+import math
+
+import numpy as np
+
+# Grosor de la capa (partículas) y exponente del perfil por defecto
+GROSOR = 20
+ORDEN = 3
+# Reflexión teórica de la capa con la que se elige la intensidad por defecto
+REFLEXION_OBJETIVO = 1e-3
+
+# Lados por número de ejes del campo: (eje, al final del eje)
+LADOS = {
+    1: {'izq': (0, False), 'der': (0, True)},
+    2: {'izq': (1, False), 'der': (1, True), 'abajo': (0, False), 'arriba': (0, True)},
+}
+
+
+def intensidad_pml(velocidad, grosor, orden=ORDEN, reflexion=REFLEXION_OBJETIVO):
+    """Intensidad en la orilla para que una onda de velocidad `velocidad` (partículas/s)
+    vuelva atenuada a `reflexion` tras cruzar la capa dos veces"""
+    return (orden + 1) * velocidad * math.log(1 / reflexion) / (2 * grosor)
+
+
+class Esponja:
+    """Capas absorbentes sobre un campo de forma `forma` ((n,) en v3, (n, n) en v2)"""
+
+    def __init__(self, forma, lados, grosor, intensidad, orden=ORDEN):
+        opciones = LADOS[len(forma)]
+        desconocidos = set(lados) - set(opciones)
+        if desconocidos:
+            raise ValueError(f"Lados desconocidos: {sorted(desconocidos)} (opciones: {tuple(opciones)})")
+        if not 1 <= grosor <= min(forma) // 2:
+            raise ValueError(f"El grosor debe estar entre 1 y {min(forma) // 2} partículas: {grosor}")
+        if intensidad < 0:
+            raise ValueError(f"La intensidad no puede ser negativa: {intensidad}")
+        self.forma = tuple(forma)
+        self.lados = tuple(dict.fromkeys(lados))
+        self.grosor = grosor
+        self.intensidad = intensidad
+        self.orden = orden
+        # Del borde interior de la capa hacia la orilla
+        self.sigma = intensidad * (np.arange(1, grosor + 1) / grosor)**orden
+        self.factores = {}
+
+    def ajustes(self):
+        """Argumentos que recrean la esponja sobre la misma forma (los guarda una instantánea)"""
+        return {'lados': list(self.lados), 'grosor': self.grosor,
+                'intensidad': float(self.intensidad), 'orden': self.orden}
+
+    def amortiguar(self, velocidades, h):
+        """v *= exp(-sigma h) en las capas; `velocidades` tiene forma `forma` (+ componentes)"""
+        if h not in self.factores:
+            self.factores = {h: np.exp(-self.sigma * h)}
+        factor = self.factores[h]
+        for lado in self.lados:
+            eje, al_final = LADOS[len(self.forma)][lado]
+            total = self.forma[eje]
+            indice = [slice(None)] * velocidades.ndim
+            indice[eje] = slice(total - self.grosor, total) if al_final else slice(0, self.grosor)
+            forma = [1] * velocidades.ndim
+            forma[eje] = self.grosor
+            velocidades[tuple(indice)] *= (factor if al_final else factor[::-1]).reshape(forma)
+
+
+def crear_esponja(forma, lados, grosor, intensidad, orden, velocidad):
+    """Esponja para los lados pedidos, o None si no hay ninguno"""
+    if not lados:
+        return None
+    if intensidad is None:
+        intensidad = intensidad_pml(velocidad, grosor, orden)
+    return Esponja(forma, lados, grosor, intensidad, orden)
+
+
+def dominio(modelo, n, espaciado=None, **argumentos):
+    """Motor de v2 o v3 de lado n; en v3, con el espaciado indicado en lugar del del tanque"""
+    from motores import MotorOndas, MotorPerfil
+
+    if modelo == 'v2':
+        return MotorOndas(n=n, **argumentos)
+    motor = MotorPerfil(n_particulas=n, **argumentos)
+    if espaciado is not None:
+        motor.espaciado = espaciado
+        motor.longitud = espaciado * (n - 1)
+        motor.inicializar_agua()
+    return motor
+
+
+def perturbar_nodo(motor, modelo, nodo):
+    """Pulso (v2) o gota (v3) de amplitud 1 centrados en el nodo indicado"""
+    if modelo == 'v2':
+        motor.aplicar_perturbacion('pulso', centro=(nodo * motor.espaciado,) * 2, amplitud=1.0)
+    else:
+        motor.aplicar_perturbacion('gota', posicion=nodo * motor.espaciado, amplitud=1.0,
+                                   ancho=1.0)
+
+
+def desplazamientos(motor, modelo, desde, hasta):
+    """Desplazamientos respecto al equilibrio de las partículas [desde, hasta) de cada eje"""
+    if modelo == 'v2':
+        n = motor.n
+        pos = motor.posiciones.reshape(n, n, 2)[desde:hasta, desde:hasta]
+        pos0 = motor.posiciones_iniciales.reshape(n, n, 2)[desde:hasta, desde:hasta]
+        return pos - pos0
+    return motor.y_particulas[desde:hasta] - motor.y_equilibrio[desde:hasta]
+
+
+def medir_reflexion(modelo, grosor, intensidad=None, orden=ORDEN, n=None, duracion=None):
+    """Coeficiente de reflexión de las capas en todos los lados de un dominio de lado n.
+
+    Devuelve (reflexión, duración simulada). Con grosor=0 mide las paredes o
+    bordes libres del motor, sin capas.
+    """
+    n = n or (80 if modelo == 'v2' else 200)
+    if 2 * grosor >= n:
+        raise ValueError(f"Con grosor {grosor} no queda interior en un dominio de {n} partículas")
+    pequeno = dominio(modelo, n)
+    velocidad = pequeno.velocidad_grupo_maxima()
+    # Lo que tarda la onda más rápida en ir a las capas, volver y cruzar el interior
+    duracion = duracion or 2 * n / velocidad
+    if grosor:
+        pequeno.absorber(tuple(LADOS[2 if modelo == 'v2' else 1]), grosor, intensidad, orden)
+    # Margen para que los rebotes del dominio grande no vuelvan (el integrador
+    # discreto puede propagar algo más rápido que la red continua en el tiempo)
+    margen = math.ceil(1.25 * velocidad * duracion / 2) + 1
+    grande = dominio(modelo, n + 2 * margen, pequeno.espaciado)
+    perturbar_nodo(pequeno, modelo, n // 2)
+    perturbar_nodo(grande, modelo, margen + n // 2)
+
+    reflejada = incidente = 0.0
+    for _ in range(math.ceil(duracion / pequeno.dt)):
+        pequeno.paso_simulacion()
+        grande.paso_simulacion()
+        interior = desplazamientos(pequeno, modelo, grosor, n - grosor)
+        referencia = desplazamientos(grande, modelo, margen + grosor, margen + n - grosor)
+        reflejada = max(reflejada, float(np.max(np.abs(interior - referencia))))
+        # La onda que llega al borde interior de las capas
+        incidente = max(incidente, float(np.max(np.abs(referencia[[0, -1]]))))
+        if modelo == 'v2':
+            incidente = max(incidente, float(np.max(np.abs(referencia[:, [0, -1]]))))
+    return (reflejada / incidente if incidente > 0 else 0.0), duracion
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('modelo', choices=('v2', 'v3'))
+    parser.add_argument('--grosor', type=int, nargs='+',
+                        help="grosores de capa a medir, en partículas (por defecto 5 10 20 en v2, "
+                             "10 20 40 en v3)")
+    parser.add_argument('--intensidad', type=float,
+                        help="amortiguamiento en la orilla (1/s); por defecto, el de la fórmula PML")
+    parser.add_argument('--orden', type=float, default=ORDEN, help="exponente del perfil")
+    parser.add_argument('--n', type=int, help="lado del dominio con capas (partículas)")
+    args = parser.parse_args()
+
+    try:
+        sin_capas, duracion = medir_reflexion(args.modelo, 0, n=args.n)
+        print(f"{args.modelo} · {duracion:.1f} s simulados")
+        print(f"{'grosor':>8} {'reflexión':>10}")
+        print(f"{'sin capa':>8} {sin_capas:10.2e}")
+        for grosor in args.grosor or ([5, 10, 20] if args.modelo == 'v2' else [10, 20, 40]):
+            reflexion, _ = medir_reflexion(args.modelo, grosor, args.intensidad, args.orden,
+                                           args.n)
+            print(f"{grosor:>8} {reflexion:10.2e}")
+    except ValueError as error:
+        parser.error(str(error))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Red de v2 que solo actualiza las teselas donde hay movimiento.
+
+La red se divide en teselas cuadradas de `tesela` x `tesela` partículas. Una
+tesela está activa si alguna de sus partículas se apartó de
+posiciones_iniciales o tiene velocidad por encima de `umbral`. En cada paso se
+actualizan las teselas activas y un halo de una tesela alrededor (por donde
+puede entrar el frente de onda); al terminar se vuelve a medir la actividad de
+las teselas recorridas, de modo que las que alcanzó el frente se encienden y
+las que quedaron en reposo se apagan. Así una gota en una red de 2000x2000
+cuesta en proporción al área perturbada y no a la red completa.
+
+Las teselas recorridas se agrupan en bandas rectangulares (filas de teselas
+con el mismo tramo de columnas) y sus fuerzas se calculan con una fila y una
+columna de halo, con las mismas operaciones que MotorOndas. Una partícula en
+reposo con vecinos en reposo no recibe fuerza y no se mueve, así que con
+umbral=0 los resultados son idénticos bit a bit a los de MotorOndas; con un
+umbral positivo se ignoran desplazamientos menores que él delante del frente.
+
+Uso:
+    motor = MotorOndasActivo(n=2000)
+    motor.aplicar_perturbacion('pulso')
+    for _ in range(500):
+        motor.paso_simulacion()
+    print(motor.fraccion_activa())
+"""
+import math
+
+import numpy as np
+
+from historial import CAPACIDAD_HISTORIAL
+from integradores import subpasos_estables
+from motores import MotorOndas, aceleraciones_red, parametros_como_float
+
+# Lado de las teselas, en partículas (32x32x2 float64 = 16 KiB por campo)
+TESELA = 32
+# Desplazamiento o velocidad por debajo del cual una tesela se considera en reposo
+UMBRAL = 1e-9
+
+
+def dilatar(activas, radio):
+    """Teselas activas más las que están a `radio` teselas o menos (incluye diagonales)"""
+    region = activas.copy()
+    for _ in range(radio):
+        extendida = region.copy()
+        extendida[1:] |= region[:-1]
+        extendida[:-1] |= region[1:]
+        region = extendida.copy()
+        region[:, 1:] |= extendida[:, :-1]
+        region[:, :-1] |= extendida[:, 1:]
+    return region
+
+
+def bandas(region):
+    """Rectángulos (fila0, fila1, col0, col1) de teselas que cubren la región.
+
+    Cada fila de teselas aporta el tramo entre su primera y su última tesela
+    marcada; las filas consecutivas con el mismo tramo se unen en una banda.
+    """
+    rectangulos = []
+    for fila in np.flatnonzero(region.any(axis=1)):
+        columnas = np.flatnonzero(region[fila])
+        col0, col1 = int(columnas[0]), int(columnas[-1]) + 1
+        if rectangulos and rectangulos[-1][1] == fila and rectangulos[-1][2:] == (col0, col1):
+            rectangulos[-1] = (rectangulos[-1][0], int(fila) + 1, col0, col1)
+        else:
+            rectangulos.append((int(fila), int(fila) + 1, col0, col1))
+    return rectangulos
+
+
+class MotorOndasActivo(MotorOndas):
+    """MotorOndas que solo actualiza las teselas activas y su halo.
+
+    Perturbaciones, fuente senoidal y sondas funcionan como en MotorOndas. Solo
+    admite el integrador 'euler': los demás evalúan las fuerzas varias veces
+    por subpaso y el frente avanzaría más de una partícula entre mediciones.
+    """
+    INTEGRADORES = ('euler',)
+
+    def __init__(self, n=50, tesela=TESELA, umbral=UMBRAL,
+                 capacidad_historial=CAPACIDAD_HISTORIAL, integrador='euler', dt=None,
+                 dtype='float64'):
+        if tesela < 2:
+            raise ValueError(f"La tesela debe tener al menos 2 partículas de lado: {tesela}")
+        if umbral < 0:
+            raise ValueError(f"El umbral no puede ser negativo: {umbral}")
+        super().__init__(n, 'vectorizado', capacidad_historial, integrador, dt, dtype)
+        self.tesela = tesela
+        self.umbral = umbral
+        lado = -(-n // tesela)
+        self.activas = np.zeros((lado, lado), dtype=bool)
+        # Arreglos sobre los que se midió la actividad; si se reemplazan (al
+        # reiniciar o restaurar una instantánea) se vuelve a medir toda la red
+        self.medidos = None
+
+    def aplicar_perturbacion(self, *args, **kwargs):
+        super().aplicar_perturbacion(*args, **kwargs)
+        self.medidos = None
+
+    def fraccion_activa(self):
+        """Fracción de las teselas que están activas"""
+        return float(self.activas.mean())
+
+    def medir_actividad(self, fila0, fila1, col0, col1):
+        """Recalcula las teselas activas del rectángulo de teselas indicado"""
+        n, t = self.n, self.tesela
+        filas = slice(fila0 * t, min(fila1 * t, n))
+        columnas = slice(col0 * t, min(col1 * t, n))
+        pos = self.posiciones.reshape(n, n, 2)[filas, columnas]
+        pos0 = self.posiciones_iniciales.reshape(n, n, 2)[filas, columnas]
+        vel = self.velocidades.reshape(n, n, 2)[filas, columnas]
+        amplitud = np.maximum(np.abs(pos - pos0).max(axis=-1), np.abs(vel).max(axis=-1))
+        amplitud = np.maximum.reduceat(amplitud, np.arange(0, amplitud.shape[0], t), axis=0)
+        amplitud = np.maximum.reduceat(amplitud, np.arange(0, amplitud.shape[1], t), axis=1)
+        self.activas[fila0:fila1, col0:col1] = amplitud > self.umbral
+
+    def aceleraciones_banda(self, fila0, fila1, col0, col1):
+        """Aceleraciones de las partículas de una banda, con una fila y columna de halo"""
+        n = self.n
+        desde_f, hasta_f = max(0, fila0 - 1), min(n, fila1 + 1)
+        desde_c, hasta_c = max(0, col0 - 1), min(n, col1 + 1)
+        pos = self.posiciones.reshape(n, n, 2)[desde_f:hasta_f, desde_c:hasta_c]
+        pos0 = self.posiciones_iniciales.reshape(n, n, 2)[desde_f:hasta_f, desde_c:hasta_c]
+        aceleraciones = aceleraciones_red(pos, pos0, self.k, self.masa)
+        return aceleraciones[fila0 - desde_f:fila1 - desde_f, col0 - desde_c:col1 - desde_c]
+
+    def paso_simulacion(self):
+        """Ejecuta un paso de la simulación sobre las teselas activas y su halo"""
+        if self.pausado:
+            return
+        parametros_como_float(self)
+        n, t = self.n, self.tesela
+        cronometro = self.cronometro
+        cronometro.iniciar_paso()
+        self.aplicar_fuente()
+        if self.medidos is None or self.medidos[0] is not self.posiciones \
+                or self.medidos[1] is not self.velocidades:
+            lado = self.activas.shape[0]
+            self.medir_actividad(0, lado, 0, lado)
+            self.medidos = (self.posiciones, self.velocidades)
+        if hasattr(self, 'fuente_activa') and self.fuente_activa:
+            fila, col = divmod(self.indice_centro, n)
+            self.activas[fila // t, col // t] = True
+        cronometro.vuelta('fuente')
+
+        # En cada subpaso el frente avanza una partícula: el halo debe cubrirlos todos
+        subpasos = subpasos_estables(self.dt, self.frecuencia_maxima(), self.integrador)
+        h = self.dt / subpasos
+        factor = (1 - self.damping) ** (1 / subpasos)  # Amortiguamiento
+        rectangulos = bandas(dilatar(self.activas, math.ceil(subpasos / t)))
+        celdas = [(f0 * t, min(f1 * t, n), c0 * t, min(c1 * t, n))
+                  for f0, f1, c0, c1 in rectangulos]
+        pos = self.posiciones.reshape(n, n, 2)
+        vel = self.velocidades.reshape(n, n, 2)
+        for _ in range(subpasos):
+            # Todas las fuerzas antes de mover nada: las bandas vecinas comparten bordes
+            aceleraciones = [self.aceleraciones_banda(*banda) for banda in celdas]
+            cronometro.vuelta('fuerzas')
+            for (fila0, fila1, col0, col1), aceleracion in zip(celdas, aceleraciones):
+                velocidades = vel[fila0:fila1, col0:col1]
+                velocidades += aceleracion * h
+                velocidades *= factor
+                pos[fila0:fila1, col0:col1] += velocidades * h
+            self.amortiguar_bordes(h)
+        for rectangulo in rectangulos:
+            self.medir_actividad(*rectangulo)
+
+        self.tiempo += self.dt
+        self.frame_count += 1
+        cronometro.vuelta('integracion')
+
+        self.registrar_sondas()
+        cronometro.vuelta('historial')
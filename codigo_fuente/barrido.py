@@ -0,0 +1,279 @@
+"""Barridos de parámetros en paralelo sobre los simuladores v2 y v3.
+
+Uso:
+    python barrido.py v2 --param k=10:50:9 --param damping=0,0.02,0.05 \\
+        --param perturbacion=pulso,senoidal,lineal --pasos 2000 --salida barrido_v2.csv
+    python barrido.py v3 --param tension_superficial=5:30:26 --param gravedad=1:20:20
+
+Cada --param es una lista separada por comas o un rango inicio:fin:cantidad
+(equiespaciado, extremos incluidos). Se simula el producto cartesiano de todos
+los valores; los parámetros no indicados toman el valor por defecto del motor.
+
+Los puntos se reparten en bloques entre los núcleos de la máquina y cada bloque
+se resuelve como un conjunto vectorizado (conjunto.py). Cada fila del CSV de
+salida resume un punto: amplitud máxima en el centro, frecuencia dominante
+(misma FFT que analizar_frecuencia) y tasa de decaimiento de la energía. Las
+filas se escriben a medida que terminan los bloques; si el proceso se cae,
+volver a lanzar el mismo comando retoma solo los puntos que faltan (un CSV de
+otra rejilla se rechaza en lugar de darse por hecho).
+"""
+import argparse
+import csv
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from conjunto import ConjuntoOndas, ConjuntoPerfil
+from motores import espectro_frecuencia
+
+# Parámetros que se pueden barrer en cada modelo, con su valor por defecto
+PARAMETROS = {
+    'v2': {'k': 25.0, 'damping': 0.02, 'perturbacion': 'pulso', 'amplitud': 3.0},
+    'v3': {'tension_superficial': 15.0, 'gravedad': 9.8, 'viscosidad': 0.05,
+           'perturbacion': 'gota', 'amplitud': 2.0},
+}
+
+# Perturbaciones válidas de cada modelo
+PERTURBACIONES = {
+    'v2': ('pulso', 'senoidal', 'lineal'),
+    'v3': ('gota', 'onda_senoidal', 'piston', 'tsunami'),
+}
+
+COLUMNAS_RESUMEN = ('amplitud_max_centro', 'frecuencia_dominante', 'tasa_decaimiento_energia')
+
+
+def interpretar_valores(texto):
+    """'a,b,c' -> lista; 'inicio:fin:cantidad' -> np.linspace; no numéricos quedan como texto"""
+    if texto.count(':') == 2:
+        inicio, fin, cantidad = texto.split(':')
+        return list(np.linspace(float(inicio), float(fin), int(cantidad)))
+    valores = []
+    for parte in texto.split(','):
+        try:
+            valores.append(float(parte))
+        except ValueError:
+            valores.append(parte.strip())
+    return valores
+
+
+def rejilla(modelo, valores):
+    """Lista ordenada de puntos (dict con todos los parámetros) del producto cartesiano"""
+    desconocidos = set(valores) - set(PARAMETROS[modelo])
+    if desconocidos:
+        raise ValueError(f"Parámetros desconocidos para {modelo}: {sorted(desconocidos)} "
+                         f"(opciones: {sorted(PARAMETROS[modelo])})")
+    completos = {nombre: valores.get(nombre, [defecto])
+                 for nombre, defecto in PARAMETROS[modelo].items()}
+    invalidas = set(completos['perturbacion']) - set(PERTURBACIONES[modelo])
+    if invalidas:
+        raise ValueError(f"Perturbaciones desconocidas para {modelo}: {sorted(invalidas)} "
+                         f"(opciones: {PERTURBACIONES[modelo]})")
+    nombres = list(completos)
+    return [dict(zip(nombres, combinacion))
+            for combinacion in itertools.product(*completos.values())]
+
+
+def resumir(amplitudes, energias, tiempos):
+    """Resúmenes por miembro a partir de series (B, T): un arreglo (B,) por columna.
+
+    Con menos de dos muestras no hay espectro ni pendiente: esas columnas quedan NaN.
+    """
+    if len(tiempos) < 2:
+        sin_dato = np.full(amplitudes.shape[0], np.nan)
+        return {
+            'amplitud_max_centro': (np.max(np.abs(amplitudes), axis=1) if len(tiempos)
+                                    else sin_dato),
+            'frecuencia_dominante': sin_dato,
+            'tasa_decaimiento_energia': sin_dato,
+        }
+    intervalo = tiempos[1] - tiempos[0]
+    freqs, espectro = espectro_frecuencia(amplitudes, intervalo)
+
+    # Pendiente de log(E) por mínimos cuadrados: E ~ exp(-tasa * t)
+    log_energia = np.log(np.maximum(energias, np.finfo(float).tiny))
+    t_centrado = tiempos - tiempos.mean()
+    pendiente = ((log_energia - log_energia.mean(axis=1, keepdims=True)) @ t_centrado
+                 / np.sum(t_centrado**2))
+
+    return {
+        'amplitud_max_centro': np.max(np.abs(amplitudes), axis=1),
+        'frecuencia_dominante': freqs[np.argmax(espectro, axis=1)],
+        'tasa_decaimiento_energia': -pendiente,
+    }
+
+
+def simular_bloque(modelo, puntos, pasos, n=None):
+    """Simula un bloque de (id, punto) y devuelve una fila de resumen por punto.
+
+    Los puntos con la misma perturbación se resuelven juntos en un conjunto.
+    """
+    filas = []
+    grupos = {}
+    for id_punto, punto in puntos:
+        grupos.setdefault(punto['perturbacion'], []).append((id_punto, punto))
+
+    for tipo, grupo in grupos.items():
+        fisicos = {nombre: [punto[nombre] for _, punto in grupo]
+                   for nombre in PARAMETROS[modelo] if nombre not in ('perturbacion', 'amplitud')}
+        amplitudes = [punto['amplitud'] for _, punto in grupo]
+
+        # El historial debe guardar la simulación completa
+        if modelo == 'v2':
+            conjunto = ConjuntoOndas(**fisicos, **({} if n is None else {'n': n}),
+                                     capacidad_historial=max(1, pasos // 2))
+        else:
+            conjunto = ConjuntoPerfil(**fisicos, **({} if n is None else {'n_particulas': n}),
+                                      capacidad_historial=max(1, pasos))
+        conjunto.aplicar_perturbacion(tipo, amplitud=amplitudes)
+        for _ in range(pasos):
+            conjunto.paso_simulacion()
+
+        series = conjunto.series()
+        serie_centro = series['amplitudes_centro' if modelo == 'v2' else 'alturas_tiempo']
+        resumen = resumir(serie_centro, series['energias'], series['tiempos'])
+        for b, (id_punto, punto) in enumerate(grupo):
+            fila = {'id': id_punto, **punto}
+            fila.update({columna: float(resumen[columna][b]) for columna in COLUMNAS_RESUMEN})
+            filas.append(fila)
+    return filas
+
+
+def mismo_valor(texto, valor):
+    """Si el texto leído del CSV corresponde al valor del punto de la rejilla"""
+    if isinstance(valor, str):
+        return texto == valor
+    try:
+        return float(texto) == float(valor)
+    except ValueError:
+        return False
+
+
+def preparar_salida(ruta, columnas, puntos):
+    """Abre el CSV para añadir filas y devuelve (archivo, ids ya completados).
+
+    Si el archivo existe se comprueba que sea del mismo barrido: mismas columnas y,
+    en cada fila, los mismos valores que el punto de `puntos` con ese id. Se
+    descarta una última línea a medio escribir por una caída.
+    """
+    completados = set()
+    if os.path.exists(ruta) and os.path.getsize(ruta) > 0:
+        with open(ruta, 'rb+') as archivo:
+            contenido = archivo.read()
+            if not contenido.endswith(b'\n'):
+                archivo.truncate(contenido.rfind(b'\n') + 1)
+        with open(ruta, newline='', encoding='utf-8') as archivo:
+            lector = csv.reader(archivo)
+            encabezado = next(lector, None)
+            if encabezado != list(columnas):
+                raise ValueError(f"{ruta} pertenece a otro barrido (columnas {encabezado})")
+            for fila in lector:
+                if len(fila) != len(columnas):
+                    continue
+                id_punto = int(fila[0])
+                punto = puntos[id_punto] if 0 <= id_punto < len(puntos) else None
+                if punto is None or not all(mismo_valor(texto, punto[nombre]) for nombre, texto
+                                            in zip(columnas[1:], fila[1:]) if nombre in punto):
+                    raise ValueError(f"{ruta} pertenece a otro barrido (el punto {id_punto} "
+                                     f"no coincide con la rejilla pedida)")
+                completados.add(id_punto)
+        return open(ruta, 'a', newline='', encoding='utf-8'), completados
+
+    archivo = open(ruta, 'w', newline='', encoding='utf-8')
+    csv.writer(archivo).writerow(columnas)
+    return archivo, completados
+
+
+def ejecutar_barrido(modelo, valores, pasos, salida, n=None, procesos=None,
+                     tamano_bloque=32, informe=sys.stderr):
+    """Corre todos los puntos que falten en `salida` repartidos en un pool de procesos"""
+    puntos = rejilla(modelo, valores)
+    # v2 registra el centro cada 2 pasos y v3 en cada paso
+    muestras = pasos // 2 if modelo == 'v2' else pasos
+    if muestras < 2:
+        raise ValueError(f"Con {pasos} pasos {modelo} registra {muestras} muestras; "
+                         f"el resumen necesita al menos 2")
+    columnas = ('id', *PARAMETROS[modelo], *COLUMNAS_RESUMEN)
+    archivo, completados = preparar_salida(salida, columnas, puntos)
+    pendientes = [(i, punto) for i, punto in enumerate(puntos) if i not in completados]
+    bloques = (pendientes[i:i + tamano_bloque] for i in range(0, len(pendientes), tamano_bloque))
+    procesos = procesos or os.cpu_count() or 1
+
+    total = len(puntos)
+    hechos = len(puntos) - len(pendientes)
+    nuevos = 0
+    inicio = ultimo_informe = time.perf_counter()
+    if informe and hechos:
+        print(f"Retomando: {hechos}/{total} puntos ya estaban en {salida}", file=informe)
+
+    escritor = csv.DictWriter(archivo, fieldnames=columnas)
+    with archivo, ProcessPoolExecutor(max_workers=procesos) as pool:
+        en_curso = set()
+        agotados = False
+        while True:
+            # Mantener solo unos pocos bloques por proceso en vuelo
+            while not agotados and len(en_curso) < 2 * procesos:
+                bloque = next(bloques, None)
+                if bloque is None:
+                    agotados = True
+                else:
+                    en_curso.add(pool.submit(simular_bloque, modelo, bloque, pasos, n))
+            if not en_curso:
+                break
+
+            listos, en_curso = wait(en_curso, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                filas = futuro.result()
+                escritor.writerows(filas)
+                nuevos += len(filas)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+
+            ahora = time.perf_counter()
+            if informe and (ahora - ultimo_informe >= 1.0 or not en_curso):
+                ultimo_informe = ahora
+                velocidad = nuevos / (ahora - inicio)
+                faltan = (len(pendientes) - nuevos) / velocidad if velocidad > 0 else float('inf')
+                print(f"{hechos + nuevos}/{total} puntos ({100 * (hechos + nuevos) / total:.1f}%), "
+                      f"{velocidad:.1f} puntos/s, faltan ~{faltan:.0f}s", file=informe)
+    return salida
+
+
+def cargar_resultados(ruta):
+    """Lee la tabla de un barrido como arreglo estructurado ordenado por id"""
+    tabla = np.genfromtxt(ruta, delimiter=',', names=True, dtype=None, encoding='utf-8')
+    return np.sort(np.atleast_1d(tabla), order='id')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('modelo', choices=sorted(PARAMETROS))
+    parser.add_argument('--param', action='append', default=[], metavar='NOMBRE=VALORES',
+                        help="parámetro a barrer: lista a,b,c o rango inicio:fin:cantidad")
+    parser.add_argument('--pasos', type=int, default=2000, help="pasos por simulación")
+    parser.add_argument('--n', type=int, help="lado de la red (v2) o n_particulas (v3)")
+    parser.add_argument('--procesos', type=int, help="procesos del pool (por defecto, todos los núcleos)")
+    parser.add_argument('--bloque', type=int, default=32, help="puntos por tarea enviada al pool")
+    parser.add_argument('--salida', default='barrido.csv', help="CSV de resultados (se retoma si existe)")
+    args = parser.parse_args()
+
+    valores = {}
+    for parametro in args.param:
+        nombre, _, texto = parametro.partition('=')
+        if not texto:
+            parser.error(f"--param espera NOMBRE=VALORES, no {parametro!r}")
+        valores[nombre] = interpretar_valores(texto)
+
+    try:
+        ejecutar_barrido(args.modelo, valores, args.pasos, args.salida, args.n,
+                         args.procesos, args.bloque)
+    except ValueError as error:
+        parser.error(str(error))
+
+
+if __name__ == "__main__":
+    main()
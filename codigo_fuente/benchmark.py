@@ -0,0 +1,381 @@
+"""Mediciones de rendimiento de los simuladores.
+
+Uso:
+    python benchmark.py                     # fuerzas de v3, n_particulas 80 ... 1e6
+    python benchmark.py --tamanos 80 1000   # tamaños a medir
+    python benchmark.py --max-bucle 10000   # limitar el motor 'bucle' (es lento)
+    python benchmark.py --render            # cuadros/s de v2 y v3, blit frente a completo
+    python benchmark.py --suite --salida base.json              # suite completa a JSON
+    python benchmark.py --suite --salida hoy.json --base base.json  # y compararla
+    python benchmark.py --particion --n 4000   # v2 repartida entre 1, 2, 4... procesos
+    python benchmark.py --actividad --n 2000   # v2 con solo las teselas activas (gota)
+
+La suite mide, para v1, v2 y v3 y cada combinación de motor e integrador, los
+pasos por segundo de paso_simulacion, el tiempo de aplicar_perturbacion y el
+pico de memoria (tracemalloc, que también cuenta los arreglos de numpy); además
+el costo de analizar_frecuencia y actualizar_info y los cuadros por segundo de
+las ventanas. Con --base, un caso que empeora más que --tolerancia se informa
+como regresión y el programa termina con código 1.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import implicito
+from integradores import INTEGRADORES
+from motores import MotorOndas, MotorPerfil, MotorResortes
+
+TAMANOS_PERFIL = [80, 1_000, 10_000, 100_000, 1_000_000]
+TAMANOS_RED = [20, 50, 100, 200, 500, 1_000, 2_000]
+
+# Variantes lentas: solo se miden hasta este número de partículas
+LIMITE_PARTICULAS = {'bucle': 20_000, 'newmark': 1_000_000, 'euler_implicito': 1_000_000}
+
+# Métricas donde un valor mayor es mejor (en las demás, menor es mejor)
+MAYOR_ES_MEJOR = ('pasos_por_s', 'cuadros_por_s')
+
+VERSION_SUITE = 1
+
+
+def medir(funcion, tiempo_minimo=0.2, repeticiones_max=1000):
+    """Devuelve el tiempo medio por llamada, repitiendo hasta acumular tiempo_minimo"""
+    repeticiones = 0
+    inicio = time.perf_counter()
+    while True:
+        funcion()
+        repeticiones += 1
+        transcurrido = time.perf_counter() - inicio
+        if transcurrido >= tiempo_minimo or repeticiones >= repeticiones_max:
+            return transcurrido / repeticiones
+
+
+def medir_minimo(funcion, tiempo_minimo=0.2, rondas=5):
+    """Como medir, pero el mejor de varias rondas: lo que menos sufre el ruido de
+    otros procesos, para comparar corridas entre sí"""
+    return min(medir(funcion, tiempo_minimo / rondas) for _ in range(rondas))
+
+
+def benchmark_fuerzas_perfil(tamanos=TAMANOS_PERFIL, max_bucle=1_000_000):
+    """Compara calcular_fuerzas de v3 con ambos motores para cada n_particulas"""
+    resultados = []
+    for n in tamanos:
+        fila = {'n_particulas': n}
+        for motor in MotorPerfil.MOTORES:
+            if motor == 'bucle' and n > max_bucle:
+                fila[motor] = None
+                continue
+            simulador = MotorPerfil(n_particulas=n, motor=motor)
+            simulador.aplicar_perturbacion('gota')
+            fila[motor] = medir(simulador.calcular_fuerzas)
+        resultados.append(fila)
+    return resultados
+
+
+def benchmark_render(cuadros=200):
+    """Cuadros por segundo de las ventanas de v2 y v3 en ambos modos de render.
+
+    Se dibuja sobre el backend Agg (sin ventana), así que mide el costo de
+    matplotlib y de la simulación, no el de mostrar los píxeles en pantalla.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    from render import GestorBlit
+    from v2 import SimuladorOndas
+    from v3 import SimuladorOndasPerfil
+
+    resultados = []
+    for nombre, clase, perturbacion in (('v2', SimuladorOndas, 'pulso'),
+                                        ('v3', SimuladorOndasPerfil, 'gota')):
+        fila = {'modelo': nombre}
+        for modo in clase.MODOS_RENDER:
+            simulador = clase(modo_render=modo, pasos_por_cuadro=1)
+            simulador.aplicar_perturbacion(perturbacion)
+            simulador.fig.canvas.draw()
+            if modo == 'blit':
+                simulador.gestor_blit = GestorBlit(simulador.fig.canvas,
+                                                   simulador.artistas_animados())
+            inicio = time.perf_counter()
+            for _ in range(cuadros):
+                simulador.cuadro_animacion()
+            fila[modo] = cuadros / (time.perf_counter() - inicio)
+            if modo == 'blit':
+                fila['dibujados_completos'] = simulador.gestor_blit.dibujados_completos
+            plt.close(simulador.fig)
+        resultados.append(fila)
+    return resultados
+
+
+def benchmark_particion(n=4000, pasos=20, procesos=None):
+    """Pasos/s de MotorOndas y de MotorOndasParticionado con 1, 2, 4... procesos.
+
+    La aceleración se calcula respecto al motor de un solo proceso.
+    """
+    from particion import MotorOndasParticionado
+
+    procesos = procesos or os.cpu_count() or 1
+    cantidades = sorted({2**i for i in range(procesos.bit_length()) if 2**i <= procesos} | {procesos})
+
+    simulador = MotorOndas(n=n, capacidad_historial=pasos)
+    simulador.aplicar_perturbacion('pulso')
+    base = pasos / medir_minimo(lambda: [simulador.paso_simulacion() for _ in range(pasos)],
+                                tiempo_minimo=0, rondas=3)
+    del simulador
+    resultados = [{'procesos': 'MotorOndas', 'pasos_por_s': base, 'aceleracion': 1.0}]
+    for cantidad in cantidades:
+        with MotorOndasParticionado(n=n, procesos=cantidad, capacidad_historial=pasos) as motor:
+            motor.aplicar_perturbacion('pulso')
+            motor.avanzar(1)
+            pasos_por_s = pasos / medir_minimo(lambda: motor.avanzar(pasos), tiempo_minimo=0,
+                                               rondas=3)
+        resultados.append({'procesos': cantidad, 'pasos_por_s': pasos_por_s,
+                           'aceleracion': pasos_por_s / base})
+    return resultados
+
+
+def variantes(clase):
+    """(motor, integrador) a medir: cada motor con euler y el motor por defecto
+    con cada integrador"""
+    motor_defecto = clase.MOTORES[0]
+    integradores = getattr(clase, 'INTEGRADORES', INTEGRADORES)
+    if implicito.sparse is None:
+        integradores = tuple(i for i in integradores if i not in implicito.IMPLICITOS)
+    return ([(motor, 'euler') for motor in clase.MOTORES]
+            + [(motor_defecto, integrador) for integrador in integradores if integrador != 'euler'])
+
+
+def medir_caso(clase, argumentos, perturbar, tiempo_minimo=0.2):
+    """Pasos por segundo, tiempo de perturbación y pico de memoria de un motor"""
+    tracemalloc.start()
+    simulador = clase(capacidad_historial=1_024, **argumentos)
+    perturbar(simulador)
+    simulador.paso_simulacion()  # las inicializaciones perezosas quedan fuera
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'n_particulas': simulador.n_particulas,
+        'pasos_por_s': 1 / medir_minimo(simulador.paso_simulacion, tiempo_minimo),
+        'perturbacion_ms': medir_minimo(lambda: perturbar(simulador), tiempo_minimo) * 1e3,
+        'memoria_pico_mb': pico / 2**20,
+    }
+
+
+def suite_pasos(tamanos_red=TAMANOS_RED, tamanos_perfil=TAMANOS_PERFIL, tiempo_minimo=0.2):
+    """Casos 'modelo/motor/integrador/n=...' de los tres motores"""
+    modelos = (
+        ('v1', MotorResortes, 'n', tamanos_red, lambda s: s.aplicar_perturbacion(5.0)),
+        ('v2', MotorOndas, 'n', tamanos_red, lambda s: s.aplicar_perturbacion('pulso')),
+        ('v3', MotorPerfil, 'n_particulas', tamanos_perfil, lambda s: s.aplicar_perturbacion('gota')),
+    )
+    casos = {}
+    for modelo, clase, tamano, tamanos, perturbar in modelos:
+        for motor, integrador in variantes(clase):
+            for n in tamanos:
+                particulas = n if tamano == 'n_particulas' else n * n
+                limites = [LIMITE_PARTICULAS[v] for v in (motor, integrador) if v in LIMITE_PARTICULAS]
+                if limites and particulas > min(limites):
+                    continue
+                argumentos = {tamano: n, 'motor': motor, 'integrador': integrador}
+                caso = f"{modelo}/{motor}/{integrador}/{tamano}={n}"
+                casos[caso] = medir_caso(clase, argumentos, perturbar, tiempo_minimo)
+                print(f"  {caso}: {casos[caso]['pasos_por_s']:.1f} pasos/s", file=sys.stderr)
+    return casos
+
+
+def suite_ventanas(cuadros=50, tiempo_minimo=0.2):
+    """Costo del análisis y cuadros por segundo de las ventanas de v2 y v3"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    from v2 import SimuladorOndas
+    from v3 import SimuladorOndasPerfil
+
+    casos = {}
+    for modelo, clase, perturbacion, serie in (('v2', SimuladorOndas, 'pulso', 'amplitudes_centro'),
+                                               ('v3', SimuladorOndasPerfil, 'gota', 'alturas_tiempo')):
+        simulador = clase(pasos_por_cuadro=1)
+        simulador.aplicar_perturbacion(perturbacion)
+        for _ in range(512):
+            simulador.paso_simulacion()
+        historial = getattr(simulador, serie)
+
+        def analizar(funcion):
+            # Cada llamada procesa 64 muestras nuevas, como tras unos cuadros
+            simulador.muestras_analizadas = historial.total - 64
+            funcion()
+
+        fila = {'actualizar_info_ms': medir_minimo(lambda: analizar(simulador.actualizar_info),
+                                            tiempo_minimo) * 1e3}
+        if hasattr(simulador, 'analizar_frecuencia'):
+            fila['analizar_frecuencia_ms'] = medir_minimo(lambda: analizar(simulador.analizar_frecuencia),
+                                                   tiempo_minimo) * 1e3
+        casos[f"{modelo}/analisis"] = fila
+        plt.close(simulador.fig)
+
+    for fila in benchmark_render(cuadros):
+        for modo in ('blit', 'completo'):
+            casos[f"{fila['modelo']}/ventana/{modo}"] = {'cuadros_por_s': fila[modo]}
+    return casos
+
+
+def ejecutar_suite(tamanos_red=TAMANOS_RED, tamanos_perfil=TAMANOS_PERFIL, tiempo_minimo=0.2):
+    """Resultados completos de la suite, listos para json.dump"""
+    casos = suite_pasos(tamanos_red, tamanos_perfil, tiempo_minimo)
+    casos.update(suite_ventanas(tiempo_minimo=tiempo_minimo))
+    return {
+        'version': VERSION_SUITE,
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'entorno': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'plataforma': platform.platform(),
+            'procesador': platform.processor(),
+            'nucleos': os.cpu_count(),
+        },
+        'casos': casos,
+    }
+
+
+def comparar(resultados, base, tolerancia=0.2):
+    """Lista de (caso, métrica, base, actual, cambio) que empeoraron más que `tolerancia`.
+
+    `cambio` es la fracción en que empeoró (0.3 = 30 % peor); los casos que
+    solo están en uno de los dos archivos se ignoran.
+    """
+    regresiones = []
+    for caso, metricas in resultados['casos'].items():
+        anteriores = base['casos'].get(caso, {})
+        for metrica, actual in metricas.items():
+            anterior = anteriores.get(metrica)
+            if metrica == 'n_particulas' or anterior is None or anterior <= 0 or actual <= 0:
+                continue
+            if metrica in MAYOR_ES_MEJOR:
+                cambio = anterior / actual - 1
+            else:
+                cambio = actual / anterior - 1
+            if cambio > tolerancia:
+                regresiones.append((caso, metrica, anterior, actual, cambio))
+    return regresiones
+
+
+def imprimir_tabla(resultados):
+    """Imprime los tiempos por llamada y la aceleración del motor vectorizado"""
+    print(f"{'n_particulas':>12} {'bucle (ms)':>12} {'vectorizado (ms)':>17} {'aceleración':>12} "
+          f"{'hilos (ms)':>11}")
+    for fila in resultados:
+        bucle = fila['bucle']
+        vectorizado = fila['vectorizado']
+        texto_bucle = f"{bucle * 1e3:12.3f}" if bucle is not None else f"{'-':>12}"
+        texto_acel = f"{bucle / vectorizado:11.0f}x" if bucle is not None else f"{'-':>12}"
+        print(f"{fila['n_particulas']:>12} {texto_bucle} {vectorizado * 1e3:17.3f} {texto_acel} "
+              f"{fila['hilos'] * 1e3:11.3f}")
+
+
+def benchmark_actividad(n=2000, tramos=(1, 250, 500, 1000), pasos=20):
+    """ms por paso de MotorOndasActivo tras una gota, según cuánto avanzó el frente.
+
+    Se compara con MotorOndas sobre la misma red, cuyo costo no depende del frente.
+    """
+    from actividad import MotorOndasActivo
+
+    simulador = MotorOndas(n=n, capacidad_historial=pasos)
+    simulador.aplicar_perturbacion('pulso')
+    base = medir_minimo(lambda: [simulador.paso_simulacion() for _ in range(pasos)],
+                        tiempo_minimo=0, rondas=1) / pasos
+    del simulador
+    resultados = []
+    motor = MotorOndasActivo(n=n)
+    motor.aplicar_perturbacion('pulso')
+    motor.paso_simulacion()  # El primer paso mide la actividad de toda la red
+    for paso in tramos:
+        while motor.frame_count < paso:
+            motor.paso_simulacion()
+        inicio = time.perf_counter()
+        for _ in range(pasos):
+            motor.paso_simulacion()
+        segundos = (time.perf_counter() - inicio) / pasos
+        resultados.append({'paso': paso, 'fraccion_activa': motor.fraccion_activa(),
+                           'ms_por_paso': segundos * 1e3, 'ms_completo': base * 1e3,
+                           'aceleracion': base / segundos})
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanos', type=int, nargs='+', default=TAMANOS_PERFIL,
+                        help="valores de n_particulas a medir")
+    parser.add_argument('--max-bucle', type=int, default=1_000_000,
+                        help="n_particulas máximo para el motor 'bucle'")
+    parser.add_argument('--render', action='store_true',
+                        help="medir los cuadros por segundo de las ventanas de v2 y v3")
+    parser.add_argument('--suite', action='store_true',
+                        help="suite completa de v1, v2 y v3 (ver --salida y --base)")
+    parser.add_argument('--particion', action='store_true',
+                        help="v2 repartida en franjas entre procesos (ver particion.py)")
+    parser.add_argument('--actividad', action='store_true',
+                        help="v2 actualizando solo las teselas activas tras una gota (ver actividad.py)")
+    parser.add_argument('--n', type=int, default=4000, help="particion, actividad: lado de la red")
+    parser.add_argument('--procesos', type=int, help="particion: máximo de procesos")
+    parser.add_argument('--tamanos-red', type=int, nargs='+', default=TAMANOS_RED,
+                        help="suite: lados n de la red de v1 y v2")
+    parser.add_argument('--salida', default='benchmark.json', help="suite: archivo de resultados")
+    parser.add_argument('--base', help="suite: resultados anteriores con los que comparar")
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help="suite: empeoramiento tolerado antes de avisar (0.2 = 20 %%)")
+    args = parser.parse_args()
+
+    if args.suite:
+        resultados = ejecutar_suite(args.tamanos_red, args.tamanos)
+        with open(args.salida, 'w') as archivo:
+            json.dump(resultados, archivo, indent=2)
+        print(f"{len(resultados['casos'])} casos -> {args.salida}")
+        if args.base:
+            with open(args.base) as archivo:
+                regresiones = comparar(resultados, json.load(archivo), args.tolerancia)
+            for caso, metrica, anterior, actual, cambio in regresiones:
+                print(f"REGRESIÓN {caso} {metrica}: {anterior:.4g} -> {actual:.4g} "
+                      f"({cambio:.0%} peor)")
+            if regresiones:
+                sys.exit(1)
+            print(f"Sin regresiones respecto a {args.base}")
+        return
+
+    if args.particion:
+        print(f"v2 · red de {args.n}x{args.n}")
+        print(f"{'procesos':>10} {'pasos/s':>10} {'aceleración':>12}")
+        for fila in benchmark_particion(args.n, procesos=args.procesos):
+            print(f"{fila['procesos']:>10} {fila['pasos_por_s']:10.2f} {fila['aceleracion']:11.2f}x")
+        return
+
+    if args.actividad:
+        print(f"v2 · red de {args.n}x{args.n}, gota central")
+        print(f"{'paso':>6} {'teselas activas':>16} {'ms/paso':>9} {'completo':>9} {'aceleración':>12}")
+        for fila in benchmark_actividad(args.n):
+            print(f"{fila['paso']:>6} {fila['fraccion_activa']:16.2%} {fila['ms_por_paso']:9.2f} "
+                  f"{fila['ms_completo']:9.2f} {fila['aceleracion']:11.1f}x")
+        return
+
+    if args.render:
+        print(f"{'modelo':>6} {'completo (cuadros/s)':>21} {'blit (cuadros/s)':>17} "
+              f"{'mejora':>8} {'redibujados':>12}")
+        for fila in benchmark_render():
+            print(f"{fila['modelo']:>6} {fila['completo']:21.1f} {fila['blit']:17.1f} "
+                  f"{fila['blit'] / fila['completo']:7.1f}x {fila['dibujados_completos']:>12}")
+        return
+
+    print("v3 · MotorPerfil.calcular_fuerzas")
+    imprimir_tabla(benchmark_fuerzas_perfil(args.tamanos, args.max_bucle))
+
+
+if __name__ == "__main__":
+    main()
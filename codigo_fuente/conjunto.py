@@ -0,0 +1,328 @@
+"""Conjuntos de simulaciones independientes que avanzan en un mismo paso vectorizado.
+
+Cada conjunto apila B sistemas a lo largo de un primer eje "de miembro". Los
+parámetros físicos que se quieren barrer son arreglos de largo B, y el resto de
+la configuración (tamaño, espaciado, dt) es común y se toma de los motores de
+motores.py. Así, 1000 tanques pequeños cuestan lo mismo que un solo tanque
+1000 veces más largo.
+
+Ejemplo:
+    parametros = combinar(k=[10, 25, 40], damping=[0.0, 0.02, 0.05])
+    conjunto = ConjuntoOndas(**parametros, n=30)
+    conjunto.aplicar_perturbacion('pulso')
+    for _ in range(1000):
+        conjunto.paso_simulacion()
+    series = conjunto.series()   # series['amplitudes_centro'].shape == (9, 500)
+"""
+import itertools
+
+import numpy as np
+
+from historial import CAPACIDAD_HISTORIAL, BufferCircular
+from motores import MotorOndas, MotorPerfil, aceleraciones_red, fuerzas_perfil
+
+
+def combinar(**valores):
+    """Producto cartesiano de listas de parámetros, como arreglos planos de igual largo"""
+    nombres = list(valores)
+    filas = list(itertools.product(*(np.atleast_1d(valores[nombre]) for nombre in nombres)))
+    return {nombre: np.array([fila[i] for fila in filas], dtype=float)
+            for i, nombre in enumerate(nombres)}
+
+
+def parametros_por_miembro(**valores):
+    """Convierte escalares o arreglos a arreglos 1D de largo B con broadcasting"""
+    arreglos = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=float))
+                                     for v in valores.values()))
+    if arreglos[0].ndim != 1:
+        raise ValueError("Los parámetros por miembro deben ser escalares o arreglos 1D")
+    return [arreglo.copy() for arreglo in arreglos]
+
+
+class ConjuntoOndas:
+    """B redes lineales de v2 con k y damping propios de cada miembro"""
+
+    def __init__(self, k, damping, n=50, capacidad_historial=CAPACIDAD_HISTORIAL):
+        self.k, self.damping = parametros_por_miembro(k=k, damping=damping)
+        self.n_miembros = len(self.k)
+
+        # Geometría y parámetros comunes, iguales a los de un MotorOndas
+        plantilla = MotorOndas(n=n, capacidad_historial=1)
+        self.n = plantilla.n
+        self.espaciado = plantilla.espaciado
+        self.masa = plantilla.masa
+        self.dt = plantilla.dt
+        self.n_particulas = plantilla.n_particulas
+        self.posiciones_iniciales = plantilla.posiciones_iniciales
+        self.indice_centro = plantilla.indice_centro
+        self.indice_borde = plantilla.indice_borde
+
+        # Datos para análisis: una muestra (B,) por entrada
+        self.amplitudes_centro = BufferCircular(capacidad_historial, forma=(self.n_miembros,))
+        self.amplitudes_borde = BufferCircular(capacidad_historial, forma=(self.n_miembros,))
+        self.energias = BufferCircular(capacidad_historial, forma=(self.n_miembros,))
+        self.tiempos = BufferCircular(capacidad_historial)
+
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Devuelve todos los miembros al equilibrio y borra el historial"""
+        forma = (self.n_miembros, self.n_particulas, 2)
+        self.posiciones = np.broadcast_to(self.posiciones_iniciales, forma).copy()
+        self.velocidades = np.zeros(forma)
+        self.tiempo = 0
+        self.frame_count = 0
+
+        # Fuente senoidal de cada miembro
+        self.fuente_activa = np.zeros(self.n_miembros, dtype=bool)
+        self.frecuencia_fuente = np.full(self.n_miembros, 0.5)
+        self.amplitud_fuente = np.zeros(self.n_miembros)
+
+        self.amplitudes_centro.clear()
+        self.amplitudes_borde.clear()
+        self.energias.clear()
+        self.tiempos.clear()
+
+    def seleccionar(self, miembros):
+        """Índices enteros de los miembros seleccionados (todos si es None)"""
+        if miembros is None:
+            return np.arange(self.n_miembros)
+        return np.arange(self.n_miembros)[miembros]
+
+    def aplicar_perturbacion(self, tipo='pulso', centro=None, amplitud=3.0, ancho=1.5,
+                             miembros=None):
+        """Aplica una perturbación de MotorOndas a los miembros elegidos.
+
+        amplitud puede ser un escalar o un arreglo con un valor por miembro elegido.
+        """
+        sel = self.seleccionar(miembros)
+        amplitud = np.broadcast_to(np.asarray(amplitud, dtype=float), sel.shape)
+        if centro is None:
+            centro = self.posiciones_iniciales[self.indice_centro]
+
+        if tipo == 'pulso':
+            # Perturbación circular (pulso)
+            dist = np.linalg.norm(self.posiciones_iniciales - centro, axis=1)
+            patron = np.where(dist < ancho, np.exp(-dist**2 / (ancho/2)**2), 0.0)
+            self.velocidades[sel, :, 1] += amplitud[:, None] * patron
+
+        elif tipo == 'senoidal':
+            # Fuente senoidal continua en el centro
+            self.fuente_activa[sel] = True
+            self.frecuencia_fuente[sel] = 0.5
+            self.amplitud_fuente[sel] = amplitud
+
+        elif tipo == 'lineal':
+            # Perturbación lineal (frente de onda)
+            fila_centro = int(centro[1] / self.espaciado)
+            distancia_filas = np.abs(np.arange(self.n_particulas) // self.n - fila_centro)
+            patron = np.where(distancia_filas <= 2, np.exp(-distancia_filas), 0.0)
+            self.velocidades[sel, :, 1] += amplitud[:, None] * patron
+
+    def calcular_aceleraciones(self):
+        """Estencil de MotorOndas (aceleraciones_red) con k por miembro"""
+        n = self.n
+        pos = self.posiciones.reshape(self.n_miembros, n, n, 2)
+        pos0 = self.posiciones_iniciales.reshape(n, n, 2)
+        aceleraciones = aceleraciones_red(pos, pos0, self.k[:, None, None, None], self.masa)
+        return aceleraciones.reshape(self.posiciones.shape)
+
+    def calcular_energia(self):
+        """Energía cinética más elástica de cada miembro, arreglo (B,)"""
+        n = self.n
+        pos = self.posiciones.reshape(self.n_miembros, n, n, 2)
+        pos0 = self.posiciones_iniciales.reshape(n, n, 2)
+        def_h = (pos[:, :, 1:] - pos[:, :, :-1]) - (pos0[:, 1:] - pos0[:, :-1])
+        def_v = (pos[:, 1:] - pos[:, :-1]) - (pos0[1:] - pos0[:-1])
+        elastica = np.sum(def_h**2, axis=(1, 2, 3)) + np.sum(def_v**2, axis=(1, 2, 3))
+        cinetica = np.sum(self.velocidades**2, axis=(1, 2))
+        return 0.5 * self.masa * cinetica + 0.5 * self.k * elastica
+
+    def paso_simulacion(self):
+        """Avanza todos los miembros un paso dt"""
+        aceleraciones = self.calcular_aceleraciones()
+
+        # Fuente senoidal en los miembros que la tengan activa
+        if self.fuente_activa.any():
+            fase = 2 * np.pi * self.frecuencia_fuente * self.tiempo
+            fuerza_fuente = np.where(self.fuente_activa, self.amplitud_fuente * np.sin(fase), 0.0)
+            self.velocidades[:, self.indice_centro, 1] += fuerza_fuente * self.dt
+
+        # Integración temporal
+        self.velocidades += aceleraciones * self.dt
+        self.velocidades *= (1 - self.damping)[:, None, None]  # Amortiguamiento
+        self.posiciones += self.velocidades * self.dt
+
+        self.tiempo += self.dt
+        self.frame_count += 1
+
+        # Guardar datos para análisis
+        if self.frame_count % 2 == 0:  # Cada 2 frames
+            self.amplitudes_centro.append(self.posiciones[:, self.indice_centro, 1]
+                                          - self.posiciones_iniciales[self.indice_centro, 1])
+            self.amplitudes_borde.append(self.posiciones[:, self.indice_borde, 1]
+                                         - self.posiciones_iniciales[self.indice_borde, 1])
+            self.energias.append(self.calcular_energia())
+            self.tiempos.append(self.tiempo)
+
+    def series(self):
+        """Series registradas: 'tiempos' (T,) y una (B, T) por magnitud"""
+        return {
+            'tiempos': np.array(self.tiempos),
+            'amplitudes_centro': apilar(self.amplitudes_centro),
+            'amplitudes_borde': apilar(self.amplitudes_borde),
+            'energias': apilar(self.energias),
+        }
+
+
+class ConjuntoPerfil:
+    """B tanques de v3 con tensión superficial, gravedad y viscosidad propias"""
+
+    def __init__(self, tension_superficial, gravedad, viscosidad, n_particulas=80,
+                 capacidad_historial=CAPACIDAD_HISTORIAL):
+        (self.tension_superficial, self.gravedad,
+         self.viscosidad) = parametros_por_miembro(tension_superficial=tension_superficial,
+                                                   gravedad=gravedad, viscosidad=viscosidad)
+        self.n_miembros = len(self.tension_superficial)
+
+        # Geometría y parámetros comunes, iguales a los de un MotorPerfil
+        plantilla = MotorPerfil(n_particulas=n_particulas, capacidad_historial=1)
+        self.n_particulas = plantilla.n_particulas
+        self.longitud = plantilla.longitud
+        self.altura_equilibrio = plantilla.altura_equilibrio
+        self.espaciado = plantilla.espaciado
+        self.densidad = plantilla.densidad
+        self.dt = plantilla.dt
+        self.x_particulas = plantilla.x_particulas
+        self.y_equilibrio = plantilla.y_equilibrio
+        self.pared_izq = plantilla.pared_izq
+        self.pared_der = plantilla.pared_der
+
+        # Datos para análisis: una muestra (B,) por entrada
+        self.alturas_tiempo = BufferCircular(capacidad_historial, forma=(self.n_miembros,))
+        self.energias = BufferCircular(capacidad_historial, forma=(self.n_miembros,))
+        self.tiempos = BufferCircular(capacidad_historial)
+
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Devuelve todos los miembros al equilibrio y borra el historial"""
+        forma = (self.n_miembros, self.n_particulas)
+        self.y_particulas = np.broadcast_to(self.y_equilibrio, forma).copy()
+        self.velocidades = np.zeros(forma)
+        self.tiempo = 0
+
+        # Fuente senoidal de cada miembro
+        self.fuente_activa = np.zeros(self.n_miembros, dtype=bool)
+        self.idx_fuente = np.zeros(self.n_miembros, dtype=int)
+        self.frecuencia = np.full(self.n_miembros, 1.0)
+        self.amplitud_fuente = np.zeros(self.n_miembros)
+
+        self.alturas_tiempo.clear()
+        self.energias.clear()
+        self.tiempos.clear()
+
+    def seleccionar(self, miembros):
+        """Índices enteros de los miembros seleccionados (todos si es None)"""
+        if miembros is None:
+            return np.arange(self.n_miembros)
+        return np.arange(self.n_miembros)[miembros]
+
+    def aplicar_perturbacion(self, tipo='gota', posicion=None, amplitud=2.0, ancho=2.0,
+                             miembros=None):
+        """Aplica una perturbación de MotorPerfil a los miembros elegidos.
+
+        amplitud puede ser un escalar o un arreglo con un valor por miembro elegido.
+        """
+        sel = self.seleccionar(miembros)
+        amplitud = np.broadcast_to(np.asarray(amplitud, dtype=float), sel.shape)[:, None]
+        if posicion is None:
+            posicion = self.longitud / 2  # Centro por defecto
+
+        # Encontrar índice más cercano a la posición
+        idx_centro = np.argmin(np.abs(self.x_particulas - posicion))
+
+        if tipo == 'gota':
+            # Simula una gota cayendo
+            dist = np.abs(self.x_particulas - posicion)
+            idx = np.flatnonzero(dist < ancho)
+            factor = np.exp(-(dist[idx]/ancho)**2)
+            bloque = np.ix_(sel, idx)
+            self.y_particulas[bloque] -= amplitud * factor
+            self.velocidades[bloque] = -amplitud * factor * 2
+
+        elif tipo == 'onda_senoidal':
+            # Fuente senoidal continua
+            self.fuente_activa[sel] = True
+            self.idx_fuente[sel] = idx_centro
+            self.frecuencia[sel] = 1.0
+            self.amplitud_fuente[sel] = amplitud[:, 0]
+
+        elif tipo == 'piston':
+            # Simulación de pistón en un extremo
+            if posicion < self.longitud / 2:  # Lado izquierdo
+                idx = np.arange(min(5, self.n_particulas//4))
+            else:  # Lado derecho
+                idx = np.arange(max(self.n_particulas-5, 3*self.n_particulas//4), self.n_particulas)
+            self.velocidades[np.ix_(sel, idx)] = amplitud
+
+        elif tipo == 'tsunami':
+            # Levantamiento súbito del fondo (tsunami)
+            inicio = max(0, idx_centro - int(ancho))
+            fin = min(self.n_particulas, idx_centro + int(ancho))
+            bloque = np.ix_(sel, np.arange(inicio, fin))
+            self.y_particulas[bloque] += amplitud
+            self.velocidades[bloque] += amplitud * 0.5
+
+    def calcular_fuerzas(self):
+        """Fuerzas de MotorPerfil (fuerzas_perfil) con parámetros por miembro"""
+        return fuerzas_perfil(self.y_particulas, self.velocidades, self.y_equilibrio,
+                              self.gravedad[:, None], self.tension_superficial[:, None],
+                              self.viscosidad[:, None])
+
+    def aplicar_condiciones_frontera(self):
+        """Paredes rígidas en ambos extremos de todos los miembros"""
+        if self.pared_izq:
+            self.y_particulas[:, 0] = self.y_equilibrio[0]
+            self.velocidades[:, 0] = 0
+        if self.pared_der:
+            self.y_particulas[:, -1] = self.y_equilibrio[-1]
+            self.velocidades[:, -1] = 0
+
+    def paso_simulacion(self):
+        """Avanza todos los miembros un paso dt"""
+        # Fuente senoidal en los miembros que la tengan activa
+        if self.fuente_activa.any():
+            fase = 2 * np.pi * self.frecuencia * self.tiempo
+            impulso = np.where(self.fuente_activa, self.amplitud_fuente * np.sin(fase), 0.0)
+            self.velocidades[np.arange(self.n_miembros), self.idx_fuente] += impulso * self.dt
+
+        aceleraciones = self.calcular_fuerzas() / self.densidad
+        self.velocidades += aceleraciones * self.dt
+        self.y_particulas += self.velocidades * self.dt
+        self.aplicar_condiciones_frontera()
+
+        self.tiempo += self.dt
+
+        # Guardar datos para análisis
+        centro = self.n_particulas // 2
+        self.alturas_tiempo.append(self.y_particulas[:, centro] - self.y_equilibrio[centro])
+        self.tiempos.append(self.tiempo)
+
+        energia_cinetica = 0.5 * np.sum(self.velocidades**2, axis=1)
+        energia_potencial = 0.5 * self.gravedad * np.sum((self.y_particulas - self.y_equilibrio)**2,
+                                                         axis=1)
+        self.energias.append(energia_cinetica + energia_potencial)
+
+    def series(self):
+        """Series registradas: 'tiempos' (T,) y una (B, T) por magnitud"""
+        return {
+            'tiempos': np.array(self.tiempos),
+            'alturas_tiempo': apilar(self.alturas_tiempo),
+            'energias': apilar(self.energias),
+        }
+
+
+def apilar(historial):
+    """Historial de T muestras (B,) -> arreglo (B, T)"""
+    return np.ascontiguousarray(historial.vista().T)
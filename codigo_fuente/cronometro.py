@@ -0,0 +1,153 @@
+"""Tiempos por fase de los pasos y cuadros de los simuladores.
+
+Los motores marcan vueltas ('fuente', 'fuerzas', 'integracion', 'fronteras',
+'historial' y, con malla adaptativa, 'malla') dentro de paso_simulacion y las
+ventanas agregan 'analisis' y 'render'. Cada vuelta suma el tiempo desde la
+marca anterior a su fase; al cerrar un cuadro los totales pasan a un historial
+por fase, del que salen los percentiles móviles. Opcionalmente cada cuadro se
+escribe como una línea JSON.
+
+Los motores llevan por defecto CRONOMETRO_APAGADO, cuyas marcas no hacen nada:
+el costo es una llamada vacía por fase y paso.
+"""
+import json
+import time
+
+import numpy as np
+
+from historial import BufferCircular
+
+FASES = ('fuente', 'fuerzas', 'integracion', 'fronteras', 'historial', 'malla', 'analisis',
+         'render')
+PERCENTILES = (50, 90, 99)
+
+
+class Cronometro:
+    """Acumula las vueltas de cada cuadro y guarda los últimos `ventana` cuadros"""
+
+    activo = True
+
+    def __init__(self, ventana=256, registro=None):
+        self.ventana = ventana
+        self.tiempos = {fase: BufferCircular(ventana) for fase in FASES}
+        self.duraciones = BufferCircular(ventana)   # Reloj entre cierres de cuadro
+        self.pasos_cuadro = BufferCircular(ventana)
+        self.registro = open(registro, 'a') if registro else None
+        self.cuadro = dict.fromkeys(FASES, 0.0)
+        self.pasos = 0
+        self.cuadros = 0
+        self.marca = self.ultimo_cierre = time.perf_counter()
+
+    def iniciar(self):
+        """Marca el inicio de un tramo medido (lo anterior no se atribuye a ninguna fase)"""
+        self.marca = time.perf_counter()
+
+    def iniciar_paso(self):
+        self.pasos += 1
+        self.marca = time.perf_counter()
+
+    def vuelta(self, fase):
+        """Suma a `fase` el tiempo transcurrido desde la marca anterior"""
+        ahora = time.perf_counter()
+        self.cuadro[fase] += ahora - self.marca
+        self.marca = ahora
+
+    def envolver(self, fase, funcion, resto):
+        """`funcion` con su tiempo atribuido a `fase` y lo previo a `resto`.
+
+        Sirve para separar las fuerzas, que los integradores llaman por dentro.
+        """
+        def medida(*argumentos):
+            self.vuelta(resto)
+            resultado = funcion(*argumentos)
+            self.vuelta(fase)
+            return resultado
+        return medida
+
+    def cerrar_cuadro(self, **extras):
+        """Pasa los totales del cuadro al historial y, si hay registro, los escribe"""
+        ahora = time.perf_counter()
+        for fase, segundos in self.cuadro.items():
+            self.tiempos[fase].append(segundos)
+        self.duraciones.append(ahora - self.ultimo_cierre)
+        self.pasos_cuadro.append(self.pasos)
+        if self.registro is not None:
+            linea = {'cuadro': self.cuadros, 'duracion_ms': (ahora - self.ultimo_cierre) * 1e3,
+                     'pasos': self.pasos,
+                     'fases_ms': {fase: segundos * 1e3 for fase, segundos in self.cuadro.items()},
+                     **extras}
+            self.registro.write(json.dumps(linea) + '\n')
+        self.cuadro = dict.fromkeys(FASES, 0.0)
+        self.pasos = 0
+        self.cuadros += 1
+        self.ultimo_cierre = ahora
+
+    def estadisticas(self):
+        """Pasos/s, cuadros/s y, por fase, media y percentiles (ms por cuadro) de la ventana"""
+        duracion = np.sum(self.duraciones.vista())
+        resultado = {
+            'cuadros': self.cuadros,
+            'cuadros_por_s': len(self.duraciones) / duracion if duracion > 0 else 0.0,
+            'pasos_por_s': np.sum(self.pasos_cuadro.vista()) / duracion if duracion > 0 else 0.0,
+            'fases': {},
+        }
+        for fase, serie in self.tiempos.items():
+            if not len(serie):
+                continue
+            muestras = serie.vista() * 1e3
+            valores = np.percentile(muestras, PERCENTILES)
+            resultado['fases'][fase] = {
+                'media': float(np.mean(muestras)),
+                **{f'p{p}': float(v) for p, v in zip(PERCENTILES, valores)},
+                'max': float(np.max(muestras)),
+            }
+        return resultado
+
+    def fase_mas_lenta(self, estadisticas=None):
+        """(fase, ms medios por cuadro) de la fase que más tarda, o None"""
+        fases = (estadisticas or self.estadisticas())['fases']
+        if not fases:
+            return None
+        fase = max(fases, key=lambda nombre: fases[nombre]['media'])
+        return fase, fases[fase]['media']
+
+    def resumen(self):
+        """Una línea para el panel de información"""
+        estadisticas = self.estadisticas()
+        texto = f"{estadisticas['pasos_por_s']:.0f} pasos/s · {estadisticas['cuadros_por_s']:.1f} FPS"
+        lenta = self.fase_mas_lenta(estadisticas)
+        if lenta is not None:
+            texto += f" · lenta: {lenta[0]} {lenta[1]:.1f} ms"
+        return texto
+
+    def cerrar(self):
+        if self.registro is not None:
+            self.registro.close()
+            self.registro = None
+
+
+class CronometroApagado:
+    """Mismos métodos que Cronometro, sin medir nada"""
+
+    activo = False
+
+    def iniciar(self):
+        pass
+
+    def iniciar_paso(self):
+        pass
+
+    def vuelta(self, fase):
+        pass
+
+    def envolver(self, fase, funcion, resto):
+        return funcion
+
+    def cerrar_cuadro(self, **extras):
+        pass
+
+    def cerrar(self):
+        pass
+
+
+CRONOMETRO_APAGADO = CronometroApagado()
@@ -0,0 +1,123 @@
+"""Análisis espectral en línea de las series de los simuladores."""
+import functools
+
+import numpy as np
+
+from historial import BufferCircular
+
+
+@functools.lru_cache(maxsize=16)
+def ventana_hann(largo):
+    """Ventana de Hann periódica de `largo` muestras (cacheada, solo lectura)"""
+    ventana = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(largo) / largo)
+    ventana.setflags(write=False)
+    return ventana
+
+
+class AnalizadorEspectral:
+    """Densidad espectral de Welch calculada a medida que llegan las muestras.
+
+    Las muestras de n_sondas series (p. ej. centro y borde) se acumulan en un
+    buffer circular de `segmento` muestras. Cada `salto` muestras nuevas
+    (según el solapamiento) se analiza el último segmento con una FFT real y
+    ventana de Hann, y su densidad se promedia con las anteriores. El promedio
+    es el de Welch hasta `memoria` segmentos y a partir de ahí exponencial, para
+    seguir señales que cambian. El costo por muestra es O(log segmento), así
+    que segmentos de 10^4 a 10^5 muestras no frenan la animación.
+
+    Tras cada segmento se actualiza `frecuencia_dominante` (una por sonda),
+    interpolando el pico con una parábola sobre el logaritmo de la densidad
+    para resolver por debajo de la separación entre frecuencias.
+    """
+
+    def __init__(self, intervalo, segmento=1024, solapamiento=0.5, n_sondas=1, memoria=8):
+        if segmento < 4:
+            raise ValueError(f"El segmento debe tener al menos 4 muestras, no {segmento}")
+        if not 0 <= solapamiento < 1:
+            raise ValueError(f"El solapamiento debe estar en [0, 1), no {solapamiento}")
+
+        self.intervalo = intervalo
+        self.segmento = int(segmento)
+        self.salto = max(1, int(round(self.segmento * (1 - solapamiento))))
+        self.n_sondas = n_sondas
+        self.memoria = memoria
+
+        self.ventana = ventana_hann(self.segmento)
+        self.escala = intervalo / np.sum(self.ventana**2)
+        self.frecuencias = np.fft.rfftfreq(self.segmento, intervalo)
+        self.muestras = BufferCircular(self.segmento, forma=(n_sondas,))
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Olvida las muestras y el espectro acumulado"""
+        self.muestras.clear()
+        self.pendientes = 0
+        self.n_segmentos = 0
+        self.densidad = np.zeros((self.n_sondas, len(self.frecuencias)))
+        self.frecuencia_dominante = np.full(self.n_sondas, np.nan)
+
+    @property
+    def listo(self):
+        """True cuando ya se analizó al menos un segmento completo"""
+        return self.n_segmentos > 0
+
+    def agregar(self, muestra):
+        """Añade una muestra (un valor por sonda); True si se actualizó el espectro"""
+        return self.agregar_bloque(np.reshape(muestra, (1, self.n_sondas)))
+
+    def agregar_bloque(self, muestras):
+        """Añade un bloque (T, n_sondas) de muestras; True si se actualizó el espectro"""
+        muestras = np.asarray(muestras, dtype=float).reshape(-1, self.n_sondas)
+        actualizado = False
+        inicio = 0
+        while inicio < len(muestras):
+            # Muestras que faltan para el próximo segmento a analizar
+            if len(self.muestras) < self.segmento:
+                faltan = self.segmento - len(self.muestras)
+            else:
+                faltan = self.salto - self.pendientes
+            trozo = muestras[inicio:inicio + faltan]
+            self.muestras.extend(trozo)
+            self.pendientes += len(trozo)
+            inicio += len(trozo)
+
+            if len(trozo) == faltan:
+                self.procesar_segmento()
+                actualizado = True
+        return actualizado
+
+    def procesar_segmento(self):
+        """FFT del último segmento y actualización del promedio y del pico"""
+        x = self.muestras.vista()
+        x = (x - x.mean(axis=0)) * self.ventana[:, None]
+        espectro = np.fft.rfft(x, axis=0).T
+        densidad = (espectro.real**2 + espectro.imag**2) * self.escala
+
+        # Espectro de un solo lado: se duplica todo salvo DC (y Nyquist si existe)
+        fin = -1 if self.segmento % 2 == 0 else None
+        densidad[:, 1:fin] *= 2
+
+        self.pendientes = 0
+        self.n_segmentos += 1
+        peso = 1 / min(self.n_segmentos, self.memoria)
+        self.densidad += peso * (densidad - self.densidad)
+        self.frecuencia_dominante = self.estimar_pico()
+
+    def estimar_pico(self):
+        """Frecuencia del máximo de la densidad (sin DC), con interpolación parabólica"""
+        n_frec = len(self.frecuencias)
+        pico = np.argmax(self.densidad[:, 1:], axis=1) + 1
+        sondas = np.arange(self.n_sondas)
+
+        interior = (pico > 0) & (pico < n_frec - 1)
+        central = np.clip(pico, 1, n_frec - 2)
+        log_densidad = np.log(self.densidad + np.finfo(float).tiny)
+        a = log_densidad[sondas, central - 1]
+        b = log_densidad[sondas, central]
+        c = log_densidad[sondas, central + 1]
+        curvatura = a - 2 * b + c
+        delta = np.divide(0.5 * (a - c), curvatura, out=np.zeros(self.n_sondas),
+                          where=interior & (curvatura < 0))
+
+        frecuencia = (pico + np.clip(delta, -0.5, 0.5)) * (self.frecuencias[1] - self.frecuencias[0])
+        return np.where(self.densidad[sondas, pico] > 0, frecuencia, np.nan)
@@ -0,0 +1,195 @@
+"""Exporta una simulación de v2 o v3 a video (.mp4) o a una carpeta de PNG.
+
+La física corre una sola vez sin figura y graba un cuadro cada --cada pasos
+(ver trayectoria.py). Después los cuadros se reparten en tramos entre un pool
+de procesos; cada proceso dibuja el suyo con una figura mínima, sin sliders ni
+botones, y al final los tramos se unen. El tiempo de exportación depende de
+los núcleos disponibles y no del intervalo de la animación en vivo.
+
+Uso:
+    python exportar.py v2 --pasos 3000 --cada 10 --salida ondas.mp4
+    python exportar.py v3 --n 2000 --pasos 20000 --cada 50 --salida cuadros/ --procesos 8
+    python exportar.py v3 --desde perfil/ --salida perfil.mp4
+
+El .mp4 necesita ffmpeg; la carpeta de PNG funciona siempre.
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib import animation, colormaps
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from motores import MotorOndas, MotorPerfil
+from simular import crear_motor, interpretar_dt, perturbar
+from trayectoria import GrabadorTrayectoria, LectorTrayectoria
+
+MODELOS_VIDEO = ('v2', 'v3')
+
+
+def simular_cuadros(ruta, modelo, pasos, cada, n=None, perturbacion=None, amplitud=None,
+                    integrador=None, dt=None):
+    """Corre la física sin figura y graba un cuadro cada `cada` pasos en `ruta`"""
+    simulador = crear_motor(modelo, n, integrador=integrador, dt=dt)
+    perturbar(simulador, modelo, perturbacion or ('pulso' if modelo == 'v2' else 'gota'), amplitud)
+    if pasos < cada:
+        raise ValueError(f"Con {pasos} pasos y un cuadro cada {cada} no se graba ningún cuadro")
+    with GrabadorTrayectoria(ruta, cada=cada) as grabador:
+        for _ in range(pasos):
+            simulador.paso_simulacion()
+            grabador.registrar_paso(simulador)
+    return grabador.cuadros
+
+
+class FiguraMinima:
+    """Solo el panel principal de v2 (red) o v3 (tanque), más el tiempo"""
+
+    def __init__(self, modelo, forma, ancho=8, alto=6, dpi=100):
+        self.modelo = modelo
+        self.fig = Figure(figsize=(ancho, alto), dpi=dpi)
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+
+        if modelo == 'v2':
+            # La red en reposo da los límites y la referencia de los colores
+            referencia = MotorOndas(n=forma[0], capacidad_historial=1)
+            self.y_iniciales = referencia.posiciones_iniciales[:, 1]
+            lado = (referencia.n - 1) * referencia.espaciado
+            self.ax.set_xlim(-0.1 * lado, 1.1 * lado)
+            self.ax.set_ylim(-0.1 * lado, 1.1 * lado)
+            self.ax.set_aspect('equal')
+            self.ax.set_title("Simulación de Ondas 2D", fontsize=14, fontweight='bold')
+            self.scatter = self.ax.scatter(referencia.posiciones[:, 0], referencia.posiciones[:, 1],
+                                           s=30, alpha=0.7)
+        else:
+            referencia = MotorPerfil(n_particulas=forma[0], capacidad_historial=1)
+            self.x_particulas = referencia.x_particulas
+            self.ax.set_xlim(0, referencia.longitud)
+            self.ax.set_ylim(0, 10)
+            self.ax.grid(True, alpha=0.3)
+            self.ax.set_title("Vista de Perfil - Simulación de Ondas en Agua",
+                              fontsize=14, fontweight='bold')
+            self.linea, = self.ax.plot(referencia.x_particulas, referencia.y_particulas, 'b-',
+                                       linewidth=3)
+        self.texto = self.ax.text(0.02, 0.97, '', transform=self.ax.transAxes,
+                                  verticalalignment='top', fontfamily='monospace')
+
+    def dibujar(self, tiempo, cuadro):
+        """Actualiza los artistas con un cuadro grabado"""
+        if self.modelo == 'v2':
+            posiciones = np.asarray(cuadro, dtype=float).reshape(-1, 2)
+            self.scatter.set_offsets(posiciones)
+            self.scatter.set_color(colormaps['viridis']((posiciones[:, 1] - self.y_iniciales + 2) / 4))
+        else:
+            self.linea.set_data(self.x_particulas, cuadro)
+        self.texto.set_text(f"t = {tiempo:8.2f} s")
+
+
+def dibujar_tramo(ruta, modelo, inicio, fin, destino, fps, dpi):
+    """Dibuja los cuadros [inicio, fin) de la trayectoria; corre en un proceso del pool.
+
+    Con `destino` terminado en .mp4 escribe un video, si no PNG numerados.
+    """
+    lector = LectorTrayectoria(ruta)
+    figura = FiguraMinima(modelo, lector.forma, dpi=dpi)
+    tiempos, cuadros = lector.tiempos, (lector[i] for i in range(inicio, fin))
+    if destino.endswith('.mp4'):
+        escritor = animation.FFMpegWriter(fps=fps)
+        with escritor.saving(figura.fig, destino, dpi):
+            for i, cuadro in zip(range(inicio, fin), cuadros):
+                figura.dibujar(tiempos[i], cuadro)
+                escritor.grab_frame()
+    else:
+        for i, cuadro in zip(range(inicio, fin), cuadros):
+            figura.dibujar(tiempos[i], cuadro)
+            figura.fig.savefig(os.path.join(destino, f'cuadro_{i:06d}.png'), dpi=dpi)
+    return fin - inicio
+
+
+def unir_tramos(tramos, salida):
+    """Concatena los .mp4 de los tramos sin recodificar"""
+    lista = f'{salida}.tramos.txt'
+    with open(lista, 'w') as archivo:
+        archivo.writelines(f"file '{os.path.abspath(tramo)}'\n" for tramo in tramos)
+    try:
+        subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+                        '-i', lista, '-c', 'copy', salida], check=True)
+    finally:
+        os.remove(lista)
+
+
+def renderizar(ruta, modelo, salida, procesos=None, fps=20, dpi=100):
+    """Reparte los cuadros de la trayectoria en `ruta` entre procesos y arma `salida`"""
+    video = salida.endswith('.mp4')
+    if video and not animation.writers.is_available('ffmpeg'):
+        raise ValueError("Exportar a .mp4 necesita ffmpeg; indicar una carpeta para exportar PNG")
+    total = len(LectorTrayectoria(ruta))
+    procesos = procesos or os.cpu_count() or 1
+    # Un tramo por proceso: cada uno paga una sola vez armar su figura
+    limites = np.linspace(0, total, min(procesos, total) + 1).astype(int)
+
+    temporal = tempfile.mkdtemp(prefix='tramos_', dir=os.path.dirname(os.path.abspath(salida)))
+    try:
+        if not video:
+            os.makedirs(salida, exist_ok=True)
+        destinos = [os.path.join(temporal, f'tramo_{i:03d}.mp4') if video else salida
+                    for i in range(len(limites) - 1)]
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            trabajos = [pool.submit(dibujar_tramo, ruta, modelo, inicio, fin, destino, fps, dpi)
+                        for inicio, fin, destino in zip(limites[:-1], limites[1:], destinos)]
+            dibujados = sum(trabajo.result() for trabajo in trabajos)
+        if video:
+            unir_tramos(destinos, salida)
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+    return dibujados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('modelo', choices=MODELOS_VIDEO)
+    parser.add_argument('--salida', required=True, help="archivo .mp4 o carpeta para los PNG")
+    parser.add_argument('--pasos', type=int, default=3000, help="pasos de física a simular")
+    parser.add_argument('--cada', type=int, default=10, help="un cuadro cada N pasos")
+    parser.add_argument('--n', type=int, help="lado de la red (v2) o n_particulas (v3)")
+    parser.add_argument('--perturbacion', help="tipo de perturbación inicial")
+    parser.add_argument('--amplitud', type=float, help="amplitud de la perturbación")
+    parser.add_argument('--integrador', choices=MotorPerfil.INTEGRADORES)
+    parser.add_argument('--dt', type=interpretar_dt)
+    parser.add_argument('--desde', metavar='DIRECTORIO',
+                        help="dibujar una trayectoria ya grabada en lugar de simular")
+    parser.add_argument('--trayectoria', metavar='DIRECTORIO',
+                        help="conservar la trayectoria simulada en este directorio")
+    parser.add_argument('--procesos', type=int, help="procesos para dibujar (por defecto, todos los núcleos)")
+    parser.add_argument('--fps', type=int, default=20)
+    parser.add_argument('--dpi', type=int, default=100)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    ruta = args.desde or args.trayectoria or tempfile.mkdtemp(prefix='trayectoria_')
+    try:
+        if args.desde is None:
+            simular_cuadros(ruta, args.modelo, args.pasos, args.cada, args.n, args.perturbacion,
+                            args.amplitud, args.integrador, args.dt)
+        simulado = time.perf_counter()
+        cuadros = renderizar(ruta, args.modelo, args.salida, args.procesos, args.fps, args.dpi)
+    except ValueError as error:
+        parser.error(str(error))
+    finally:
+        if args.desde is None and args.trayectoria is None:
+            shutil.rmtree(ruta, ignore_errors=True)
+    fin = time.perf_counter()
+    print(f"{args.modelo}: {cuadros} cuadros -> {args.salida} "
+          f"(física {simulado - inicio:.1f} s, dibujo {fin - simulado:.1f} s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
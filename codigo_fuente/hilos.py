@@ -0,0 +1,81 @@
+"""Pasos de v2 y v3 repartidos en bloques entre los hilos de un ThreadPoolExecutor.
+
+numpy suelta el GIL dentro de sus operaciones sobre arreglos, así que varios
+hilos del mismo proceso pueden calcular a la vez las fuerzas y la actualización
+de velocidades y posiciones de bloques distintos, sin arrancar procesos ni
+preparar memoria compartida (ver particion.py para eso).
+
+Cada hilo recibe un tramo contiguo de filas (v2) o partículas (v3) y lo recorre
+en bloques de unos BYTES_BLOQUE por temporal, de modo que los temporales de
+cada bloque quedan en la caché del núcleo. Las fuerzas de un bloque se calculan
+con una fila o partícula de halo a cada lado y dan los mismos valores que sobre
+el arreglo completo: los resultados son idénticos bit a bit a los del motor
+vectorizado.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Bytes de cada temporal por bloque: varios a la vez caben en la caché L2 de un núcleo
+BYTES_BLOQUE = 256 * 2**10
+
+
+class RepartoHilos:
+    """Reparte `total` filas en tramos por hilo y cada tramo en bloques de caché"""
+
+    def __init__(self, total, bytes_fila, hilos=None):
+        self.total = total
+        self.hilos = max(1, min(hilos or os.cpu_count() or 1, total))
+        self.filas_bloque = max(1, BYTES_BLOQUE // bytes_fila)
+        limites = np.linspace(0, total, self.hilos + 1).astype(int)
+        self.tramos = [(int(inicio), int(fin)) for inicio, fin in zip(limites[:-1], limites[1:])]
+        self.pool = (ThreadPoolExecutor(self.hilos, thread_name_prefix='bloques')
+                     if self.hilos > 1 else None)
+
+    def recorrer_tramo(self, funcion, inicio, fin):
+        for bloque in range(inicio, fin, self.filas_bloque):
+            funcion(bloque, min(bloque + self.filas_bloque, fin))
+
+    def recorrer(self, funcion):
+        """Llama funcion(inicio, fin) sobre todos los bloques y espera a que terminen"""
+        if self.pool is None:
+            self.recorrer_tramo(funcion, 0, self.total)
+            return
+        trabajos = [self.pool.submit(self.recorrer_tramo, funcion, inicio, fin)
+                    for inicio, fin in self.tramos]
+        for trabajo in trabajos:
+            trabajo.result()
+
+    def cerrar(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+def por_bloques(reparto, salida, calcular):
+    """Llena `salida` bloque a bloque con calcular(inicio, fin), que ve una fila de halo.
+
+    calcular recibe los límites con halo y devuelve el resultado de esas filas;
+    en `salida` solo se copian las del bloque.
+    """
+    total = reparto.total
+
+    def bloque(inicio, fin):
+        con_halo = max(0, inicio - 1)
+        resultado = calcular(con_halo, min(total, fin + 1))
+        salida[inicio:fin] = resultado[inicio - con_halo:fin - con_halo]
+
+    reparto.recorrer(bloque)
+    return salida
+
+
+def euler_por_bloques(reparto, posiciones, velocidades, fuerzas, h, factor=None, masa=None):
+    """Euler semi-implícito de los motores (v += a h, amortiguamiento, x += v h) por bloques"""
+    def bloque(inicio, fin):
+        aceleraciones = fuerzas[inicio:fin] if masa is None else fuerzas[inicio:fin] / masa
+        velocidades[inicio:fin] += aceleraciones * h
+        if factor is not None:
+            velocidades[inicio:fin] *= factor
+        posiciones[inicio:fin] += velocidades[inicio:fin] * h
+
+    reparto.recorrer(bloque)
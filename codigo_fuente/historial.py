@@ -0,0 +1,98 @@
+"""Historial acotado para las series temporales de los simuladores."""
+import numpy as np
+
+# Muestras que guarda cada serie por defecto (~1 MB por serie escalar)
+CAPACIDAD_HISTORIAL = 65_536
+
+
+class BufferCircular:
+    """Serie de capacidad fija con append O(1) y vistas contiguas sin copia.
+
+    Cada muestra se escribe dos veces, en la posición i y en i + capacidad, así
+    las últimas `capacidad` muestras siempre forman un bloque contiguo del
+    arreglo interno y se pueden entregar como vista (por ejemplo a set_data).
+    También lleva el mínimo y el máximo de todo lo añadido desde el último
+    clear(), para autoescalar ejes sin recorrer la serie.
+
+    Se comporta como la lista a la que reemplaza en lo que usan los simuladores:
+    append, clear, len, indexación y rebanadas (que devuelven vistas) y
+    np.asarray. Con `forma` cada muestra puede ser un arreglo, p. ej. (B,) para
+    los conjuntos.
+    """
+
+    def __init__(self, capacidad=CAPACIDAD_HISTORIAL, forma=(), dtype=float):
+        if capacidad < 1:
+            raise ValueError(f"La capacidad debe ser positiva, no {capacidad}")
+        self.capacidad = int(capacidad)
+        self.datos = np.zeros((2 * self.capacidad,) + tuple(forma), dtype=dtype)
+        self.clear()
+
+    def clear(self):
+        """Vacía la serie sin liberar memoria"""
+        self.fin = 0       # Próxima posición de escritura, en [0, capacidad)
+        self.largo = 0     # Muestras disponibles, como mucho capacidad
+        self.total = 0     # Muestras añadidas desde el último clear()
+        self.minimo = None
+        self.maximo = None
+
+    def append(self, valor):
+        """Añade una muestra, descartando la más antigua si la serie está llena"""
+        self.datos[self.fin] = valor
+        self.datos[self.fin + self.capacidad] = valor
+        self.fin = (self.fin + 1) % self.capacidad
+        self.largo = min(self.largo + 1, self.capacidad)
+        self.total += 1
+
+        if self.minimo is None:
+            self.minimo = self.maximo = self.datos[self.fin - 1 + self.capacidad].copy()
+        else:
+            self.minimo = np.minimum(self.minimo, valor)
+            self.maximo = np.maximum(self.maximo, valor)
+
+    def extend(self, valores):
+        """Añade un bloque de muestras (primer eje = tiempo) en O(len(valores))"""
+        valores = np.asarray(valores, dtype=self.datos.dtype)
+        cantidad = len(valores)
+        if cantidad == 0:
+            return
+
+        if self.minimo is None:
+            self.minimo = valores.min(axis=0)
+            self.maximo = valores.max(axis=0)
+        else:
+            self.minimo = np.minimum(self.minimo, valores.min(axis=0))
+            self.maximo = np.maximum(self.maximo, valores.max(axis=0))
+
+        # De un bloque más largo que la capacidad solo sobreviven las últimas muestras
+        guardar = valores[-self.capacidad:]
+        primero = min(len(guardar), self.capacidad - self.fin)
+        resto = len(guardar) - primero
+        for desplazamiento in (0, self.capacidad):
+            inicio = self.fin + desplazamiento
+            self.datos[inicio:inicio + primero] = guardar[:primero]
+            self.datos[desplazamiento:desplazamiento + resto] = guardar[primero:]
+
+        self.fin = (self.fin + len(guardar)) % self.capacidad
+        self.largo = min(self.largo + len(guardar), self.capacidad)
+        self.total += cantidad
+
+    def vista(self, n=None):
+        """Vista sin copia de las últimas n muestras (todas si n es None)"""
+        n = self.largo if n is None else min(n, self.largo)
+        final = self.fin + self.capacidad
+        return self.datos[final - n:final]
+
+    def __len__(self):
+        return self.largo
+
+    def __getitem__(self, indice):
+        return self.vista()[indice]
+
+    def __iter__(self):
+        return iter(self.vista())
+
+    def __array__(self, dtype=None, copy=None):
+        vista = self.vista()
+        if copy:
+            return np.array(vista, dtype=dtype)
+        return np.asarray(vista, dtype=dtype)
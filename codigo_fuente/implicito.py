@@ -0,0 +1,115 @@
+"""Integración implícita de los sistemas lineales de v2 y v3 con matrices dispersas.
+
+La red de v2 y el tanque de v3 cumplen u'' = -K u - gamma u', con u el
+desplazamiento respecto al equilibrio y K una matriz de rigidez dispersa y
+constante mientras no cambien los parámetros. Los esquemas implícitos son
+incondicionalmente estables, así que el paso lo limita solo la precisión
+buscada y no la frecuencia más alta de la red:
+
+- 'newmark': aceleración media (regla del trapecio), segundo orden y sin
+  disipación numérica.
+- 'euler_implicito': Euler hacia atrás, primer orden; amortigua los modos
+  rápidos, útil en configuraciones muy rígidas.
+
+Cada paso resuelve (I + a h gamma + b h^2 K) v1 = ... con la factorización LU
+dispersa guardada, que solo se rehace cuando cambian h o los parámetros
+(p. ej. al mover un slider). Requiere scipy.
+"""
+import numpy as np
+
+try:
+    import scipy.sparse as sparse
+    from scipy.sparse.linalg import splu
+except ImportError:  # scipy es opcional: solo lo necesitan estos integradores
+    sparse = None
+
+IMPLICITOS = ('newmark', 'euler_implicito')
+
+
+def requerir_scipy():
+    if sparse is None:
+        raise ImportError("Los integradores implícitos necesitan scipy (pip install scipy)")
+
+
+def laplaciano(n_nodos, enlaces_i, enlaces_j):
+    """Laplaciano del grafo (grado - adyacencia) como matriz dispersa CSR"""
+    requerir_scipy()
+    unos = np.ones(len(enlaces_i))
+    adyacencia = sparse.coo_matrix(
+        (np.concatenate((unos, unos)),
+         (np.concatenate((enlaces_i, enlaces_j)), np.concatenate((enlaces_j, enlaces_i)))),
+        shape=(n_nodos, n_nodos)).tocsr()
+    grado = np.asarray(adyacencia.sum(axis=1)).ravel()
+    return (sparse.diags(grado) - adyacencia).tocsr()
+
+
+def laplaciano_red(n):
+    """Laplaciano de la red n x n de v2 (4 vecinos, bordes libres, orden por filas)"""
+    indices = np.arange(n * n).reshape(n, n)
+    enlaces_i = np.concatenate((indices[:, :-1].ravel(), indices[:-1, :].ravel()))
+    enlaces_j = np.concatenate((indices[:, 1:].ravel(), indices[1:, :].ravel()))
+    return laplaciano(n * n, enlaces_i, enlaces_j)
+
+
+def laplaciano_cadena(n):
+    """Laplaciano de la cadena i <-> i+1 de v3"""
+    indices = np.arange(n)
+    return laplaciano(n, indices[:-1], indices[1:])
+
+
+def rigidez_red(n, k, masa):
+    """K de la red de v2: cada componente de u siente -(k/m) L u"""
+    return (k / masa) * laplaciano_red(n)
+
+
+def rigidez_perfil(n, tension_superficial, gravedad, densidad, pared_izq=True, pared_der=True):
+    """K del tanque de v3; las filas de las paredes quedan en cero (no se mueven)"""
+    rigidez = (gravedad * sparse.identity(n) + tension_superficial * laplaciano_cadena(n)) / densidad
+    libres = np.ones(n)
+    libres[0] = 0 if pared_izq else 1
+    libres[-1] = 0 if pared_der else 1
+    return (sparse.diags(libres) @ rigidez).tocsr()
+
+
+class IntegradorImplicito:
+    """Paso implícito de u'' = -K u - gamma u' que reutiliza la factorización"""
+
+    def __init__(self, esquema, dtype=float):
+        if esquema not in IMPLICITOS:
+            raise ValueError(f"Esquema implícito desconocido: {esquema!r} (opciones: {IMPLICITOS})")
+        requerir_scipy()
+        self.esquema = esquema
+        self.dtype = np.dtype(dtype)  # float32: factorización y pasos en simple precisión
+        self.clave = None
+        self.factorizaciones = 0
+
+    def preparar(self, clave, construir_rigidez, gamma, h):
+        """Factoriza el sistema del paso si `clave` (parámetros y h) cambió.
+
+        `construir_rigidez` solo se llama al refactorizar y devuelve K dispersa.
+        """
+        if clave == self.clave:
+            return
+        rigidez = construir_rigidez().astype(self.dtype)
+        # newmark: I + h/2 gamma + h^2/4 K; euler_implicito: I + h gamma + h^2 K
+        a, b = (0.5, 0.25) if self.esquema == 'newmark' else (1.0, 1.0)
+        identidad = sparse.identity(rigidez.shape[0], dtype=self.dtype, format='csc')
+        self.lu = splu((identidad * (1 + a * h * gamma) + (b * h * h) * rigidez).tocsc())
+        self.rigidez = rigidez
+        self.gamma = gamma
+        self.h = h
+        self.clave = clave
+        self.factorizaciones += 1
+
+    def paso(self, u, v):
+        """Desplazamiento y velocidad tras un paso h (acepta varias columnas, p. ej. x e y)"""
+        h, gamma = self.h, self.gamma
+        ku = self.rigidez @ u
+        if self.esquema == 'newmark':
+            # Trapecio: u1 = u + h/2 (v + v1), v1 = v + h/2 (a(u, v) + a(u1, v1))
+            derecha = v * (1 - 0.5 * h * gamma) - (0.25 * h * h) * (self.rigidez @ v) - h * ku
+            v1 = self.lu.solve(derecha)
+            return u + 0.5 * h * (v + v1), v1
+        # Euler hacia atrás: v1 = v + h a(u1, v1), u1 = u + h v1
+        v1 = self.lu.solve(v - h * ku)
+        return u + h * v1, v1
@@ -0,0 +1,168 @@
+"""Instantáneas del estado completo de un motor para pausar y retomar corridas.
+
+Una instantánea es un .npz sin comprimir: los arreglos (posiciones,
+velocidades, historiales) van tal cual y el resto (clase, tamaño, parámetros,
+tiempo, fuentes) en una cabecera JSON con formato y versión. Qué atributos
+forman el estado lo declara cada motor en ESTADO y HISTORIALES. Retomar desde
+una instantánea reproduce la misma trayectoria bit a bit.
+
+La escritura va a un archivo temporal que luego reemplaza al anterior, así una
+caída a mitad de camino nunca deja una instantánea corrupta.
+"""
+import json
+import os
+import time
+
+import numpy as np
+
+import motores
+from historial import BufferCircular
+
+FORMATO = 'simulador_ondas/instantanea'
+VERSION = 4
+
+CLAVE_CABECERA = '__cabecera__'
+
+
+def valor_json(valor):
+    """Escalares y arreglos de numpy a tipos de Python (JSON conserva los float exactos)"""
+    if isinstance(valor, (np.generic, np.ndarray)):
+        return valor.tolist()
+    return valor
+
+
+def clase_motor(motor):
+    """La clase de motores.py de la que deriva `motor` (la que declara ESTADO)"""
+    return next(c for c in type(motor).__mro__ if 'ESTADO' in vars(c))
+
+
+def guardar(motor, ruta):
+    """Escribe la instantánea de `motor` en `ruta` (.npz)"""
+    motor_base = clase_motor(motor)
+    primero = getattr(motor, motor_base.HISTORIALES[0])
+    cabecera = {
+        'formato': FORMATO,
+        'version': VERSION,
+        'clase': motor_base.__name__,
+        'argumentos': {
+            motor_base.TAMANO: getattr(motor, motor_base.TAMANO),
+            'motor': motor.motor,
+            'integrador': motor.integrador,
+            'dt': motor.dt,
+            'dtype': motor.dtype.name,
+            'capacidad_historial': primero.capacidad,
+        },
+        'estado': {},
+        'historiales': {},
+    }
+
+    arreglos = {}
+    for nombre in motor_base.ESTADO:
+        if not hasattr(motor, nombre):
+            continue  # p. ej. la fuente, que solo existe tras activarla
+        valor = getattr(motor, nombre)
+        if isinstance(valor, np.ndarray):
+            arreglos[nombre] = valor
+        else:
+            cabecera['estado'][nombre] = valor_json(valor)
+
+    for nombre in motor_base.HISTORIALES:
+        historial = getattr(motor, nombre)
+        arreglos[f'historial/{nombre}'] = historial.vista()
+        cabecera['historiales'][nombre] = {
+            'capacidad': historial.capacidad,
+            'total': historial.total,
+            'minimo': None if historial.minimo is None else valor_json(historial.minimo),
+            'maximo': None if historial.maximo is None else valor_json(historial.maximo),
+        }
+
+    arreglos[CLAVE_CABECERA] = np.array(json.dumps(cabecera))
+    temporal = f'{ruta}.tmp'
+    with open(temporal, 'wb') as archivo:
+        np.savez(archivo, **arreglos)
+    os.replace(temporal, ruta)
+    return ruta
+
+
+def leer_cabecera(datos):
+    cabecera = json.loads(str(datos[CLAVE_CABECERA]))
+    if cabecera.get('formato') != FORMATO:
+        raise ValueError(f"No es una instantánea del simulador (formato {cabecera.get('formato')!r})")
+    if cabecera.get('version') != VERSION:
+        raise ValueError(f"Versión de instantánea {cabecera.get('version')} no soportada "
+                         f"(se esperaba {VERSION})")
+    return cabecera
+
+
+def restaurar(motor, ruta):
+    """Carga en `motor` (de la misma clase y tamaño) el estado guardado en `ruta`"""
+    with np.load(ruta, allow_pickle=False) as datos:
+        cabecera = leer_cabecera(datos)
+        motor_base = clase_motor(motor)
+        if motor_base.__name__ != cabecera['clase']:
+            raise ValueError(f"La instantánea es de {cabecera['clase']}, no de {motor_base.__name__}")
+        tamano = cabecera['argumentos'][motor_base.TAMANO]
+        if getattr(motor, motor_base.TAMANO) != tamano:
+            raise ValueError(f"La instantánea es de {motor_base.TAMANO}={tamano}, "
+                             f"no {getattr(motor, motor_base.TAMANO)}")
+
+        motor.dt = cabecera['argumentos']['dt']
+        for nombre, valor in cabecera['estado'].items():
+            setattr(motor, nombre, valor)
+        for nombre in motor_base.ESTADO:
+            if nombre in datos.files:
+                setattr(motor, nombre, datos[nombre].copy())
+            elif nombre not in cabecera['estado'] and nombre in vars(motor):
+                delattr(motor, nombre)  # p. ej. una fuente que no existía al guardar
+
+        for nombre, info in cabecera['historiales'].items():
+            muestras = datos[f'historial/{nombre}']
+            historial = BufferCircular(info['capacidad'], forma=muestras.shape[1:],
+                                       dtype=muestras.dtype)
+            historial.extend(muestras)
+            historial.total = info['total']
+            for extremo in ('minimo', 'maximo'):
+                valor = info[extremo]
+                setattr(historial, extremo,
+                        None if valor is None else np.asarray(valor, dtype=muestras.dtype)[()])
+            setattr(motor, nombre, historial)
+    return motor
+
+
+def cargar(ruta, clase=None):
+    """Crea un motor a partir de la instantánea (o una subclase, p. ej. una ventana)"""
+    with np.load(ruta, allow_pickle=False) as datos:
+        cabecera = leer_cabecera(datos)
+    clase = clase or getattr(motores, cabecera['clase'])
+    argumentos = dict(cabecera['argumentos'])
+    motor = clase(**argumentos)
+    return restaurar(motor, ruta)
+
+
+class GuardadoPeriodico:
+    """Guarda una instantánea cada `cada_pasos` pasos y/o cada `cada_segundos` de reloj.
+
+    Se llama a registrar_paso(motor) tras cada paso_simulacion.
+    """
+
+    def __init__(self, ruta, cada_pasos=None, cada_segundos=None):
+        if cada_pasos is None and cada_segundos is None:
+            raise ValueError("Indicar cada_pasos, cada_segundos o ambos")
+        self.ruta = ruta
+        self.cada_pasos = cada_pasos
+        self.cada_segundos = cada_segundos
+        self.pasos = 0
+        self.guardados = 0
+        self.ultimo = time.perf_counter()
+
+    def registrar_paso(self, motor):
+        """Cuenta un paso y guarda si toca; True si se guardó"""
+        self.pasos += 1
+        ahora = time.perf_counter()
+        if ((self.cada_pasos and self.pasos % self.cada_pasos == 0)
+                or (self.cada_segundos and ahora - self.ultimo >= self.cada_segundos)):
+            guardar(motor, self.ruta)
+            self.ultimo = time.perf_counter()
+            self.guardados += 1
+            return True
+        return False
@@ -0,0 +1,78 @@
+"""Integradores temporales para los motores de v1, v2 y v3.
+
+Todos resuelven x'' = a(x) - gamma x', con a(x) la aceleración conservativa
+(resortes, tensión, gravedad) y gamma un amortiguamiento lineal. Cada paso
+recibe (x, v, aceleracion, gamma, h) y devuelve los nuevos (x, v) sin
+modificar los de entrada.
+
+'euler' (Euler semi-implícito con el factor de amortiguamiento por paso) lo
+siguen haciendo los propios motores, para no alterar sus resultados.
+"""
+import math
+
+INTEGRADORES = ('euler', 'verlet', 'leapfrog', 'rk4')
+
+# Mayor omega * dt estable de cada esquema para un oscilador sin amortiguar
+LIMITE_ESTABILIDAD = {
+    'euler': 2.0,
+    'verlet': 2.0,
+    'leapfrog': 2.0,
+    'rk4': 2 * math.sqrt(2),
+}
+
+# Evaluaciones de la aceleración por paso (el costo dominante)
+EVALUACIONES_POR_PASO = {'euler': 1, 'verlet': 2, 'leapfrog': 1, 'rk4': 4}
+
+
+def validar_integrador(integrador, opciones=INTEGRADORES):
+    if integrador not in opciones:
+        raise ValueError(f"Integrador desconocido: {integrador!r} (opciones: {opciones})")
+
+
+def dt_estable(omega_max, integrador, seguridad=0.9):
+    """Mayor dt estable (tipo CFL) para la frecuencia propia más alta del sistema"""
+    validar_integrador(integrador)
+    if omega_max <= 0:
+        return math.inf
+    return seguridad * LIMITE_ESTABILIDAD[integrador] / omega_max
+
+
+def subpasos_estables(dt, omega_max, integrador, seguridad=0.9):
+    """En cuántos subpasos hay que partir dt para que cada uno sea estable.
+    
+    Los integradores sin límite de estabilidad (implícitos y modal) dan 1.
+    """
+    if integrador not in LIMITE_ESTABILIDAD:
+        return 1
+    return max(1, math.ceil(dt / dt_estable(omega_max, integrador, seguridad)))
+
+
+def paso_verlet(x, v, aceleracion, gamma, h):
+    """Velocity Verlet (kick-drift-kick); el amortiguamiento entra semi-implícito"""
+    v_medio = v + 0.5 * h * (aceleracion(x) - gamma * v)
+    x_nuevo = x + h * v_medio
+    v_nuevo = (v_medio + 0.5 * h * aceleracion(x_nuevo)) / (1 + 0.5 * h * gamma)
+    return x_nuevo, v_nuevo
+
+
+def paso_leapfrog(x, v, aceleracion, gamma, h):
+    """Leapfrog drift-kick-drift: segundo orden con una sola evaluación por paso"""
+    x_medio = x + 0.5 * h * v
+    v_nuevo = (v * (1 - 0.5 * h * gamma) + h * aceleracion(x_medio)) / (1 + 0.5 * h * gamma)
+    return x_medio + 0.5 * h * v_nuevo, v_nuevo
+
+
+def paso_rk4(x, v, aceleracion, gamma, h):
+    """Runge-Kutta clásico de cuarto orden sobre el sistema (x, v)"""
+    k1x, k1v = v, aceleracion(x) - gamma * v
+    x2, v2 = x + 0.5 * h * k1x, v + 0.5 * h * k1v
+    k2x, k2v = v2, aceleracion(x2) - gamma * v2
+    x3, v3 = x + 0.5 * h * k2x, v + 0.5 * h * k2v
+    k3x, k3v = v3, aceleracion(x3) - gamma * v3
+    x4, v4 = x + h * k3x, v + h * k3v
+    k4x, k4v = v4, aceleracion(x4) - gamma * v4
+    return (x + h / 6 * (k1x + 2 * k2x + 2 * k3x + k4x),
+            v + h / 6 * (k1v + 2 * k2v + 2 * k3v + k4v))
+
+
+PASOS = {'verlet': paso_verlet, 'leapfrog': paso_leapfrog, 'rk4': paso_rk4}
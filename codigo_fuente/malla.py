@@ -0,0 +1,252 @@
+"""Mallas no uniformes y adaptativas para la superficie de v3.
+
+En la malla uniforme la tensión entre vecinos es T (y[i+1] - y[i]), con la
+escala de longitud implícita en el espaciado. Con separaciones d distintas,
+cada par se pondera por espaciado² / (d ancho), donde el ancho de una
+partícula es la mitad de sus dos separaciones (la separación entera en los
+extremos): la misma ecuación continua y'' = T espaciado² y_xx - g y, y con
+separaciones iguales al espaciado se recupera la malla uniforme. El espaciado
+es el de la malla con la que se creó el motor y fija la física; agregar o
+quitar partículas solo cambia la resolución.
+
+La adaptación estima en cada intervalo el error de interpolar linealmente el
+desplazamiento y la velocidad (esta llevada a metros dividiéndola por
+sqrt(g / densidad)): d² |y''| / 8. Los intervalos con error sobre `tolerancia`
+y sus vecinos se parten al medio; las partículas cuyos dos intervalos quedan
+bajo tolerancia / 4 se quitan (una sí y una no), sin pasar de las separaciones
+mínima y máxima. Así el frente de una gota o un tsunami queda con partículas
+densas y el agua calma con pocas.
+
+Uso:
+    motor = MotorPerfil(n_particulas=80)
+    motor.adaptar(tolerancia=1e-3, cada=10)
+    python malla.py --tiempo 4 --fino 8 --tolerancia 1e-4
+"""
+import argparse
+import time
+
+import numpy as np
+
+from integradores import INTEGRADORES
+
+# Error de interpolación (m) sobre el que se parte un intervalo
+TOLERANCIA = 1e-3
+# Pasos entre adaptaciones
+CADA = 10
+# Separaciones mínima y máxima, en múltiplos del espaciado
+SEPARACION_MINIMA = 1 / 8
+SEPARACION_MAXIMA = 4
+# Diferencia relativa con el espaciado por debajo de la cual la malla es uniforme
+HOLGURA_UNIFORME = 1e-9
+
+
+def anchos(x):
+    """Ancho de cada partícula: la mitad de sus dos separaciones (la entera en los extremos)"""
+    separaciones = np.diff(x)
+    ancho = np.empty_like(x)
+    ancho[1:-1] = (separaciones[:-1] + separaciones[1:]) / 2
+    ancho[0], ancho[-1] = separaciones[0], separaciones[-1]
+    return ancho
+
+
+def geometria(x, espaciado, dtype):
+    """(acople del primero de cada par, acople del segundo, pesos), o None si x es uniforme.
+
+    Los acoples multiplican la tensión de cada par (i, i+1) al sumarla a i y a
+    i+1; los pesos (ancho / espaciado) ponderan cada partícula en la energía.
+    """
+    separaciones = np.diff(x)
+    if np.all(np.abs(separaciones - espaciado) <= HOLGURA_UNIFORME * espaciado):
+        return None
+    ancho = anchos(x)
+    return ((espaciado**2 / (separaciones * ancho[:-1])).astype(dtype),
+            (espaciado**2 / (separaciones * ancho[1:])).astype(dtype),
+            (ancho / espaciado).astype(dtype))
+
+
+def validar_malla(x):
+    """x como arreglo float64, si es creciente, empieza en 0 y tiene al menos 3 puntos"""
+    x = np.asarray(x, dtype=float)
+    if x.ndim != 1 or len(x) < 3:
+        raise ValueError(f"La malla necesita al menos 3 partículas, no {x.shape}")
+    if x[0] != 0 or np.any(np.diff(x) <= 0):
+        raise ValueError("x_particulas debe empezar en 0 y ser estrictamente creciente")
+    return x
+
+
+def curvatura(x, f):
+    """Segunda derivada de f en los nodos interiores (0 en los extremos)"""
+    pendientes = np.diff(f) / np.diff(x)
+    segunda = np.zeros_like(f)
+    segunda[1:-1] = 2 * np.diff(pendientes) / (x[2:] - x[:-2])
+    return segunda
+
+
+def errores(x, campos):
+    """Error de interpolación lineal d² |f''| / 8 de cada intervalo, el peor de los campos"""
+    separaciones = np.diff(x)
+    error = np.zeros_like(separaciones)
+    for f in campos:
+        segunda = np.abs(curvatura(x, f))
+        error = np.maximum(error, separaciones**2 / 8 * np.maximum(segunda[:-1], segunda[1:]))
+    return error
+
+
+class Adaptacion:
+    """Parte y une intervalos de la malla según el error de interpolación"""
+
+    def __init__(self, tolerancia=TOLERANCIA, cada=CADA, separacion_minima=None,
+                 separacion_maxima=None):
+        if tolerancia <= 0:
+            raise ValueError(f"La tolerancia debe ser positiva: {tolerancia}")
+        if cada < 1:
+            raise ValueError(f"cada debe ser al menos 1: {cada}")
+        self.tolerancia = tolerancia
+        self.cada = cada
+        self.separacion_minima = separacion_minima
+        self.separacion_maxima = separacion_maxima
+        # Pasos dados desde que se activó; se adapta cada `cada`
+        self.pasos = 0
+
+    def ajustes(self):
+        """Parámetros y pasos dados, para guardarlos en una instantánea"""
+        return {'tolerancia': self.tolerancia, 'cada': self.cada,
+                'separacion_minima': self.separacion_minima,
+                'separacion_maxima': self.separacion_maxima, 'pasos': self.pasos}
+
+    def limites(self, espaciado):
+        """(separación mínima, separación máxima) en metros"""
+        return (self.separacion_minima or SEPARACION_MINIMA * espaciado,
+                self.separacion_maxima or SEPARACION_MAXIMA * espaciado)
+
+    def nueva_malla(self, x, campos, indicadores, espaciado, fijas=0):
+        """(x nuevo, campos interpolados) o None si la malla no cambia.
+
+        `indicadores` son los campos en metros que deciden dónde refinar;
+        `campos` se interpolan a la malla nueva (las partículas que quedan
+        conservan sus valores exactos). Las `fijas` partículas de cada extremo
+        no se parten ni se quitan.
+        """
+        minima, maxima = self.limites(espaciado)
+        separaciones = np.diff(x)
+        error = errores(x, indicadores)
+
+        # Partir los intervalos con error alto y sus vecinos, para adelantarse al frente
+        alto = error > self.tolerancia
+        alto[1:] |= error[:-1] > self.tolerancia
+        alto[:-1] |= error[1:] > self.tolerancia
+        partir = alto & (separaciones / 2 >= minima)
+
+        # Quitar partículas interiores con sus dos intervalos en calma, una sí y una no
+        calma = error < self.tolerancia / 4
+        quitar = np.zeros(len(x), dtype=bool)
+        quitar[1:-1] = calma[:-1] & calma[1:] & (separaciones[:-1] + separaciones[1:] <= maxima)
+        candidatos = np.flatnonzero(quitar)
+        if len(candidatos):
+            inicio_racha = np.r_[True, np.diff(candidatos) > 1]
+            racha = candidatos[inicio_racha][np.cumsum(inicio_racha) - 1]
+            quitar[:] = False
+            quitar[candidatos[(candidatos - racha) % 2 == 0]] = True
+        if fijas:
+            partir[:fijas - 1] = partir[len(x) - fijas:] = False
+            quitar[:fijas] = quitar[len(x) - fijas:] = False
+
+        if not partir.any() and not quitar.any():
+            return None
+
+        # Puntos medios con la corrección de curvatura (interpolación de segundo orden)
+        medios = (x[:-1] + x[1:])[partir] / 2
+        nuevos_campos = []
+        for f in campos:
+            segunda = curvatura(x, f)
+            medio = (f[:-1] + f[1:]) / 2 - separaciones**2 / 8 * (segunda[:-1] + segunda[1:]) / 2
+            nuevos_campos.append(np.insert(f, np.flatnonzero(partir) + 1, medio[partir])[
+                ~np.insert(quitar, np.flatnonzero(partir) + 1, False)])
+        x_nuevo = np.insert(x, np.flatnonzero(partir) + 1, medios)[
+            ~np.insert(quitar, np.flatnonzero(partir) + 1, False)]
+        return x_nuevo, nuevos_campos
+
+
+def gota_suave(motor, posicion, amplitud, sigma):
+    """Hundimiento gaussiano sin recortar, evaluado en la malla actual (la 'gota' de
+    MotorPerfil corta la gaussiana en `ancho` y ese escalón no converge al refinar)"""
+    forma = np.exp(-(motor.x_particulas - posicion)**2 / sigma**2)
+    motor.y_particulas = (motor.y_equilibrio - amplitud * forma).astype(motor.dtype)
+    motor.velocidades = np.zeros_like(motor.y_particulas)
+
+
+def comparar_adaptacion(tiempo=4.0, n=80, fino=8, tolerancia=1e-4, sigma=0.3,
+                        integrador='leapfrog'):
+    """Gota angosta en la malla uniforme de n partículas, en una `fino` veces más densa y
+    en la adaptativa, contra una 2 `fino` veces más densa.
+
+    Todas comparten el espaciado de la de n partículas (la misma física) y el
+    paso estable de la más densa. La adaptativa parte de n partículas, se
+    refina antes de empezar y no baja de la separación de la referencia.
+    Devuelve filas de (malla, partículas media, partículas máx., error máx.
+    contra la referencia, segundos).
+    """
+    from motores import MotorPerfil
+
+    base = MotorPerfil(n_particulas=n, capacidad_historial=1)
+    longitud, espaciado = base.longitud, base.espaciado
+
+    def uniforme(factor):
+        return MotorPerfil(x_particulas=np.linspace(0, longitud, factor * (n - 1) + 1),
+                           espaciado=espaciado, capacidad_historial=1, integrador=integrador)
+
+    casos = {'uniforme': uniforme(1), f'uniforme x{fino}': uniforme(fino),
+             'adaptativa': MotorPerfil(n_particulas=n, capacidad_historial=1,
+                                       integrador=integrador),
+             f'referencia x{2 * fino}': uniforme(2 * fino)}
+    adaptativa = casos['adaptativa']
+    adaptativa.adaptar(tolerancia, separacion_minima=espaciado / (2 * fino))
+    dt = casos[f'referencia x{2 * fino}'].dt_estable() / 2
+    resultados = {}
+    for nombre, motor in casos.items():
+        motor.dt = dt
+        gota_suave(motor, longitud / 2, 1.0, sigma)
+        while motor is adaptativa and motor.adaptar_malla():
+            gota_suave(motor, longitud / 2, 1.0, sigma)
+        particulas = []
+        inicio = time.perf_counter()
+        for _ in range(round(tiempo / dt)):
+            motor.paso_simulacion()
+            particulas.append(motor.n_particulas)
+        resultados[nombre] = (motor, particulas, time.perf_counter() - inicio)
+
+    referencia = resultados[f'referencia x{2 * fino}'][0]
+    filas = []
+    for nombre, (motor, particulas, segundos) in resultados.items():
+        superficie = np.interp(referencia.x_particulas, motor.x_particulas,
+                               motor.y_particulas - motor.y_equilibrio)
+        error = np.max(np.abs(superficie - (referencia.y_particulas - referencia.y_equilibrio)))
+        filas.append((nombre, float(np.mean(particulas)), max(particulas), float(error), segundos))
+    return filas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tiempo', type=float, default=4.0, help="tiempo simulado (s)")
+    parser.add_argument('--n', type=int, default=80, help="partículas de la malla uniforme")
+    parser.add_argument('--fino', type=int, default=8,
+                        help="refinamiento de la malla uniforme densa (la referencia, el doble)")
+    parser.add_argument('--tolerancia', type=float, default=1e-4,
+                        help="error de interpolación (m) de la malla adaptativa")
+    parser.add_argument('--sigma', type=float, default=0.3, help="ancho de la gota (m)")
+    parser.add_argument('--integrador', default='leapfrog', choices=INTEGRADORES)
+    args = parser.parse_args()
+
+    try:
+        filas = comparar_adaptacion(args.tiempo, args.n, args.fino, args.tolerancia, args.sigma,
+                                    args.integrador)
+    except ValueError as error:
+        parser.error(str(error))
+    print(f"{'malla':>15} {'partículas':>11} {'máx.':>6} {'error (m)':>10} {'segundos':>9}")
+    for nombre, media, maximo, error, segundos in filas:
+        print(f"{nombre:>15} {media:11.0f} {maximo:6d} {error:10.2e} {segundos:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1168 @@
+"""Núcleos de simulación sin interfaz gráfica.
+
+Cada motor guarda el estado de las partículas y sabe inicializarlo, perturbarlo
+y avanzarlo en el tiempo, sin depender de matplotlib. Las ventanas de v1, v2 y
+v3 heredan de estas clases y solo añaden figuras y controles, de modo que la
+misma física corre en nodos sin pantalla (ver simular.py).
+
+El integrador temporal se elige con `integrador` (ver integradores.py). Con
+dt='estable' se usa el mayor paso estable del esquema; con cualquier dt, si un
+cambio de parámetros (p. ej. los sliders) lo vuelve inestable, cada paso se
+parte en los subpasos necesarios en lugar de divergir.
+
+Con dtype='float32' el estado, los historiales (salvo los tiempos) y los
+temporales del paso van en simple precisión: la mitad de memoria y de ancho de
+banda. Un parámetro np.float64 (el valor de un slider de matplotlib, p. ej.)
+sí promovería los arreglos a float64, así que al empezar cada paso los
+PARAMETROS del motor se pasan a float de Python, que numpy convierte al dtype
+del estado. precision.py mide cuánto se aleja de float64.
+"""
+import math
+
+import numpy as np
+
+from absorcion import GROSOR, ORDEN, Esponja, crear_esponja
+from cronometro import CRONOMETRO_APAGADO
+from hilos import RepartoHilos, euler_por_bloques, por_bloques
+from historial import CAPACIDAD_HISTORIAL, BufferCircular
+from implicito import IMPLICITOS, IntegradorImplicito, rigidez_perfil, rigidez_red
+from integradores import INTEGRADORES, PASOS, dt_estable, subpasos_estables, validar_integrador
+from malla import CADA, TOLERANCIA, Adaptacion, anchos, geometria, validar_malla
+from modal import SolucionModal
+from sellos import indice_cercano, sumar_sello_2d, ventana_1d, ventana_irregular
+
+
+PRECISIONES = ('float64', 'float32')
+
+
+def validar_precision(dtype):
+    """np.dtype de una de las PRECISIONES"""
+    if np.dtype(dtype).name not in PRECISIONES:
+        raise ValueError(f"Precisión no soportada: {dtype!r} (opciones: {PRECISIONES})")
+    return np.dtype(dtype)
+
+
+def parametros_como_float(motor):
+    """Pasa a float de Python los PARAMETROS del motor que sean escalares de numpy"""
+    for nombre in motor.PARAMETROS:
+        valor = getattr(motor, nombre, None)
+        if isinstance(valor, np.generic):
+            setattr(motor, nombre, float(valor))
+
+
+def espectro_frecuencia(muestras, intervalo):
+    """FFT de una serie muestreada cada `intervalo` segundos, solo frecuencias positivas.
+    
+    Opera sobre el último eje, así que también acepta un arreglo (B, T) de series.
+    Devuelve (frecuencias, amplitudes).
+    """
+    muestras = np.asarray(muestras)
+    fft = np.fft.fft(muestras)
+    freqs = np.fft.fftfreq(muestras.shape[-1], intervalo)
+    
+    # Solo frecuencias positivas
+    pos_mask = freqs > 0
+    return freqs[pos_mask], np.abs(fft[..., pos_mask])
+
+
+def aceleraciones_red(pos, pos0, k, masa):
+    """Aceleraciones de la red de v2 sobre campos (..., filas, columnas, 2).
+    
+    Sirve para la red completa o para una franja de filas contiguas: las filas
+    del borde de la franja se tratan como bordes libres (ver particion.py). Los
+    ejes iniciales, si los hay, son miembros de un conjunto (ver conjunto.py), y
+    k puede traer un valor por miembro.
+    """
+    aceleraciones = np.zeros_like(pos)
+    
+    # Resortes horizontales: columna c -> c+1
+    deformacion = (pos[..., 1:, :] - pos[..., :-1, :]) - (pos0[:, 1:] - pos0[:, :-1])
+    fuerza = k * deformacion / masa
+    aceleraciones[..., 1:, :] -= fuerza     # vecino izquierdo
+    aceleraciones[..., :-1, :] += fuerza    # vecino derecho
+    
+    # Resortes verticales: fila f -> f+1
+    deformacion = (pos[..., 1:, :, :] - pos[..., :-1, :, :]) - (pos0[1:] - pos0[:-1])
+    fuerza = k * deformacion / masa
+    aceleraciones[..., 1:, :, :] -= fuerza        # vecino de abajo
+    aceleraciones[..., :-1, :, :] += fuerza       # vecino de arriba
+    
+    return aceleraciones
+
+
+def fuerzas_perfil(y, v, y_equilibrio, gravedad, tension_superficial, viscosidad, acoples=None):
+    """Gravedad, tensión y viscosidad de v3 sobre la superficie o un segmento contiguo.
+    
+    En una malla no uniforme, `acoples` son los pesos de la tensión de cada par
+    para su primera y su segunda partícula (ver malla.py). Con y de forma
+    (B, n), cada fila es un miembro de un conjunto (ver conjunto.py) y los
+    parámetros pueden ser columnas (B, 1).
+    """
+    # Fuerza gravitacional (restauradora hacia equilibrio)
+    fuerza_gravedad = -gravedad * (y - y_equilibrio)
+    
+    # Fuerza de tensión superficial (interacción con vecinos)
+    tension = tension_superficial * (y[..., 1:] - y[..., :-1])
+    fuerza_tension = np.zeros_like(y)
+    if acoples is None:
+        fuerza_tension[..., 1:] -= tension     # vecino izquierdo
+        fuerza_tension[..., :-1] += tension    # vecino derecho
+    else:
+        fuerza_tension[..., 1:] -= tension * acoples[1]
+        fuerza_tension[..., :-1] += tension * acoples[0]
+    
+    # Fuerza de viscosidad (proporcional a la velocidad)
+    fuerza_viscosidad = -viscosidad * v
+    
+    return fuerza_gravedad + fuerza_tension + fuerza_viscosidad
+
+
+class MotorResortes:
+    """Red 2D de resortes no lineales de v1 (longitud natural = espaciado)"""
+    # Motores de fuerza disponibles para paso_simulacion
+    MOTORES = ('enlaces', 'bucle')
+    # damping es la pérdida de velocidad por paso a este dt (el original)
+    DT_AMORTIGUAMIENTO = 0.05
+    # Lo que guarda una instantánea (ver instantanea.py), además de n, motor, integrador y dt
+    TAMANO = 'n'
+    ESTADO = ('posiciones', 'velocidades', 'tiempo', 'k', 'damping')
+    HISTORIALES = ('amplitudes', 'tiempos')
+    # Escalares que entran en el paso (ver parametros_como_float)
+    PARAMETROS = ('k', 'damping', 'masa', 'dt')
+    # Tiempos por fase de cada paso (ver cronometro.py); apagado no mide nada
+    cronometro = CRONOMETRO_APAGADO
+    
+    def __init__(self, n=40, motor='enlaces', capacidad_historial=CAPACIDAD_HISTORIAL,
+                 integrador='euler', dt=None, dtype='float64'):
+        if motor not in self.MOTORES:
+            raise ValueError(f"Motor desconocido: {motor!r} (opciones: {self.MOTORES})")
+        validar_integrador(integrador)
+        self.dtype = validar_precision(dtype)
+        
+        # Configuración de red
+        self.n = n
+        self.motor = motor
+        self.integrador = integrador
+        self.espaciado = 0.25
+        self.masa = 1.0
+        self.k = 20.0
+        self.damping = 0.05
+        self.dt = self.DT_AMORTIGUAMIENTO if dt is None else dt
+        if self.dt == 'estable':
+            self.dt = self.dt_estable()
+        
+        self.tiempo = 0
+        self.inicializar_sistema()
+        
+        # Datos para análisis (últimas capacidad_historial muestras)
+        self.amplitudes = BufferCircular(capacidad_historial, dtype=self.dtype)
+        self.tiempos = BufferCircular(capacidad_historial)
+    
+    def inicializar_sistema(self):
+        """Inicializa las partículas y los resortes de la red"""
+        x_coords = np.linspace(0, (self.n - 1) * self.espaciado, self.n)
+        y_coords = np.linspace(0, (self.n - 1) * self.espaciado, self.n)
+        X, Y = np.meshgrid(x_coords, y_coords)
+        self.posiciones_base = np.stack((X.flatten(), Y.flatten()), axis=-1).astype(self.dtype)
+        self.n_particulas = self.posiciones_base.shape[0]
+        
+        self.posiciones = self.posiciones_base.copy()
+        self.velocidades = np.zeros_like(self.posiciones)
+        self.indice_central = (self.n // 2) * self.n + (self.n // 2)
+        self.centro = self.posiciones[self.indice_central].copy()
+        
+        # Los vecinos solo los necesita el motor 'bucle'; se calculan al primer uso
+        self.vecinos = None
+        self.construir_enlaces()
+    
+    def calcular_vecinos(self):
+        """Calcula los vecinos directos de cada partícula"""
+        self.vecinos = []
+        for i in range(self.n_particulas):
+            fila_i = i // self.n
+            col_i = i % self.n
+            conexiones = []
+            for dx, dy in [(-1,0),(1,0),(0,-1),(0,1)]:
+                f, c = fila_i + dy, col_i + dx
+                if 0 <= f < self.n and 0 <= c < self.n:
+                    j = f * self.n + c
+                    conexiones.append(j)
+            self.vecinos.append(conexiones)
+    
+    def construir_enlaces(self):
+        """Guarda los resortes como pares (i, j), cada uno una sola vez"""
+        tipo = np.int32 if self.n_particulas < 2**31 else np.int64
+        indices = np.arange(self.n_particulas, dtype=tipo).reshape(self.n, self.n)
+        self.enlaces_i = np.concatenate((indices[:, :-1].ravel(), indices[:-1, :].ravel()))
+        self.enlaces_j = np.concatenate((indices[:, 1:].ravel(), indices[1:, :].ravel()))
+    
+    def aplicar_perturbacion(self, fuerza):
+        """Reinicia la red y da un impulso vertical gaussiano alrededor del centro"""
+        self.posiciones = self.posiciones_base.copy()
+        self.velocidades = np.zeros_like(self.posiciones)
+        self.tiempo = 0
+        self.amplitudes.clear()
+        self.tiempos.clear()
+        # Sello gaussiano exp(-d²) en el disco d < 1.5 (ver sellos.py)
+        sumar_sello_2d(self.velocidades.reshape(self.n, self.n, 2)[..., 1], self.centro,
+                       self.espaciado, 1.5, 1.0, fuerza)
+    
+    def frecuencia_maxima(self):
+        """Cota de la frecuencia propia más alta de la red: sqrt(8 k / m)"""
+        return math.sqrt(8 * self.k / self.masa)
+    
+    def dt_estable(self, integrador=None):
+        """Mayor dt estable para el integrador (por defecto, el del motor)"""
+        return dt_estable(self.frecuencia_maxima(), integrador or self.integrador)
+    
+    def calcular_aceleraciones(self, posiciones=None):
+        """Aceleraciones de los resortes con el motor elegido"""
+        if self.motor == 'bucle':
+            return self.calcular_aceleraciones_bucle(posiciones)
+        return self.calcular_aceleraciones_enlaces(posiciones)
+    
+    def calcular_aceleraciones_bucle(self, posiciones=None):
+        """Aceleraciones recorriendo las listas de vecinos, una norma por resorte"""
+        if self.vecinos is None:
+            self.calcular_vecinos()
+        if posiciones is None:
+            posiciones = self.posiciones
+        
+        aceleraciones = np.zeros_like(posiciones)
+        for i in range(self.n_particulas):
+            for j in self.vecinos[i]:
+                delta = posiciones[j] - posiciones[i]
+                dist = np.linalg.norm(delta)
+                if dist > 0:
+                    direccion = delta / dist
+                    fuerza = self.k * (dist - self.espaciado)
+                    aceleraciones[i] += fuerza * direccion / self.masa
+        return aceleraciones
+    
+    def calcular_aceleraciones_enlaces(self, posiciones=None):
+        """Aceleraciones de todos los resortes en una pasada sobre los arreglos de enlaces"""
+        if posiciones is None:
+            posiciones = self.posiciones
+        # Longitud de todos los resortes en una sola pasada
+        delta = posiciones[self.enlaces_j] - posiciones[self.enlaces_i]
+        dist = np.sqrt(delta[:, 0]**2 + delta[:, 1]**2)
+        # Fuerza no lineal k (dist - espaciado) a lo largo de cada resorte; cero si colapsa
+        escala = np.zeros_like(dist)
+        np.divide(self.k * (dist - self.espaciado), dist * self.masa, out=escala, where=dist > 0)
+        fuerza = delta * escala[:, None]
+        # Repartir: cada resorte tira de i hacia j y de j hacia i
+        if self.dtype != np.float64:
+            return self.repartir_en_rejilla(fuerza)
+        aceleraciones = np.empty_like(posiciones)
+        for eje in range(2):
+            aceleraciones[:, eje] = (
+                np.bincount(self.enlaces_i, fuerza[:, eje], minlength=self.n_particulas)
+                - np.bincount(self.enlaces_j, fuerza[:, eje], minlength=self.n_particulas))
+        return aceleraciones
+    
+    def repartir_en_rejilla(self, fuerza):
+        """Como los bincount de calcular_aceleraciones_enlaces, sumando sobre la rejilla.
+        
+        bincount siempre acumula en float64; aquí los enlaces horizontales y
+        verticales (en el orden de construir_enlaces) se suman por rebanadas y
+        no salen de la precisión del estado.
+        """
+        n = self.n
+        horizontales = n * (n - 1)
+        aceleraciones = np.zeros((n, n, 2), dtype=fuerza.dtype)
+        fuerza_h = fuerza[:horizontales].reshape(n, n - 1, 2)
+        aceleraciones[:, :-1] += fuerza_h
+        aceleraciones[:, 1:] -= fuerza_h
+        fuerza_v = fuerza[horizontales:].reshape(n - 1, n, 2)
+        aceleraciones[:-1] += fuerza_v
+        aceleraciones[1:] -= fuerza_v
+        return aceleraciones.reshape(self.n_particulas, 2)
+    
+    def campo(self):
+        """Vista (n, n, 2) de las posiciones, el campo que graba trayectoria.py"""
+        return self.posiciones.reshape(self.n, self.n, 2)
+    
+    def paso_simulacion(self):
+        """Ejecuta un paso de la simulación"""
+        parametros_como_float(self)
+        cronometro = self.cronometro
+        cronometro.iniciar_paso()
+        aceleracion = cronometro.envolver('fuerzas', self.calcular_aceleraciones, 'integracion')
+        subpasos = subpasos_estables(self.dt, self.frecuencia_maxima(), self.integrador)
+        h = self.dt / subpasos
+        if self.integrador == 'euler':
+            factor = (1 - self.damping) ** (1 / subpasos)
+            for _ in range(subpasos):
+                aceleraciones = aceleracion()
+                self.velocidades += aceleraciones * h
+                self.velocidades *= factor
+                self.posiciones += self.velocidades * h
+        else:
+            gamma = -math.log(1 - self.damping) / self.DT_AMORTIGUAMIENTO
+            for _ in range(subpasos):
+                self.posiciones, self.velocidades = PASOS[self.integrador](
+                    self.posiciones, self.velocidades, aceleracion, gamma, h)
+        self.tiempo += self.dt
+        cronometro.vuelta('integracion')
+        
+        # Amplitud vertical del centro
+        amp = self.posiciones[self.indice_central][1] - self.centro[1]
+        self.amplitudes.append(amp)
+        self.tiempos.append(self.tiempo)
+        cronometro.vuelta('historial')
+
+
+class MotorOndas:
+    """Red 2D lineal de v2 con bordes libres"""
+    # Motores de fuerza disponibles para paso_simulacion ('hilos': ver hilos.py)
+    MOTORES = ('vectorizado', 'bucle', 'hilos')
+    # El sistema es lineal, así que además admite los integradores implícitos
+    INTEGRADORES = INTEGRADORES + IMPLICITOS
+    # damping es la pérdida de velocidad por paso a este dt (el original)
+    DT_AMORTIGUAMIENTO = 0.03
+    # Lo que guarda una instantánea (ver instantanea.py), además de n, motor, integrador y dt
+    TAMANO = 'n'
+    ESTADO = ('posiciones', 'velocidades', 'tiempo', 'frame_count', 'pausado', 'k', 'damping',
+              'fuente_activa', 'frecuencia_fuente', 'amplitud_fuente', 'capas_absorbentes')
+    HISTORIALES = ('amplitudes_centro', 'amplitudes_borde', 'tiempos')
+    # Escalares que entran en el paso (ver parametros_como_float)
+    PARAMETROS = ('k', 'damping', 'masa', 'dt', 'frecuencia_fuente', 'amplitud_fuente')
+    # Tiempos por fase de cada paso (ver cronometro.py); apagado no mide nada
+    cronometro = CRONOMETRO_APAGADO
+    
+    def __init__(self, n=50, motor='vectorizado', capacidad_historial=CAPACIDAD_HISTORIAL,
+                 integrador='euler', dt=None, dtype='float64', hilos=None):
+        if motor not in self.MOTORES:
+            raise ValueError(f"Motor desconocido: {motor!r} (opciones: {self.MOTORES})")
+        validar_integrador(integrador, self.INTEGRADORES)
+        self.dtype = validar_precision(dtype)
+        self.implicito = (IntegradorImplicito(integrador, self.dtype)
+                          if integrador in IMPLICITOS else None)
+        
+        # Parámetros configurables
+        self.n = n
+        self.motor = motor
+        self.hilos = hilos  # Solo para motor='hilos'; None usa todos los núcleos
+        self.reparto = None
+        self.integrador = integrador
+        self.espaciado = 0.2
+        self.masa = 1.0
+        self.k = 25.0
+        self.damping = 0.02
+        # Capas absorbentes en los bordes (ver absorber); sin ellas, bordes libres
+        self.esponja = None
+        self.dt = self.DT_AMORTIGUAMIENTO if dt is None else dt
+        if self.dt == 'estable':
+            if self.implicito is not None:
+                raise ValueError(f"El integrador {integrador!r} no tiene límite de estabilidad; "
+                                 "indicar un dt numérico")
+            self.dt = self.dt_estable()
+        
+        # Control de simulación
+        self.pausado = False
+        self.tiempo = 0
+        self.frame_count = 0
+        
+        # Inicialización de la red
+        self.inicializar_sistema()
+        
+        # Datos para análisis (últimas capacidad_historial muestras)
+        self.amplitudes_centro = BufferCircular(capacidad_historial, dtype=self.dtype)
+        self.amplitudes_borde = BufferCircular(capacidad_historial, dtype=self.dtype)
+        self.tiempos = BufferCircular(capacidad_historial)
+        
+    def inicializar_sistema(self):
+        """Inicializa las posiciones y velocidades de las partículas"""
+        x_coords = np.linspace(0, (self.n - 1) * self.espaciado, self.n)
+        y_coords = np.linspace(0, (self.n - 1) * self.espaciado, self.n)
+        X, Y = np.meshgrid(x_coords, y_coords)
+        
+        self.posiciones_iniciales = np.stack((X.flatten(), Y.flatten()), axis=-1).astype(self.dtype)
+        self.posiciones = self.posiciones_iniciales.copy()
+        self.velocidades = np.zeros_like(self.posiciones)
+        self.n_particulas = self.posiciones.shape[0]
+        
+        # Índices importantes
+        self.indice_centro = (self.n // 2) * self.n + (self.n // 2)
+        self.indice_borde = (self.n - 1) * self.n + (self.n // 2)
+        
+        # Los vecinos solo los necesita el motor 'bucle'; se calculan al primer uso
+        self.vecinos = None
+        
+    def calcular_vecinos(self):
+        """Calcula los vecinos directos de cada partícula"""
+        self.vecinos = []
+        for i in range(self.n_particulas):
+            fila_i = i // self.n
+            col_i = i % self.n
+            conexiones = []
+            
+            # Vecinos directos (4-conectividad)
+            for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
+                f, c = fila_i + dy, col_i + dx
+                if 0 <= f < self.n and 0 <= c < self.n:
+                    j = f * self.n + c
+                    conexiones.append(j)
+            
+            self.vecinos.append(conexiones)
+    
+    def aplicar_perturbacion(self, tipo='pulso', centro=None, amplitud=3.0, ancho=1.5):
+        """Aplica diferentes tipos de perturbaciones"""
+        if centro is None:
+            centro = np.array([self.posiciones_iniciales[self.indice_centro, 0], 
+                             self.posiciones_iniciales[self.indice_centro, 1]])
+        
+        if tipo == 'pulso':
+            # Perturbación circular (pulso): sello gaussiano solo en el disco d < ancho
+            sumar_sello_2d(self.velocidades.reshape(self.n, self.n, 2)[..., 1], centro,
+                           self.espaciado, ancho, ancho / 2, amplitud)
+                    
+        elif tipo == 'senoidal':
+            # Fuente senoidal continua en el centro
+            self.fuente_activa = True
+            self.frecuencia_fuente = 0.5
+            self.amplitud_fuente = amplitud
+            
+        elif tipo == 'lineal':
+            # Perturbación lineal (frente de onda)
+            fila_centro = int(centro[1] / self.espaciado)
+            desde, hasta = max(0, fila_centro - 2), min(self.n, fila_centro + 3)
+            if desde < hasta:
+                factor = amplitud * np.exp(-np.abs(np.arange(desde, hasta) - fila_centro))
+                self.velocidades.reshape(self.n, self.n, 2)[desde:hasta, :, 1] += factor[:, None]
+    
+    def frecuencia_maxima(self):
+        """Frecuencia propia más alta de la red (cota): sqrt(8 k / m)"""
+        return math.sqrt(8 * self.k / self.masa)
+    
+    def velocidad_grupo_maxima(self):
+        """Mayor velocidad de grupo de la red, en partículas por segundo: sqrt(k / m)"""
+        return math.sqrt(self.k / self.masa)
+    
+    def absorber(self, lados=('izq', 'der', 'abajo', 'arriba'), grosor=GROSOR, intensidad=None,
+                 orden=ORDEN):
+        """Capas absorbentes en los bordes indicados (ver absorcion.py); lados=() las quita"""
+        self.esponja = crear_esponja((self.n, self.n), lados, grosor, intensidad, orden,
+                                     self.velocidad_grupo_maxima())
+    
+    @property
+    def capas_absorbentes(self):
+        """Ajustes de la esponja (None sin capas), como los guarda una instantánea"""
+        return None if self.esponja is None else self.esponja.ajustes()
+    
+    @capas_absorbentes.setter
+    def capas_absorbentes(self, ajustes):
+        self.esponja = None if ajustes is None else Esponja((self.n, self.n), **ajustes)
+    
+    def amortiguar_bordes(self, h):
+        """Amortiguamiento de las capas absorbentes, si las hay, tras un subpaso h"""
+        if self.esponja is not None:
+            self.esponja.amortiguar(self.velocidades.reshape(self.n, self.n, 2), h)
+    
+    def dt_estable(self, integrador=None):
+        """Mayor dt estable para el integrador (por defecto, el del motor)"""
+        integrador = integrador or self.integrador
+        if integrador in IMPLICITOS:
+            return math.inf
+        return dt_estable(self.frecuencia_maxima(), integrador)
+    
+    def calcular_aceleraciones(self, posiciones=None):
+        """Aceleraciones elásticas con el motor elegido"""
+        if self.motor == 'bucle':
+            return self.calcular_aceleraciones_bucle(posiciones)
+        if self.motor == 'hilos':
+            return self.calcular_aceleraciones_hilos(posiciones)
+        return self.calcular_aceleraciones_vectorizado(posiciones)
+    
+    def repartir(self):
+        """Bloques de filas de la red entre hilos (se crea al primer uso)"""
+        if self.reparto is None:
+            self.reparto = RepartoHilos(self.n, self.n * 2 * self.dtype.itemsize, self.hilos)
+        return self.reparto
+    
+    def calcular_aceleraciones_bucle(self, posiciones=None):
+        """Aceleraciones elásticas recorriendo partícula a partícula la lista de vecinos"""
+        if self.vecinos is None:
+            self.calcular_vecinos()
+        if posiciones is None:
+            posiciones = self.posiciones
+        
+        aceleraciones = np.zeros_like(posiciones)
+        
+        for i in range(self.n_particulas):
+            for j in self.vecinos[i]:
+                # Vector entre partículas
+                delta = posiciones[j] - posiciones[i]
+                delta_inicial = (self.posiciones_iniciales[j] - 
+                               self.posiciones_iniciales[i])
+                
+                # Deformación respecto a la posición de equilibrio
+                deformacion = delta - delta_inicial
+                
+                # Fuerza elástica proporcional a la deformación
+                fuerza = self.k * deformacion
+                aceleraciones[i] += fuerza / self.masa
+        
+        return aceleraciones
+    
+    def calcular_aceleraciones_vectorizado(self, posiciones=None):
+        """Aceleraciones elásticas sobre el campo (n, n, 2) completo, sin bucles de Python.
+        
+        Cada resorte horizontal y vertical se evalúa una sola vez como diferencia
+        entre filas/columnas contiguas y se reparte con signo opuesto a sus dos
+        extremos. Los bordes quedan libres porque las partículas de la orilla
+        simplemente no reciben el término del vecino que les falta. Los términos
+        se acumulan en el mismo orden que el motor 'bucle' (izquierda, derecha,
+        abajo, arriba), por lo que ambos motores dan resultados idénticos.
+        """
+        n = self.n
+        pos = (self.posiciones if posiciones is None else posiciones).reshape(n, n, 2)
+        pos0 = self.posiciones_iniciales.reshape(n, n, 2)
+        return aceleraciones_red(pos, pos0, self.k, self.masa).reshape(self.n_particulas, 2)
+    
+    def calcular_aceleraciones_hilos(self, posiciones=None):
+        """Las del motor vectorizado, por bloques de filas repartidos entre hilos"""
+        n = self.n
+        pos = (self.posiciones if posiciones is None else posiciones).reshape(n, n, 2)
+        pos0 = self.posiciones_iniciales.reshape(n, n, 2)
+        aceleraciones = por_bloques(
+            self.repartir(), np.empty_like(pos),
+            lambda inicio, fin: aceleraciones_red(pos[inicio:fin], pos0[inicio:fin], self.k, self.masa))
+        return aceleraciones.reshape(self.n_particulas, 2)
+    
+    def calcular_energia(self):
+        """Energía cinética más energía elástica de todos los resortes"""
+        n = self.n
+        pos = self.posiciones.reshape(n, n, 2)
+        pos0 = self.posiciones_iniciales.reshape(n, n, 2)
+        def_h = (pos[:, 1:] - pos[:, :-1]) - (pos0[:, 1:] - pos0[:, :-1])
+        def_v = (pos[1:] - pos[:-1]) - (pos0[1:] - pos0[:-1])
+        elastica = np.sum(def_h**2) + np.sum(def_v**2)
+        return 0.5 * self.masa * np.sum(self.velocidades**2) + 0.5 * self.k * elastica
+    
+    def campo(self):
+        """Vista (n, n, 2) de las posiciones, el campo que graba trayectoria.py"""
+        return self.posiciones.reshape(self.n, self.n, 2)
+    
+    def paso_simulacion(self):
+        """Ejecuta un paso de la simulación"""
+        if self.pausado:
+            return
+        parametros_como_float(self)
+        cronometro = self.cronometro
+        cronometro.iniciar_paso()
+        self.aplicar_fuente()
+        cronometro.vuelta('fuente')
+        
+        # Integración temporal, partiendo dt si los parámetros lo volvieron inestable
+        aceleracion = cronometro.envolver('fuerzas', self.calcular_aceleraciones, 'integracion')
+        subpasos = subpasos_estables(self.dt, self.frecuencia_maxima(), self.integrador)
+        h = self.dt / subpasos
+        if self.integrador == 'euler':
+            factor = (1 - self.damping) ** (1 / subpasos)  # Amortiguamiento
+            for _ in range(subpasos):
+                aceleraciones = aceleracion()
+                if self.motor == 'hilos':
+                    forma = (self.n, self.n, 2)
+                    euler_por_bloques(self.repartir(), self.posiciones.reshape(forma),
+                                      self.velocidades.reshape(forma),
+                                      aceleraciones.reshape(forma), h, factor)
+                else:
+                    self.velocidades += aceleraciones * h
+                    self.velocidades *= factor
+                    self.posiciones += self.velocidades * h
+                self.amortiguar_bordes(h)
+        elif self.implicito is not None:
+            # Se refactoriza solo si cambiaron k, damping o dt (p. ej. por un slider)
+            gamma = -math.log(1 - self.damping) / self.DT_AMORTIGUAMIENTO
+            self.implicito.preparar((self.k, self.masa, gamma, h),
+                                    lambda: rigidez_red(self.n, self.k, self.masa), gamma, h)
+            desplazamientos, self.velocidades = self.implicito.paso(
+                self.posiciones - self.posiciones_iniciales, self.velocidades)
+            self.posiciones = self.posiciones_iniciales + desplazamientos
+            self.amortiguar_bordes(h)
+        else:
+            gamma = -math.log(1 - self.damping) / self.DT_AMORTIGUAMIENTO
+            for _ in range(subpasos):
+                self.posiciones, self.velocidades = PASOS[self.integrador](
+                    self.posiciones, self.velocidades, aceleracion, gamma, h)
+                self.amortiguar_bordes(h)
+        
+        self.tiempo += self.dt
+        self.frame_count += 1
+        cronometro.vuelta('integracion')
+        
+        self.registrar_sondas()
+        cronometro.vuelta('historial')
+    
+    def aplicar_fuente(self):
+        """Impulso de la fuente senoidal en indice_centro, si está activa"""
+        if hasattr(self, 'fuente_activa') and self.fuente_activa:
+            fase = 2 * np.pi * self.frecuencia_fuente * self.tiempo
+            fuerza_fuente = self.amplitud_fuente * np.sin(fase)
+            self.velocidades[self.indice_centro][1] += fuerza_fuente * self.dt
+    
+    def registrar_sondas(self):
+        """Guarda las amplitudes de centro y borde para el análisis (cada 2 frames)"""
+        if self.frame_count % 2 == 0:
+            amp_centro = (self.posiciones[self.indice_centro][1] - 
+                         self.posiciones_iniciales[self.indice_centro][1])
+            amp_borde = (self.posiciones[self.indice_borde][1] - 
+                        self.posiciones_iniciales[self.indice_borde][1])
+            
+            self.amplitudes_centro.append(amp_centro)
+            self.amplitudes_borde.append(amp_borde)
+            self.tiempos.append(self.tiempo)
+    
+    def reiniciar(self):
+        """Devuelve la red al equilibrio y borra el historial"""
+        self.posiciones = self.posiciones_iniciales.copy()
+        self.velocidades = np.zeros_like(self.posiciones)
+        self.tiempo = 0
+        self.frame_count = 0
+        self.amplitudes_centro.clear()
+        self.amplitudes_borde.clear()
+        self.tiempos.clear()
+        self.fuente_activa = False
+
+
+class MotorPerfil:
+    """Superficie 1D de agua en un tanque (v3)"""
+    # Motores de fuerza disponibles para calcular_fuerzas ('hilos': ver hilos.py)
+    MOTORES = ('vectorizado', 'bucle', 'hilos')
+    # El sistema es lineal, así que además admite la solución exacta por modos
+    # y los integradores implícitos
+    INTEGRADORES = INTEGRADORES + ('modal',) + IMPLICITOS
+    # Lo que guarda una instantánea (ver instantanea.py), además de n, motor, integrador y dt
+    TAMANO = 'n_particulas'
+    ESTADO = ('y_particulas', 'velocidades', 'tiempo', 'pausado', 'tension_superficial',
+              'gravedad', 'viscosidad', 'densidad', 'pared_izq', 'pared_der',
+              'fuente_activa', 'pos_fuente', 'frecuencia', 'amplitud_fuente',
+              'x_particulas', 'longitud', 'espaciado', 'malla_inicial', 'n_inicial',
+              'capas_absorbentes', 'ajustes_adaptacion')
+    HISTORIALES = ('alturas_tiempo', 'tiempos', 'energias')
+    # Escalares que entran en el paso (ver parametros_como_float)
+    PARAMETROS = ('tension_superficial', 'gravedad', 'viscosidad', 'densidad', 'dt',
+                  'frecuencia', 'amplitud_fuente')
+    # Tiempos por fase de cada paso (ver cronometro.py); apagado no mide nada
+    cronometro = CRONOMETRO_APAGADO
+    
+    def __init__(self, n_particulas=80, motor='vectorizado',
+                 capacidad_historial=CAPACIDAD_HISTORIAL, integrador='euler', dt=None,
+                 dtype='float64', hilos=None, x_particulas=None, espaciado=None):
+        if motor not in self.MOTORES:
+            raise ValueError(f"Motor desconocido: {motor!r} (opciones: {self.MOTORES})")
+        validar_integrador(integrador, self.INTEGRADORES)
+        self.dtype = validar_precision(dtype)
+        self.implicito = (IntegradorImplicito(integrador, self.dtype)
+                          if integrador in IMPLICITOS else None)
+        
+        # Parámetros del sistema
+        self.n_particulas = n_particulas
+        self.motor = motor
+        self.hilos = hilos  # Solo para motor='hilos'; None usa todos los núcleos
+        self.reparto = None
+        self.integrador = integrador
+        self.longitud = 20.0
+        self.altura_equilibrio = 5.0
+        # Malla no uniforme opcional (ver malla.py); el espaciado fija la escala de la tensión
+        self.malla_inicial = None
+        if x_particulas is not None:
+            self.malla_inicial = validar_malla(x_particulas)
+            self.n_particulas = len(self.malla_inicial)
+            self.longitud = float(self.malla_inicial[-1])
+        self.n_inicial = self.n_particulas
+        self.espaciado = self.longitud / (self.n_particulas - 1) if espaciado is None else espaciado
+        self.malla = None
+        self.adaptacion = None
+        
+        # Parámetros físicos
+        self.tension_superficial = 15.0
+        self.gravedad = 9.8
+        self.viscosidad = 0.05
+        self.densidad = 1.0
+        self.dt = 0.02 if dt is None else dt
+        self.modal = None
+        # Capas absorbentes junto a las paredes (ver absorber)
+        self.esponja = None
+        
+        # Control de simulación
+        self.tiempo = 0
+        self.pausado = False
+        
+        # Inicializar sistema
+        self.inicializar_agua()
+        self.validar_malla_integrador()
+        # El paso estable depende de la malla
+        if self.dt == 'estable':
+            if integrador == 'modal' or self.implicito is not None:
+                raise ValueError(f"El integrador {integrador!r} no tiene límite de estabilidad; "
+                                 "indicar un dt numérico")
+            self.dt = self.dt_estable()
+        
+        # Datos para análisis (últimas capacidad_historial muestras)
+        self.alturas_tiempo = BufferCircular(capacidad_historial, dtype=self.dtype)
+        self.tiempos = BufferCircular(capacidad_historial)
+        self.energias = BufferCircular(capacidad_historial, dtype=self.dtype)
+        
+    def inicializar_agua(self):
+        """Inicializa las posiciones de las partículas de agua"""
+        # Posiciones horizontales fijas (las de x_particulas si se dio una malla)
+        if self.malla_inicial is None:
+            self.x_particulas = np.linspace(0, self.longitud, self.n_inicial)
+        else:
+            self.x_particulas = self.malla_inicial.copy()
+        self.n_particulas = len(self.x_particulas)
+        
+        # Alturas iniciales (superficie en equilibrio)
+        self.y_particulas = np.full(self.n_particulas, self.altura_equilibrio, dtype=self.dtype)
+        self.y_equilibrio = self.y_particulas.copy()
+        
+        # Velocidades verticales
+        self.velocidades = np.zeros(self.n_particulas, dtype=self.dtype)
+        
+        # Condiciones de frontera (paredes del tanque)
+        self.pared_izq = True
+        self.pared_der = True
+    
+    def malla_irregular(self):
+        """(acoples del primero y del segundo de cada par, pesos) de la malla, o None si es uniforme.
+        
+        Se recalcula si se reemplazó x_particulas (al adaptar la malla o al
+        restaurar una instantánea) o cambió el espaciado.
+        """
+        if (self.malla is None or self.malla[0] is not self.x_particulas
+                or self.malla[1] != self.espaciado):
+            self.malla = (self.x_particulas, self.espaciado,
+                          geometria(self.x_particulas, self.espaciado, self.dtype))
+        return self.malla[2]
+    
+    def validar_malla_integrador(self):
+        """La solución modal y los integradores implícitos suponen una malla uniforme"""
+        if self.malla_irregular() is not None and (self.integrador == 'modal'
+                                                   or self.implicito is not None):
+            raise ValueError(f"El integrador {self.integrador!r} requiere una malla uniforme")
+    
+    def cambiar_malla(self, x, campos=None):
+        """Pasa la superficie a la malla x.
+        
+        `campos` son (y_particulas, y_equilibrio, velocidades) ya sobre x; sin
+        ellos se interpolan linealmente.
+        """
+        x = validar_malla(x)
+        if campos is None:
+            campos = [np.interp(x, self.x_particulas, f)
+                      for f in (self.y_particulas, self.y_equilibrio, self.velocidades)]
+        self.y_particulas, self.y_equilibrio, self.velocidades = (
+            np.asarray(f, dtype=self.dtype) for f in campos)
+        self.x_particulas = x
+        self.n_particulas = len(x)
+        self.longitud = float(x[-1])
+        self.validar_malla_integrador()
+        self.ajustar_a_malla()
+    
+    def ajustar_a_malla(self):
+        """Rehace el reparto entre hilos y las capas absorbentes si cambió n_particulas"""
+        if self.reparto is not None and self.reparto.total != self.n_particulas:
+            self.reparto.cerrar()
+            self.reparto = None
+        if self.esponja is not None and self.esponja.forma != (self.n_particulas,):
+            esponja = self.esponja
+            self.esponja = crear_esponja((self.n_particulas,), esponja.lados, esponja.grosor,
+                                         esponja.intensidad, esponja.orden, None)
+    
+    def adaptar(self, tolerancia=TOLERANCIA, cada=CADA, separacion_minima=None,
+                separacion_maxima=None):
+        """Refina y afina la malla cada `cada` pasos según el error (ver malla.py).
+        
+        Con tolerancia=None se deja de adaptar y la malla queda como está.
+        """
+        if tolerancia is None:
+            self.adaptacion = None
+            return
+        if self.integrador == 'modal' or self.implicito is not None:
+            raise ValueError(f"El integrador {self.integrador!r} requiere una malla uniforme")
+        self.adaptacion = Adaptacion(tolerancia, cada, separacion_minima, separacion_maxima)
+    
+    @property
+    def ajustes_adaptacion(self):
+        """Parámetros y pasos de la adaptación (None sin ella), como los guarda una instantánea"""
+        return None if self.adaptacion is None else self.adaptacion.ajustes()
+    
+    @ajustes_adaptacion.setter
+    def ajustes_adaptacion(self, ajustes):
+        if ajustes is None:
+            self.adaptacion = None
+            return
+        ajustes = dict(ajustes)
+        pasos = ajustes.pop('pasos')
+        self.adaptacion = Adaptacion(**ajustes)
+        self.adaptacion.pasos = pasos
+    
+    def adaptar_malla(self):
+        """Una pasada de adaptación; devuelve True si la malla cambió"""
+        if self.integrador == 'modal' or self.implicito is not None:
+            raise ValueError(f"El integrador {self.integrador!r} requiere una malla uniforme")
+        adaptacion = self.adaptacion or Adaptacion()
+        escala = math.sqrt(self.gravedad / self.densidad)
+        # Las capas absorbentes conservan sus partículas (y su ancho en metros); se fijan
+        # ambos extremos para que la esponja siga cabiendo en la malla nueva
+        fijas = 0 if self.esponja is None else self.esponja.grosor
+        resultado = adaptacion.nueva_malla(
+            self.x_particulas, (self.y_particulas, self.y_equilibrio, self.velocidades),
+            (self.y_particulas - self.y_equilibrio, self.velocidades / escala), self.espaciado,
+            fijas)
+        if resultado is None:
+            return False
+        self.cambiar_malla(*resultado)
+        return True
+    
+    def aplicar_perturbacion(self, tipo='gota', posicion=None, amplitud=2.0, ancho=2.0):
+        """Aplica diferentes tipos de perturbaciones"""
+        if posicion is None:
+            posicion = self.longitud / 2  # Centro por defecto
+            
+        # Encontrar índice más cercano a la posición
+        idx_centro = indice_cercano(self.x_particulas, posicion)
+        
+        if tipo == 'gota':
+            # Simula una gota cayendo: sello gaussiano solo en |x - posicion| < ancho
+            if self.malla_irregular() is None:
+                ventana, factor = ventana_1d(posicion, self.espaciado, ancho, ancho,
+                                             self.n_particulas, self.dtype)
+            else:
+                ventana, factor = ventana_irregular(self.x_particulas, posicion, ancho, ancho,
+                                                    self.dtype)
+            self.y_particulas[ventana] -= amplitud * factor
+            self.velocidades[ventana] = -amplitud * factor * 2
+                    
+        elif tipo == 'onda_senoidal':
+            # Fuente senoidal continua
+            self.fuente_activa = True
+            self.pos_fuente = posicion
+            self.frecuencia = 1.0
+            self.amplitud_fuente = amplitud
+            
+        elif tipo == 'piston':
+            # Simulación de pistón en un extremo
+            if posicion < self.longitud / 2:  # Lado izquierdo
+                for i in range(min(5, self.n_particulas//4)):
+                    self.velocidades[i] = amplitud
+            else:  # Lado derecho
+                for i in range(max(self.n_particulas-5, 3*self.n_particulas//4), self.n_particulas):
+                    self.velocidades[i] = amplitud
+                    
+        elif tipo == 'tsunami':
+            # Levantamiento súbito del fondo (tsunami)
+            if self.malla_irregular() is None:
+                inicio = max(0, idx_centro - int(ancho))
+                fin = min(self.n_particulas, idx_centro + int(ancho))
+            else:
+                # Los mismos int(ancho) espaciados a cada lado, en metros
+                alcance = int(ancho) * self.espaciado
+                inicio, fin = (int(i) for i in np.searchsorted(
+                    self.x_particulas, (self.x_particulas[idx_centro] - alcance,
+                                        self.x_particulas[idx_centro] + alcance)))
+            self.y_particulas[inicio:fin] += amplitud
+            self.velocidades[inicio:fin] += amplitud * 0.5
+    
+    def frecuencia_maxima(self):
+        """Frecuencia propia más alta de la superficie: sqrt((g + 4 T) / densidad).
+        
+        En una malla no uniforme, 4 pasa a ser la mayor suma de acoples de una
+        partícula por dos (cota de Gershgorin).
+        """
+        irregular = self.malla_irregular()
+        if irregular is None:
+            return math.sqrt((self.gravedad + 4 * self.tension_superficial) / self.densidad)
+        suma = np.zeros(self.n_particulas)
+        suma[:-1] += irregular[0]
+        suma[1:] += irregular[1]
+        return math.sqrt((self.gravedad + 2 * self.tension_superficial * float(suma.max()))
+                         / self.densidad)
+    
+    def velocidad_grupo_maxima(self):
+        """Mayor velocidad de grupo de la superficie, en partículas por segundo.
+        
+        Con w(q)² = (g + 2 T (1 - cos q)) / densidad, es el máximo de
+        dw/dq = T sin q / (densidad w) sobre los números de onda q de la red.
+        """
+        q = np.linspace(0, np.pi, 1025)
+        w = np.sqrt((self.gravedad + 2 * self.tension_superficial * (1 - np.cos(q))) / self.densidad)
+        velocidad = float(np.max(self.tension_superficial * np.sin(q) / (self.densidad * w)))
+        if self.malla_irregular() is not None:
+            # En metros por segundo es la misma; en partículas, la de la menor separación
+            velocidad *= self.espaciado / float(np.min(np.diff(self.x_particulas)))
+        return velocidad
+    
+    def absorber(self, lados=('izq', 'der'), grosor=GROSOR, intensidad=None, orden=ORDEN):
+        """Capas absorbentes junto a las paredes indicadas (ver absorcion.py); lados=() las quita"""
+        self.esponja = crear_esponja((self.n_particulas,), lados, grosor, intensidad, orden,
+                                     self.velocidad_grupo_maxima())
+    
+    @property
+    def capas_absorbentes(self):
+        """Ajustes de la esponja (None sin capas), como los guarda una instantánea"""
+        return None if self.esponja is None else self.esponja.ajustes()
+    
+    @capas_absorbentes.setter
+    def capas_absorbentes(self, ajustes):
+        self.esponja = None if ajustes is None else Esponja((self.n_particulas,), **ajustes)
+    
+    def dt_estable(self, integrador=None):
+        """Mayor dt estable para el integrador (por defecto, el del motor)"""
+        integrador = integrador or self.integrador
+        if integrador == 'modal' or integrador in IMPLICITOS:
+            return math.inf
+        return dt_estable(self.frecuencia_maxima(), integrador)
+    
+    def solucion_modal(self):
+        """Propagador modal para los parámetros actuales (se rehace si cambiaron)"""
+        parametros = (self.tension_superficial, self.gravedad, self.viscosidad, self.densidad)
+        if self.modal is None or self.modal.parametros != parametros:
+            self.modal = SolucionModal.desde_motor(self, self.dtype)
+        return self.modal
+    
+    def avanzar_modal(self, t):
+        """Avanza el estado un tiempo t de forma exacta (sin fuentes), en O(N log N)"""
+        u, v = self.solucion_modal().avanzar(self.y_particulas - self.y_equilibrio,
+                                             self.velocidades, t)
+        self.y_particulas = self.y_equilibrio + u
+        self.velocidades = v
+    
+    def paso_implicito(self, h):
+        """Un paso implícito; se refactoriza solo si cambiaron los parámetros o h"""
+        gamma = self.viscosidad / self.densidad
+        clave = (self.tension_superficial, self.gravedad, self.densidad, gamma, h,
+                 self.pared_izq, self.pared_der)
+        self.implicito.preparar(
+            clave, lambda: rigidez_perfil(self.n_particulas, self.tension_superficial,
+                                          self.gravedad, self.densidad,
+                                          self.pared_izq, self.pared_der), gamma, h)
+        desplazamientos, self.velocidades = self.implicito.paso(
+            self.y_particulas - self.y_equilibrio, self.velocidades)
+        self.y_particulas = self.y_equilibrio + desplazamientos
+    
+    def saltar_a(self, t):
+        """Lleva la superficie directamente al tiempo t, sin dar pasos.
+        
+        No se registra en el historial: las series siguen con su muestreo dt.
+        """
+        if hasattr(self, 'fuente_activa') and self.fuente_activa:
+            raise ValueError("No se puede saltar en el tiempo con la fuente senoidal activa")
+        if self.esponja is not None:
+            raise ValueError("No se puede saltar en el tiempo con capas absorbentes")
+        if self.malla_irregular() is not None:
+            raise ValueError("Solo se puede saltar en el tiempo con una malla uniforme")
+        if t < self.tiempo:
+            raise ValueError(f"Solo se puede saltar hacia adelante (t={t} < {self.tiempo})")
+        self.avanzar_modal(t - self.tiempo)
+        self.tiempo = t
+    
+    def calcular_fuerzas(self, y=None, v=None):
+        """Calcula las fuerzas que actúan sobre cada partícula"""
+        if self.motor == 'bucle':
+            return self.calcular_fuerzas_bucle(y, v)
+        if self.motor == 'hilos':
+            return self.calcular_fuerzas_hilos(y, v)
+        return self.calcular_fuerzas_vectorizado(y, v)
+    
+    def repartir(self):
+        """Segmentos de la superficie entre hilos (se crea al primer uso)"""
+        if self.reparto is None:
+            self.reparto = RepartoHilos(self.n_particulas, self.dtype.itemsize, self.hilos)
+        return self.reparto
+    
+    def calcular_fuerzas_bucle(self, y=None, v=None):
+        """Suma gravedad, tensión y viscosidad partícula a partícula"""
+        y = self.y_particulas if y is None else y
+        v = self.velocidades if v is None else v
+        fuerzas = np.zeros_like(y)
+        irregular = self.malla_irregular()
+        
+        for i in range(self.n_particulas):
+            # Fuerza gravitacional (restauradora hacia equilibrio)
+            fuerza_gravedad = -self.gravedad * (y[i] - self.y_equilibrio[i])
+            
+            # Fuerza de tensión superficial (interacción con vecinos)
+            fuerza_tension = 0
+            if i > 0:  # Vecino izquierdo
+                diff_izq = (y[i-1] - y[i])
+                if irregular is not None:
+                    diff_izq *= irregular[1][i-1]
+                fuerza_tension += self.tension_superficial * diff_izq
+                
+            if i < self.n_particulas - 1:  # Vecino derecho
+                diff_der = (y[i+1] - y[i])
+                if irregular is not None:
+                    diff_der *= irregular[0][i]
+                fuerza_tension += self.tension_superficial * diff_der
+            
+            # Fuerza de viscosidad (proporcional a la velocidad)
+            fuerza_viscosidad = -self.viscosidad * v[i]
+            
+            fuerzas[i] = fuerza_gravedad + fuerza_tension + fuerza_viscosidad
+            
+        return fuerzas
+    
+    def calcular_fuerzas_vectorizado(self, y=None, v=None):
+        """Suma gravedad, tensión y viscosidad sobre todo el arreglo a la vez.
+        
+        La tensión de cada par (i, i+1) se evalúa una vez y se reparte con signo
+        opuesto a ambos vecinos, en el mismo orden que el motor 'bucle', de modo
+        que los dos motores coinciden bit a bit. Las paredes se siguen imponiendo
+        después en aplicar_condiciones_frontera.
+        """
+        y = self.y_particulas if y is None else y
+        v = self.velocidades if v is None else v
+        irregular = self.malla_irregular()
+        return fuerzas_perfil(y, v, self.y_equilibrio, self.gravedad, self.tension_superficial,
+                              self.viscosidad, None if irregular is None else irregular[:2])
+    
+    def calcular_fuerzas_hilos(self, y=None, v=None):
+        """Las del motor vectorizado, por segmentos repartidos entre hilos"""
+        y = self.y_particulas if y is None else y
+        v = self.velocidades if v is None else v
+        irregular = self.malla_irregular()
+        return por_bloques(
+            self.repartir(), np.empty_like(y),
+            lambda inicio, fin: fuerzas_perfil(
+                y[inicio:fin], v[inicio:fin], self.y_equilibrio[inicio:fin], self.gravedad,
+                self.tension_superficial, self.viscosidad,
+                None if irregular is None else (irregular[0][inicio:fin - 1],
+                                                irregular[1][inicio:fin - 1])))
+    
+    def aceleraciones_conservativas(self, y):
+        """Gravedad y tensión por unidad de masa en la configuración y (sin viscosidad).
+        
+        Las partículas pegadas a una pared no se aceleran, así los integradores
+        que evalúan estados intermedios no las mueven.
+        """
+        aceleraciones = self.calcular_fuerzas(y, np.zeros_like(y)) / self.densidad
+        if self.pared_izq:
+            aceleraciones[0] = 0
+        if self.pared_der:
+            aceleraciones[-1] = 0
+        return aceleraciones
+    
+    def calcular_energia(self):
+        """Energía cinética, gravitatoria y de tensión, en float64 sea cual sea el dtype.
+        
+        En una malla no uniforme cada partícula pesa ancho / espaciado y cada par
+        espaciado / separación, la energía que conservan las fuerzas con acoples
+        (ver malla.py); en la uniforme ambos pesos valen 1.
+        """
+        velocidades = self.velocidades.astype(float)
+        desplazamiento = self.y_particulas.astype(float) - self.y_equilibrio.astype(float)
+        if self.malla_irregular() is None:
+            pesos, rigideces = 1.0, 1.0
+        else:
+            pesos = anchos(self.x_particulas) / self.espaciado
+            rigideces = self.espaciado / np.diff(self.x_particulas)
+        return (0.5 * self.densidad * np.sum(pesos * velocidades**2)
+                + 0.5 * self.gravedad * np.sum(pesos * desplazamiento**2)
+                + 0.5 * self.tension_superficial * np.sum(rigideces * np.diff(desplazamiento)**2))
+    
+    def aplicar_condiciones_frontera(self):
+        """Aplica condiciones de frontera en las paredes"""
+        if self.pared_izq:
+            # Pared rígida izquierda (reflexión)
+            self.y_particulas[0] = self.y_equilibrio[0]
+            self.velocidades[0] = 0
+            
+        if self.pared_der:
+            # Pared rígida derecha (reflexión)
+            self.y_particulas[-1] = self.y_equilibrio[-1]
+            self.velocidades[-1] = 0
+    
+    def campo(self):
+        """Alturas de la superficie, el campo que graba trayectoria.py"""
+        return self.y_particulas
+    
+    def paso_simulacion(self):
+        """Ejecuta un paso de la simulación"""
+        if self.pausado:
+            return
+        parametros_como_float(self)
+        cronometro = self.cronometro
+        cronometro.iniciar_paso()
+            
+        # Aplicar fuente senoidal si está activa
+        if hasattr(self, 'fuente_activa') and self.fuente_activa:
+            idx_fuente = indice_cercano(self.x_particulas, self.pos_fuente)
+            fase = 2 * np.pi * self.frecuencia * self.tiempo
+            self.velocidades[idx_fuente] += self.amplitud_fuente * np.sin(fase) * self.dt
+        cronometro.vuelta('fuente')
+        
+        # Integración temporal, partiendo dt si los parámetros lo volvieron inestable
+        fuerzas = cronometro.envolver('fuerzas', self.calcular_fuerzas, 'integracion')
+        conservativas = cronometro.envolver('fuerzas', self.aceleraciones_conservativas,
+                                            'integracion')
+        subpasos = subpasos_estables(self.dt, self.frecuencia_maxima(), self.integrador)
+        h = self.dt / subpasos
+        for _ in range(subpasos):
+            if self.integrador == 'modal':
+                # Exacto: la fuente, si la hay, ya entró como impulso en la velocidad
+                self.avanzar_modal(h)
+            elif self.implicito is not None:
+                self.paso_implicito(h)
+            elif self.integrador == 'euler' and self.motor == 'hilos':
+                euler_por_bloques(self.repartir(), self.y_particulas, self.velocidades, fuerzas(),
+                                  h, masa=self.densidad)
+            elif self.integrador == 'euler':
+                # Euler semi-implícito: la viscosidad va dentro de las fuerzas
+                aceleraciones = fuerzas() / self.densidad
+                self.velocidades += aceleraciones * h
+                self.y_particulas += self.velocidades * h
+            else:
+                self.y_particulas, self.velocidades = PASOS[self.integrador](
+                    self.y_particulas, self.velocidades, conservativas,
+                    self.viscosidad / self.densidad, h)
+            cronometro.vuelta('integracion')
+            
+            # Aplicar condiciones de frontera (y las capas absorbentes, si las hay)
+            if self.esponja is not None:
+                self.esponja.amortiguar(self.velocidades, h)
+            self.aplicar_condiciones_frontera()
+            cronometro.vuelta('fronteras')
+        
+        self.tiempo += self.dt
+        
+        # Guardar datos para análisis
+        irregular = self.malla_irregular()
+        if irregular is None:
+            centro = self.n_particulas//2
+        else:
+            centro = indice_cercano(self.x_particulas, self.longitud / 2)
+        altura_centro = self.y_particulas[centro] - self.y_equilibrio[centro]
+        self.alturas_tiempo.append(altura_centro)
+        self.tiempos.append(self.tiempo)
+        
+        # Calcular energía total (en malla no uniforme, cada partícula pesa según su ancho)
+        if irregular is None:
+            energia_cinetica = 0.5 * np.sum(self.velocidades**2)
+            energia_potencial = 0.5 * self.gravedad * np.sum((self.y_particulas - self.y_equilibrio)**2)
+        else:
+            pesos = irregular[2]
+            energia_cinetica = 0.5 * np.sum(pesos * self.velocidades**2)
+            energia_potencial = 0.5 * self.gravedad * np.sum(pesos * (self.y_particulas - self.y_equilibrio)**2)
+        energia_total = energia_cinetica + energia_potencial
+        self.energias.append(energia_total)
+        cronometro.vuelta('historial')
+        
+        # Adaptar la malla al nuevo estado
+        if self.adaptacion is not None:
+            self.adaptacion.pasos += 1
+            if self.adaptacion.pasos % self.adaptacion.cada == 0:
+                self.adaptar_malla()
+            cronometro.vuelta('malla')
+    
+    def reiniciar(self):
+        """Devuelve el agua (y la malla) al equilibrio y borra el historial"""
+        self.inicializar_agua()
+        self.ajustar_a_malla()
+        self.tiempo = 0
+        self.alturas_tiempo.clear()
+        self.tiempos.clear()
+        self.energias.clear()
+        self.fuente_activa = False
@@ -0,0 +1,317 @@
+"""Red de v2 repartida en franjas de filas entre varios procesos.
+
+El estado vive en un bloque de multiprocessing.shared_memory con dos copias
+(A y B) de posiciones y velocidades. En cada subpaso cada proceso lee sus filas
+de A más unas pocas filas de halo de las franjas vecinas y escribe solo sus
+filas en B; después todos esperan en una barrera y los papeles de A y B se
+invierten. Las franjas vecinas solo comparten las filas de halo, que se leen
+directamente de la memoria compartida, sin copias ni mensajes.
+
+El halo tiene tantas filas como evaluaciones de fuerza hace el integrador en un
+subpaso (1 para euler y leapfrog, 2 para verlet, 4 para rk4): cada evaluación
+sobre la franja ensucia una fila más desde su borde, y esas filas se descartan.
+Así cada fila se calcula con las mismas operaciones que en MotorOndas y los
+resultados son idénticos bit a bit. Los integradores implícitos resuelven un
+sistema de toda la red y no se pueden repartir así.
+
+Uso:
+    with MotorOndasParticionado(n=4000, procesos=8) as motor:
+        motor.aplicar_perturbacion('senoidal')
+        motor.avanzar(1000)
+"""
+import math
+import os
+import weakref
+from multiprocessing import Barrier, Pipe, Process, shared_memory
+from threading import BrokenBarrierError
+
+import numpy as np
+
+from historial import CAPACIDAD_HISTORIAL
+from integradores import EVALUACIONES_POR_PASO, INTEGRADORES, PASOS, subpasos_estables
+from motores import MotorOndas, aceleraciones_red, parametros_como_float
+
+# Pasos que da cada orden a los procesos como máximo; las sondas se guardan en
+# la memoria compartida y se pasan al historial al terminar cada orden
+PASOS_POR_ORDEN = 512
+
+
+def vistas(buffer, n, dtype, muestras):
+    """(campos, iniciales, sondas) sobre el bloque compartido.
+
+    campos[c, 0] son las posiciones y campos[c, 1] las velocidades de la copia
+    c, con forma (n, n, 2); sondas guarda (centro, borde) por muestra.
+    """
+    dtype = np.dtype(dtype)
+    forma_campos = (2, 2, n, n, 2)
+    campos = np.ndarray(forma_campos, dtype=dtype, buffer=buffer)
+    desplazamiento = campos.nbytes
+    iniciales = np.ndarray((n, n, 2), dtype=dtype, buffer=buffer, offset=desplazamiento)
+    desplazamiento += iniciales.nbytes
+    sondas = np.ndarray((muestras, 2), dtype=dtype, buffer=buffer, offset=desplazamiento)
+    return campos, iniciales, sondas
+
+
+def bytes_necesarios(n, dtype, muestras):
+    return (5 * n * n * 2 + 2 * muestras) * np.dtype(dtype).itemsize
+
+
+def abrir_memoria(nombre):
+    """Se adjunta a un bloque creado por el proceso principal, que es quien lo libera"""
+    try:
+        return shared_memory.SharedMemory(name=nombre, track=False)  # Python >= 3.13
+    except TypeError:
+        return shared_memory.SharedMemory(name=nombre)
+
+
+class Franja:
+    """Las filas [fila0, fila1) de la red compartida y cómo avanzarlas"""
+
+    def __init__(self, campos, iniciales, sondas, fila0, fila1, barrera):
+        self.campos = campos
+        self.iniciales = iniciales
+        self.sondas = sondas
+        self.fila0 = fila0
+        self.fila1 = fila1
+        self.barrera = barrera
+        self.n = iniciales.shape[0]
+
+    def contiene(self, fila):
+        return self.fila0 <= fila < self.fila1
+
+    def subpaso(self, actual, integrador, k, masa, h, factor, gamma):
+        """Lee la copia `actual` (filas propias y halo) y escribe las filas propias en la otra"""
+        f0, f1 = self.fila0, self.fila1
+        halo = EVALUACIONES_POR_PASO[integrador]
+        inicio, fin = max(0, f0 - halo), min(self.n, f1 + halo)
+        posiciones, velocidades = self.campos[actual]
+        nuevas_pos, nuevas_vel = self.campos[1 - actual]
+        iniciales = self.iniciales[inicio:fin]
+
+        if integrador == 'euler':
+            # Las mismas operaciones que el Euler de MotorOndas, escritas en la otra copia
+            aceleraciones = aceleraciones_red(posiciones[inicio:fin], iniciales, k, masa)
+            np.add(velocidades[f0:f1], aceleraciones[f0 - inicio:f1 - inicio] * h,
+                   out=nuevas_vel[f0:f1])
+            nuevas_vel[f0:f1] *= factor
+            np.add(posiciones[f0:f1], nuevas_vel[f0:f1] * h, out=nuevas_pos[f0:f1])
+        else:
+            # Los pasos de integradores.py no modifican sus entradas
+            x, v = PASOS[integrador](posiciones[inicio:fin], velocidades[inicio:fin],
+                                     lambda pos: aceleraciones_red(pos, iniciales, k, masa),
+                                     gamma, h)
+            nuevas_pos[f0:f1] = x[f0 - inicio:f1 - inicio]
+            nuevas_vel[f0:f1] = v[f0 - inicio:f1 - inicio]
+
+    def avanzar(self, orden):
+        """Da orden['pasos'] pasos sincronizados con las demás franjas"""
+        n = self.n
+        centro, borde = divmod(orden['indice_centro'], n), divmod(orden['indice_borde'], n)
+        actual, tiempo, frame_count = orden['actual'], orden['tiempo'], orden['frame_count']
+        dt = orden['dt']
+        muestra = 0
+        for _ in range(orden['pasos']):
+            if orden['fuente_activa']:
+                # La aplica quien tiene la fila; la barrera evita que un vecino la lea como halo antes
+                if self.contiene(centro[0]):
+                    fase = 2 * np.pi * orden['frecuencia_fuente'] * tiempo
+                    fuerza_fuente = orden['amplitud_fuente'] * np.sin(fase)
+                    self.campos[actual, 1, centro[0], centro[1], 1] += fuerza_fuente * dt
+                self.barrera.wait()
+            for _ in range(orden['subpasos']):
+                self.subpaso(actual, orden['integrador'], orden['k'], orden['masa'], orden['h'],
+                             orden['factor'], orden['gamma'])
+                self.barrera.wait()
+                actual = 1 - actual
+
+            tiempo += dt
+            frame_count += 1
+            if frame_count % 2 == 0:
+                for columna, (fila, col) in enumerate((centro, borde)):
+                    if self.contiene(fila):
+                        self.sondas[muestra, columna] = (self.campos[actual, 0, fila, col, 1]
+                                                         - self.iniciales[fila, col, 1])
+                muestra += 1
+
+
+def trabajar(nombre, n, dtype, muestras, fila0, fila1, barrera, conexion):
+    """Bucle de cada proceso: recibe órdenes hasta recibir None"""
+    memoria = abrir_memoria(nombre)
+    franja = Franja(*vistas(memoria.buf, n, dtype, muestras), fila0, fila1, barrera)
+    try:
+        while True:
+            orden = conexion.recv()
+            if orden is None:
+                break
+            try:
+                franja.avanzar(orden)
+                conexion.send(None)
+            except BrokenBarrierError:
+                conexion.send("otra franja falló")
+            except Exception as error:
+                # Libera a las demás franjas, que esperan en la barrera
+                barrera.abort()
+                conexion.send(f"franja {fila0}:{fila1}: {error!r}")
+    finally:
+        del franja
+        memoria.close()
+
+
+def liberar(memoria, procesos, conexiones):
+    """Termina los procesos y libera el bloque compartido"""
+    for conexion in conexiones:
+        try:
+            conexion.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+    for proceso in procesos:
+        proceso.join(timeout=5)
+        if proceso.is_alive():
+            proceso.terminate()
+    for conexion in conexiones:
+        conexion.close()
+    try:
+        memoria.close()
+    except BufferError:
+        pass  # Aún hay vistas vivas; el bloque se desmapea al terminar el proceso
+    memoria.unlink()
+
+
+class MotorOndasParticionado(MotorOndas):
+    """MotorOndas con la red repartida en franjas de filas entre `procesos` procesos.
+
+    Perturbaciones, fuente senoidal y sondas (indice_centro, indice_borde)
+    funcionan como en MotorOndas: posiciones y velocidades son vistas de la
+    memoria compartida. avanzar(pasos) reparte muchos pasos con una sola orden;
+    paso_simulacion() da uno. Hay que llamar a cerrar() (o usar `with`); después
+    el motor sigue como un MotorOndas de un solo proceso.
+    """
+    # Solo los integradores explícitos se pueden repartir por franjas
+    INTEGRADORES = INTEGRADORES
+
+    def __init__(self, n=50, procesos=None, capacidad_historial=CAPACIDAD_HISTORIAL,
+                 integrador='euler', dt=None, dtype='float64'):
+        super().__init__(n, 'vectorizado', capacidad_historial, integrador, dt, dtype)
+        self.procesos = min(procesos or os.cpu_count() or 1, n)
+
+        muestras = PASOS_POR_ORDEN // 2
+        self.memoria = shared_memory.SharedMemory(create=True,
+                                                  size=bytes_necesarios(n, self.dtype, muestras))
+        self.campos, iniciales, self.sondas = vistas(self.memoria.buf, n, self.dtype, muestras)
+        iniciales[...] = self.posiciones_iniciales.reshape(n, n, 2)
+        self.campos[0, 0] = self.posiciones.reshape(n, n, 2)
+        self.campos[0, 1] = self.velocidades.reshape(n, n, 2)
+        self.posiciones_iniciales = iniciales.reshape(self.n_particulas, 2)
+        self.actual = 0
+        self.vincular()
+
+        limites = np.linspace(0, n, self.procesos + 1).astype(int)
+        self.franjas = list(zip(limites[:-1], limites[1:]))
+        self.barrera = Barrier(self.procesos)
+        self.conexiones = []
+        self.trabajadores = []
+        for fila0, fila1 in self.franjas:
+            propia, remota = Pipe()
+            proceso = Process(target=trabajar, daemon=True,
+                              args=(self.memoria.name, n, self.dtype.name, muestras,
+                                    int(fila0), int(fila1), self.barrera, remota))
+            proceso.start()
+            remota.close()
+            self.conexiones.append(propia)
+            self.trabajadores.append(proceso)
+        self.finalizador = weakref.finalize(self, liberar, self.memoria, self.trabajadores,
+                                            self.conexiones)
+
+    def vincular(self):
+        """Apunta posiciones y velocidades a la copia vigente de la memoria compartida"""
+        posiciones, velocidades = self.campos[self.actual]
+        self.posiciones = posiciones.reshape(self.n_particulas, 2)
+        self.velocidades = velocidades.reshape(self.n_particulas, 2)
+
+    def sincronizar(self):
+        """Si se reemplazó posiciones o velocidades (p. ej. al restaurar), las copia a la memoria compartida"""
+        posiciones, velocidades = self.campos[self.actual]
+        if not np.may_share_memory(self.posiciones, posiciones):
+            posiciones[...] = np.reshape(self.posiciones, posiciones.shape)
+        if not np.may_share_memory(self.velocidades, velocidades):
+            velocidades[...] = np.reshape(self.velocidades, velocidades.shape)
+        self.vincular()
+
+    def avanzar(self, pasos):
+        """Da `pasos` pasos repartidos entre los procesos"""
+        if self.pausado:
+            return
+        parametros_como_float(self)
+        if self.memoria is None:
+            for _ in range(pasos):
+                super().paso_simulacion()
+            return
+        self.sincronizar()
+        while pasos > 0:
+            tanda = min(pasos, PASOS_POR_ORDEN)
+            subpasos = subpasos_estables(self.dt, self.frecuencia_maxima(), self.integrador)
+            orden = {
+                'pasos': tanda, 'actual': self.actual, 'tiempo': self.tiempo,
+                'frame_count': self.frame_count, 'integrador': self.integrador,
+                'k': self.k, 'masa': self.masa, 'dt': self.dt, 'subpasos': subpasos,
+                'h': self.dt / subpasos, 'factor': (1 - self.damping) ** (1 / subpasos),
+                'gamma': (0.0 if self.integrador == 'euler'
+                          else -math.log(1 - self.damping) / self.DT_AMORTIGUAMIENTO),
+                'fuente_activa': getattr(self, 'fuente_activa', False),
+                'frecuencia_fuente': getattr(self, 'frecuencia_fuente', 0.0),
+                'amplitud_fuente': getattr(self, 'amplitud_fuente', 0.0),
+                'indice_centro': self.indice_centro, 'indice_borde': self.indice_borde,
+            }
+            for conexion in self.conexiones:
+                conexion.send(orden)
+            errores = [error for error in (conexion.recv() for conexion in self.conexiones) if error]
+            if errores:
+                self.barrera.reset()
+                raise RuntimeError(f"Falló el paso repartido: {'; '.join(errores)}")
+
+            # Tiempos y sondas del historial, en el mismo orden que MotorOndas
+            tiempos = []
+            for _ in range(tanda):
+                self.tiempo += self.dt
+                self.frame_count += 1
+                if self.frame_count % 2 == 0:
+                    tiempos.append(self.tiempo)
+            self.amplitudes_centro.extend(self.sondas[:len(tiempos), 0])
+            self.amplitudes_borde.extend(self.sondas[:len(tiempos), 1])
+            self.tiempos.extend(tiempos)
+
+            self.actual = (self.actual + tanda * subpasos) % 2
+            self.vincular()
+            pasos -= tanda
+
+    def paso_simulacion(self):
+        """Ejecuta un paso de la simulación"""
+        self.avanzar(1)
+
+    def absorber(self, lados=('izq', 'der', 'abajo', 'arriba'), *args, **kwargs):
+        if lados and self.memoria is not None:
+            raise ValueError("Las capas absorbentes no están disponibles con varios procesos")
+        super().absorber(lados, *args, **kwargs)
+
+    def reiniciar(self):
+        """Devuelve la red al equilibrio y borra el historial"""
+        super().reiniciar()
+        if self.memoria is not None:
+            self.sincronizar()
+
+    def cerrar(self):
+        """Termina los procesos; el estado se copia y el motor sigue en un solo proceso"""
+        if self.memoria is None:
+            return
+        self.posiciones = self.posiciones.copy()
+        self.velocidades = self.velocidades.copy()
+        self.posiciones_iniciales = self.posiciones_iniciales.copy()
+        del self.campos, self.sondas
+        self.finalizador()
+        self.memoria = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
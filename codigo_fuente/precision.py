@@ -0,0 +1,125 @@
+"""Compara una corrida en float32 con la misma en float64 para saber si basta.
+
+Ambos motores parten del mismo estado y avanzan a la par; cada --cada pasos se
+mide cuánto se separó el campo (relativo a la mayor amplitud de la corrida en
+float64) y el error de energía (relativo a la energía inicial). Las energías se
+evalúan en float64 a partir de cada estado, para no sumar el redondeo del cálculo.
+
+Uso:
+    python precision.py v2 --n 200 --pasos 5000
+    python precision.py v3 --n 100000 --pasos 20000 --integrador leapfrog --dt estable
+"""
+import argparse
+import time
+
+import numpy as np
+
+from motores import PRECISIONES, MotorPerfil
+from simular import MODELOS, crear_motor, interpretar_dt, perturbar
+
+# Errores relativos por debajo de los cuales float32 se considera seguro
+TOLERANCIA = 1e-3
+
+
+def equilibrio(simulador, modelo):
+    """Estado de reposo con la forma de simulador.campo()"""
+    if modelo == 'v1':
+        return simulador.posiciones_base.reshape(simulador.campo().shape)
+    if modelo == 'v2':
+        return simulador.posiciones_iniciales.reshape(simulador.campo().shape)
+    return simulador.y_equilibrio
+
+
+def energia(simulador, modelo):
+    """Energía del estado, calculada en float64 sea cual sea la precisión del motor"""
+    if modelo == 'v3':
+        # La del motor, ponderada por la malla si no es uniforme
+        return simulador.calcular_energia()
+    velocidades = simulador.velocidades.astype(float)
+    cinetica = 0.5 * np.sum(velocidades**2)
+    if modelo == 'v1':
+        posiciones = simulador.posiciones.astype(float)
+        delta = posiciones[simulador.enlaces_j] - posiciones[simulador.enlaces_i]
+        estiramiento = np.hypot(delta[:, 0], delta[:, 1]) - simulador.espaciado
+        return simulador.masa * cinetica + 0.5 * simulador.k * np.sum(estiramiento**2)
+    n = simulador.n
+    pos = simulador.posiciones.astype(float).reshape(n, n, 2)
+    pos0 = simulador.posiciones_iniciales.astype(float).reshape(n, n, 2)
+    def_h = (pos[:, 1:] - pos[:, :-1]) - (pos0[:, 1:] - pos0[:, :-1])
+    def_v = (pos[1:] - pos[:-1]) - (pos0[1:] - pos0[:-1])
+    return simulador.masa * cinetica + 0.5 * simulador.k * (np.sum(def_h**2) + np.sum(def_v**2))
+
+
+def comparar_precision(modelo, pasos, n=None, integrador=None, dt=None, perturbacion=None,
+                       cada=100):
+    """Corre el modelo en float64 y float32 a la par.
+
+    Devuelve (filas, rendimiento): filas de (paso, tiempo, error del campo,
+    error de energía) y, por precisión, pasos/s y bytes del estado.
+    """
+    simuladores = {}
+    for dtype in PRECISIONES:
+        simuladores[dtype] = crear_motor(modelo, n, pasos=pasos, integrador=integrador, dt=dt,
+                                         dtype=dtype)
+        perturbar(simuladores[dtype], modelo, perturbacion or MODELOS[modelo][1])
+    doble, simple = simuladores['float64'], simuladores['float32']
+    energia_inicial = energia(doble, modelo)
+    reposo = equilibrio(doble, modelo)
+    amplitud = np.max(np.abs(doble.campo() - reposo))
+
+    filas = []
+    segundos = dict.fromkeys(PRECISIONES, 0.0)
+    for paso in range(1, pasos + 1):
+        for dtype, simulador in simuladores.items():
+            inicio = time.perf_counter()
+            simulador.paso_simulacion()
+            segundos[dtype] += time.perf_counter() - inicio
+        if paso % cada == 0 or paso == pasos:
+            amplitud = max(amplitud, np.max(np.abs(doble.campo() - reposo)))
+            error_campo = np.max(np.abs(simple.campo().astype(float) - doble.campo()))
+            error_energia = abs(energia(simple, modelo) - energia(doble, modelo))
+            filas.append((paso, doble.tiempo, error_campo / amplitud if amplitud > 0 else 0.0,
+                          error_energia / energia_inicial if energia_inicial > 0 else 0.0))
+
+    rendimiento = {dtype: {'pasos_por_s': pasos / segundos[dtype] if segundos[dtype] > 0 else 0.0,
+                           'bytes_estado': simulador.campo().nbytes + simulador.velocidades.nbytes}
+                   for dtype, simulador in simuladores.items()}
+    return filas, rendimiento
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('modelo', choices=sorted(MODELOS))
+    parser.add_argument('--pasos', type=int, default=2000)
+    parser.add_argument('--n', type=int, help="lado de la red (v1, v2) o n_particulas (v3)")
+    parser.add_argument('--integrador', choices=MotorPerfil.INTEGRADORES)
+    parser.add_argument('--dt', type=interpretar_dt)
+    parser.add_argument('--perturbacion', help="tipo de perturbación inicial (v2, v3)")
+    parser.add_argument('--cada', type=int, default=100, help="medir cada N pasos")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA,
+                        help="error relativo aceptable en el campo y en la energía")
+    args = parser.parse_args()
+
+    try:
+        filas, rendimiento = comparar_precision(args.modelo, args.pasos, args.n, args.integrador,
+                                                args.dt, args.perturbacion, args.cada)
+    except ValueError as error:
+        parser.error(str(error))
+
+    print(f"{'paso':>8} {'tiempo':>10} {'error campo':>12} {'error energía':>14}")
+    for paso, tiempo, error_campo, error_energia in filas:
+        print(f"{paso:>8} {tiempo:10.2f} {error_campo:12.2e} {error_energia:14.2e}")
+    for dtype, valores in rendimiento.items():
+        print(f"{dtype}: {valores['pasos_por_s']:.1f} pasos/s, "
+              f"estado {valores['bytes_estado'] / 2**20:.1f} MB")
+
+    peor_campo = max(fila[2] for fila in filas)
+    peor_energia = max(fila[3] for fila in filas)
+    seguro = peor_campo <= args.tolerancia and peor_energia <= args.tolerancia
+    print(f"Peor error: campo {peor_campo:.2e}, energía {peor_energia:.2e} -> float32 "
+          + ("seguro" if seguro else f"NO seguro con tolerancia {args.tolerancia:g}"))
+
+
+if __name__ == "__main__":
+    main()
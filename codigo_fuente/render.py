@@ -0,0 +1,182 @@
+"""Dibujo por blitting y ritmo de pasos por cuadro para las ventanas de v2 y v3."""
+import math
+import time
+
+
+class GestorBlit:
+    """Redibuja solo los artistas que cambian sobre un fondo guardado.
+
+    El fondo (ejes, marcas, etiquetas y artistas estáticos) se captura en cada
+    dibujado completo del canvas. Mientras los límites de los ejes no cambien,
+    cada frame solo restaura ese fondo, dibuja los artistas animados y hace
+    blit. Si algún límite cambió, se hace un dibujado completo, que a la vez
+    renueva el fondo. Los widgets que piden draw_idle (sliders, botones)
+    también renuevan el fondo por la misma vía.
+
+    En backends sin soporte de blit se degrada a un dibujado completo por frame.
+    """
+
+    def __init__(self, canvas, artistas):
+        self.canvas = canvas
+        self.figura = canvas.figure
+        self.artistas = list(artistas)
+        for artista in self.artistas:
+            artista.set_animated(True)
+        self.ejes = list(dict.fromkeys(a.axes for a in self.artistas if a.axes is not None))
+
+        self.fondo = None
+        self.limites = None
+        self.dibujados_completos = 0
+        self.id_evento = canvas.mpl_connect('draw_event', self.on_draw)
+
+    def leer_limites(self):
+        """Límites actuales de todos los ejes con artistas animados"""
+        return [(ax.get_xlim(), ax.get_ylim()) for ax in self.ejes]
+
+    def on_draw(self, event):
+        """Tras un dibujado completo: guardar el fondo y pintar encima los animados"""
+        if not getattr(self.canvas, 'supports_blit', False):
+            return
+        self.fondo = self.canvas.copy_from_bbox(self.figura.bbox)
+        self.dibujar_animados()
+
+    def dibujar_animados(self):
+        for artista in self.artistas:
+            self.figura.draw_artist(artista)
+
+    def actualizar(self):
+        """Muestra el frame actual, con blit si el fondo sigue siendo válido"""
+        limites = self.leer_limites()
+        if not getattr(self.canvas, 'supports_blit', False):
+            self.canvas.draw_idle()
+        elif self.fondo is None or limites != self.limites:
+            self.limites = limites
+            self.dibujados_completos += 1
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.fondo)
+            self.dibujar_animados()
+            self.canvas.blit(self.figura.bbox)
+        self.canvas.flush_events()
+
+    def desconectar(self):
+        self.canvas.mpl_disconnect(self.id_evento)
+        for artista in self.artistas:
+            artista.set_animated(False)
+
+
+def desplazar_ventana(ax, t_final, ancho):
+    """Avanza el eje x a saltos de media ventana en lugar de en cada frame.
+
+    Así los límites (y con ellos el fondo guardado) solo cambian cada ancho/2
+    de tiempo simulado. Devuelve True si los límites cambiaron.
+    """
+    xmin, xmax = ax.get_xlim()
+    if xmin <= t_final <= xmax and math.isclose(xmax - xmin, ancho):
+        return False
+    inicio = max(0, t_final - ancho / 2)
+    ax.set_xlim(inicio, inicio + ancho)
+    return True
+
+
+def ampliar_limites_y(ax, y_min, y_max, holgura=0.25):
+    """Agranda el eje y solo cuando los datos se salen, con holgura extra.
+
+    Nunca lo achica, así que tras el transitorio inicial los límites quedan fijos
+    y el fondo guardado sigue valiendo. Devuelve True si los límites cambiaron.
+    """
+    actual_min, actual_max = ax.get_ylim()
+    if actual_min <= y_min and y_max <= actual_max:
+        return False
+    extra = holgura * max(y_max - y_min, abs(y_max), abs(y_min), 1e-12)
+    ax.set_ylim(min(actual_min, y_min - extra), max(actual_max, y_max + extra))
+    return True
+
+
+class RitmoPasos:
+    """Decide cuántos pasos de física correr en cada cuadro.
+
+    Con `pasos_por_cuadro` entero se corren siempre esos pasos. Con 'auto' se
+    miden (promedio móvil) el costo de un paso y el de dibujar un cuadro y se
+    corren tantos pasos como quepan en `presupuesto` segundos por cuadro:
+
+    - tiempo_real=None: todos los que quepan, la simulación se adelanta al reloj.
+    - tiempo_real=f: los necesarios para avanzar f segundos simulados por segundo
+      real, sin pasarse del presupuesto (si no alcanza, se va más lento que f).
+
+    Así una red grande corre pocos pasos y sigue fluida, y una pequeña avanza
+    muchos pasos por cada dibujado.
+    """
+
+    def __init__(self, dt, pasos_por_cuadro='auto', tiempo_real=1.0, presupuesto=0.05,
+                 pasos_max=10_000, suavizado=0.2):
+        if pasos_por_cuadro != 'auto' and (not isinstance(pasos_por_cuadro, int)
+                                           or pasos_por_cuadro < 1):
+            raise ValueError(f"pasos_por_cuadro debe ser 'auto' o un entero positivo, "
+                             f"no {pasos_por_cuadro!r}")
+        if tiempo_real is not None and tiempo_real <= 0:
+            raise ValueError(f"tiempo_real debe ser positivo o None, no {tiempo_real}")
+        self.dt = dt
+        self.pasos_por_cuadro = pasos_por_cuadro
+        self.tiempo_real = tiempo_real
+        self.presupuesto = presupuesto
+        self.pasos_max = pasos_max
+        self.suavizado = suavizado
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Olvida los costos medidos y el reloj"""
+        self.costo_paso = None
+        self.costo_render = None
+        self.ultimo_cuadro = None
+        self.deuda = 0.0      # Pasos que faltan para ir al ritmo de tiempo_real
+        self.pasos = 1
+
+    def pasos_cuadro(self):
+        """Pasos a correr en el cuadro que empieza ahora"""
+        ahora = time.perf_counter()
+        transcurrido = 0.0 if self.ultimo_cuadro is None else ahora - self.ultimo_cuadro
+        self.ultimo_cuadro = ahora
+
+        if self.pasos_por_cuadro != 'auto':
+            self.pasos = self.pasos_por_cuadro
+            return self.pasos
+        if self.costo_paso is None:
+            self.pasos = 1
+            return self.pasos
+
+        # Los que caben en el presupuesto, creciendo como mucho al doble por cuadro.
+        # Si dibujar ya se come el presupuesto, la física igual recibe la mitad.
+        libre = max(self.presupuesto - (self.costo_render or 0.0), self.presupuesto / 2)
+        caben = max(1, min(int(libre / self.costo_paso), 2 * self.pasos, self.pasos_max))
+        if self.tiempo_real is None:
+            self.pasos = caben
+        else:
+            # Tras una pausa o un tirón no se intenta recuperar todo el tiempo perdido
+            limite = 4 * max(self.presupuesto, self.costo_render or 0.0)
+            self.deuda += self.tiempo_real * min(transcurrido, limite) / self.dt
+            self.pasos = min(int(self.deuda), caben)
+            # Si no alcanza el presupuesto, la deuda no se acumula sin fin
+            self.deuda = min(self.deuda - self.pasos, 1.0)
+        return self.pasos
+
+    def avanzar(self, paso):
+        """Llama a `paso` las veces que toquen en este cuadro y mide cuánto tardan"""
+        pasos = self.pasos_cuadro()
+        inicio = time.perf_counter()
+        for _ in range(pasos):
+            paso()
+        self.registrar_pasos(pasos, time.perf_counter() - inicio)
+        return pasos
+
+    def promediar(self, anterior, valor):
+        return valor if anterior is None else anterior + self.suavizado * (valor - anterior)
+
+    def registrar_pasos(self, pasos, segundos):
+        """Tiempo que tomaron los pasos del cuadro"""
+        if pasos > 0:
+            self.costo_paso = self.promediar(self.costo_paso, segundos / pasos)
+
+    def registrar_render(self, segundos):
+        """Tiempo que tomó dibujar el cuadro"""
+        self.costo_render = self.promediar(self.costo_render, segundos)
@@ -0,0 +1,110 @@
+"""Sellos de perturbación: el patrón de una perturbación local ya evaluado sobre
+la ventana de índices que cubre.
+
+El impulso de v1, el pulso de v2 y la gota de v3 solo alcanzan las partículas
+a menos de `ancho` del centro. En lugar de recorrer todas las partículas, el
+patrón gaussiano exp(-d²/sigma²) se suma con una rebanada sobre esa ventana:
+el costo depende de ancho/espaciado y no del tamaño de la red.
+
+Los sellos se guardan en caché por (ancho, espaciado, sigma, desfase, dtype).
+El desfase es la posición del centro entre dos nodos, redondeada a
+1/SUBDIVISIONES del espaciado; así hay a lo sumo SUBDIVISIONES sellos por eje y
+una ráfaga de miles de gotas reutiliza siempre los mismos. Por ese redondeo un
+centro arbitrario (p. ej. un clic) se corre como mucho 1/32 del espaciado.
+"""
+import math
+from functools import lru_cache
+
+import numpy as np
+
+# Posiciones del centro entre dos nodos que se distinguen
+SUBDIVISIONES = 16
+
+
+def ubicar(coordenada, espaciado):
+    """(nodo, desfase) de una coordenada en una rejilla que empieza en 0.
+
+    El desfase va en 1/SUBDIVISIONES de espaciado, entre 0 y SUBDIVISIONES - 1.
+    """
+    return divmod(round(coordenada / espaciado * SUBDIVISIONES), SUBDIVISIONES)
+
+
+def distancias(ancho, espaciado, desfase):
+    """Desplazamientos enteros k alrededor del nodo y su distancia con signo al centro"""
+    alcance = math.ceil(ancho / espaciado) + 1
+    k = np.arange(-alcance, alcance + 1)
+    return k, (k - desfase / SUBDIVISIONES) * espaciado
+
+
+@lru_cache(maxsize=256)
+def sello_1d(ancho, espaciado, sigma, desfase, dtype):
+    """(primer desplazamiento, valores) de exp(-d²/sigma²) en los nodos con d < ancho"""
+    k, d = distancias(ancho, espaciado, desfase)
+    dentro = np.abs(d) < ancho
+    valores = np.exp(-d[dentro]**2 / sigma**2).astype(dtype)
+    valores.flags.writeable = False
+    return (int(k[dentro][0]) if dentro.any() else 0), valores
+
+
+@lru_cache(maxsize=1024)
+def sello_2d(ancho, espaciado, sigma, desfase, dtype):
+    """(primer desplazamiento, valores) de exp(-d²/sigma²) en un cuadrado de nodos.
+
+    `desfase` es (desfase en filas, desfase en columnas); fuera del disco d < ancho
+    los valores son 0.
+    """
+    k, dy = distancias(ancho, espaciado, desfase[0])
+    _, dx = distancias(ancho, espaciado, desfase[1])
+    dist = np.sqrt(dx[None, :]**2 + dy[:, None]**2)
+    valores = np.where(dist < ancho, np.exp(-dist**2 / sigma**2), 0.0).astype(dtype)
+    valores.flags.writeable = False
+    return int(k[0]), valores
+
+
+def recortar(inicio, largo, total):
+    """Rebanada del campo [inicio, inicio + largo) dentro de [0, total) y la del sello"""
+    desde, hasta = max(inicio, 0), min(inicio + largo, total)
+    hasta = max(desde, hasta)
+    return slice(desde, hasta), slice(desde - inicio, hasta - inicio)
+
+
+def sumar_sello_2d(campo, centro, espaciado, ancho, sigma, escala):
+    """campo[fila, col] += escala * sello alrededor de centro = (x, y), solo en la ventana.
+
+    `campo` tiene forma (filas, columnas) con la fila según y y la columna según x.
+    """
+    (fila, desfase_fila), (col, desfase_col) = ubicar(centro[1], espaciado), ubicar(centro[0], espaciado)
+    inicio, valores = sello_2d(ancho, espaciado, sigma, (desfase_fila, desfase_col), campo.dtype)
+    filas, sello_filas = recortar(fila + inicio, valores.shape[0], campo.shape[0])
+    columnas, sello_columnas = recortar(col + inicio, valores.shape[1], campo.shape[1])
+    campo[filas, columnas] += escala * valores[sello_filas, sello_columnas]
+
+
+def ventana_1d(posicion, espaciado, ancho, sigma, total, dtype):
+    """(rebanada del campo, valores del sello sobre ella) alrededor de `posicion`"""
+    nodo, desfase = ubicar(posicion, espaciado)
+    inicio, valores = sello_1d(ancho, espaciado, sigma, desfase, np.dtype(dtype))
+    campo, sello = recortar(nodo + inicio, len(valores), total)
+    return campo, valores[sello]
+
+
+def ventana_irregular(x, posicion, ancho, sigma, dtype):
+    """(rebanada, valores de exp(-d²/sigma²)) en los nodos de x creciente con |d| < ancho.
+
+    Para mallas no uniformes (ver malla.py), donde no hay sello que reutilizar:
+    la ventana se ubica con dos búsquedas binarias.
+    """
+    desde = int(np.searchsorted(x, posicion - ancho, side='right'))
+    hasta = int(np.searchsorted(x, posicion + ancho, side='left'))
+    d = x[desde:hasta] - posicion
+    return slice(desde, hasta), np.exp(-d**2 / sigma**2).astype(dtype)
+
+
+def indice_cercano(x, posicion):
+    """np.argmin(np.abs(x - posicion)) para x creciente, en O(log n)"""
+    i = int(np.searchsorted(x, posicion))
+    if i == 0:
+        return 0
+    if i == len(x):
+        return len(x) - 1
+    return i - 1 if abs(x[i - 1] - posicion) <= abs(x[i] - posicion) else i
@@ -0,0 +1,289 @@
+"""Ejecuta una simulación sin interfaz gráfica y guarda su serie temporal.
+
+Uso:
+    python simular.py v2 --pasos 5000 --n 200 --salida serie.csv
+    python simular.py v3 --pasos 20000 --n 100000 --perturbacion tsunami
+    python simular.py v1 --pasos 1000 --motor bucle --salida serie.npz
+    python simular.py v2 --pasos 1000 --integrador leapfrog --dt estable
+    python simular.py v3 --saltar 10000 --pasos 500 --integrador modal
+    python simular.py v2 --n 1000 --pasos 100000 --guardar estado.npz --cada-segundos 5
+    python simular.py v2 --reanudar estado.npz --pasos 50000
+    python simular.py v3 --n 100000 --pasos 50000 --grabar perfil/ --grabar-cada 10 --grabar-tipo float16
+    python simular.py v2 --n 500 --pasos 2000 --tiempos fases.jsonl
+    python simular.py v3 --n 1000000 --pasos 5000 --dtype float32
+    python simular.py v2 --n 4000 --pasos 200 --procesos 8 --perturbacion senoidal
+    python simular.py v3 --n 2000000 --pasos 1000 --motor hilos --hilos 4
+    python simular.py v2 --n 2000 --pasos 1000 --teselas 32
+    python simular.py v3 --n 2000 --pasos 20000 --absorber izq der --grosor 40
+    python simular.py v3 --n 200 --pasos 5000 --integrador leapfrog --adaptar 1e-3
+
+Al terminar informa los pasos por segundo (sin contar inicialización ni escritura).
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+import instantanea
+import trayectoria
+from cronometro import Cronometro
+from absorcion import GROSOR
+from motores import PRECISIONES, MotorOndas, MotorPerfil, MotorResortes
+from actividad import MotorOndasActivo
+from particion import MotorOndasParticionado
+
+# Para cada modelo: clase del motor, perturbación por defecto y columnas de la serie
+MODELOS = {
+    'v1': (MotorResortes, 'impulso', ('tiempo', 'amplitud')),
+    'v2': (MotorOndas, 'pulso', ('tiempo', 'amplitud_centro', 'amplitud_borde')),
+    'v3': (MotorPerfil, 'gota', ('tiempo', 'altura_centro', 'energia')),
+}
+
+
+def crear_motor(modelo, n=None, motor=None, pasos=None, integrador=None, dt=None, dtype=None,
+                procesos=None, hilos=None, teselas=None):
+    """Instancia el motor del modelo con el tamaño, motor de fuerzas e integrador pedidos.
+    
+    Con `pasos`, el historial se dimensiona para guardar la serie completa. Con
+    `procesos` (solo v2), la red se reparte entre procesos (ver particion.py);
+    con `teselas` (solo v2), solo se actualizan las teselas activas (ver actividad.py).
+    """
+    clase = MODELOS[modelo][0]
+    argumentos = {}
+    if procesos is not None:
+        if modelo != 'v2':
+            raise ValueError("--procesos solo está disponible para v2")
+        if motor is not None:
+            raise ValueError("--procesos usa siempre el motor vectorizado")
+        clase = MotorOndasParticionado
+        argumentos['procesos'] = procesos
+    if teselas is not None:
+        if modelo != 'v2':
+            raise ValueError("--teselas solo está disponible para v2")
+        if motor is not None or procesos is not None:
+            raise ValueError("--teselas no se combina con --motor ni con --procesos")
+        clase = MotorOndasActivo
+        argumentos['tesela'] = teselas
+    if pasos is not None:
+        argumentos['capacidad_historial'] = max(1, pasos)
+    if n is not None:
+        argumentos['n_particulas' if modelo == 'v3' else 'n'] = n
+    if motor is not None:
+        argumentos['motor'] = motor
+    if integrador is not None:
+        argumentos['integrador'] = integrador
+    if dt is not None:
+        argumentos['dt'] = dt
+    if dtype is not None:
+        argumentos['dtype'] = dtype
+    if hilos is not None:
+        if motor != 'hilos':
+            raise ValueError("--hilos solo se usa con --motor hilos")
+        argumentos['hilos'] = hilos
+    return clase(**argumentos)
+
+
+def perturbar(simulador, modelo, tipo, amplitud=None):
+    """Aplica la perturbación inicial; v1 solo admite el impulso central"""
+    if modelo == 'v1':
+        simulador.aplicar_perturbacion(5.0 if amplitud is None else amplitud)
+    elif amplitud is None:
+        simulador.aplicar_perturbacion(tipo)
+    else:
+        simulador.aplicar_perturbacion(tipo, amplitud=amplitud)
+
+
+def serie_temporal(simulador, modelo):
+    """Devuelve las columnas de la serie temporal registrada por el motor"""
+    if modelo == 'v1':
+        datos = (simulador.tiempos, simulador.amplitudes)
+    elif modelo == 'v2':
+        datos = (simulador.tiempos, simulador.amplitudes_centro, simulador.amplitudes_borde)
+    else:
+        datos = (simulador.tiempos, simulador.alturas_tiempo, simulador.energias)
+    return np.column_stack([np.asarray(columna, dtype=float) for columna in datos])
+
+
+def guardar_serie(ruta, columnas, datos):
+    """Escribe la serie como .npz (una entrada por columna) o como CSV"""
+    if ruta.endswith('.npz'):
+        np.savez(ruta, **{nombre: datos[:, i] for i, nombre in enumerate(columnas)})
+    else:
+        np.savetxt(ruta, datos, delimiter=',', header=','.join(columnas), comments='')
+
+
+def ejecutar(modelo, pasos, n=None, motor=None, perturbacion=None, amplitud=None,
+             integrador=None, dt=None, saltar=None, reanudar=None, guardado=None,
+             grabador=None, cronometro=None, pasos_por_registro=100, dtype=None,
+             procesos=None, hilos=None, teselas=None, absorber=None, grosor=GROSOR,
+             adaptar=None):
+    """Corre la simulación y devuelve (motor, pasos por segundo).
+    
+    Con `saltar` (solo v3), antes de dar los pasos la superficie se lleva de forma
+    exacta al tiempo indicado (ver modal.py). Con `reanudar`, el motor sale de
+    esa instantánea en lugar de crearse y perturbarse; `guardado` es un
+    instantanea.GuardadoPeriodico y `grabador` un trayectoria.GrabadorTrayectoria,
+    ambos se llaman tras cada paso. Con `cronometro` (ver cronometro.py) se miden
+    las fases de cada paso y se cierra un registro cada `pasos_por_registro`.
+    Con `procesos`, al terminar (o ante un error) se cierran los procesos de
+    particion.py. Con `absorber` (v2, v3), los lados indicados llevan capas
+    absorbentes de `grosor` partículas (ver absorcion.py). Con `adaptar` (solo
+    v3), la malla se refina y afina con esa tolerancia (ver malla.py). Al
+    reanudar, las capas y la adaptación guardadas en la instantánea se
+    conservan tal cual.
+    """
+    if reanudar is not None:
+        if procesos is not None:
+            raise ValueError("--procesos no se puede combinar con --reanudar")
+        simulador = instantanea.cargar(reanudar)
+        if instantanea.clase_motor(simulador) is not MODELOS[modelo][0]:
+            raise ValueError(f"{reanudar} no es una instantánea de {modelo}")
+    else:
+        simulador = crear_motor(modelo, n, motor, pasos, integrador, dt, dtype, procesos, hilos,
+                                teselas)
+    # Los procesos de particion.py se cierran aunque algo falle a mitad de camino
+    try:
+        if reanudar is None:
+            perturbar(simulador, modelo, perturbacion or MODELOS[modelo][1], amplitud)
+        if absorber:
+            if modelo == 'v1':
+                raise ValueError("--absorber solo está disponible para v2 y v3")
+            if simulador.esponja is None:
+                simulador.absorber(absorber, grosor)
+        if adaptar is not None:
+            if modelo != 'v3':
+                raise ValueError("--adaptar solo está disponible para v3")
+            if grabador is not None:
+                raise ValueError("--adaptar cambia el número de partículas y no se puede grabar")
+            if simulador.adaptacion is None:
+                simulador.adaptar(adaptar)
+        if saltar is not None:
+            if modelo != 'v3':
+                raise ValueError("--saltar solo está disponible para v3")
+            simulador.saltar_a(saltar)
+
+        if cronometro is not None:
+            simulador.cronometro = cronometro
+    
+        inicio = time.perf_counter()
+        if procesos is not None and guardado is None and grabador is None and cronometro is None:
+            # Sin nada que hacer entre pasos, una sola orden para todos
+            simulador.avanzar(pasos)
+        else:
+            for paso in range(1, pasos + 1):
+                simulador.paso_simulacion()
+                if guardado is not None:
+                    guardado.registrar_paso(simulador)
+                if grabador is not None:
+                    grabador.registrar_paso(simulador)
+                if cronometro is not None and paso % pasos_por_registro == 0:
+                    cronometro.cerrar_cuadro(tiempo=simulador.tiempo)
+        transcurrido = time.perf_counter() - inicio
+    finally:
+        if procesos is not None:
+            simulador.cerrar()
+    return simulador, pasos / transcurrido if transcurrido > 0 else float('inf')
+
+
+def interpretar_dt(texto):
+    """'estable' o un número positivo"""
+    return texto if texto == 'estable' else float(texto)
+
+
+def imprimir_fases(cronometro):
+    """Tabla de ms por registro (cada --tiempos-cada pasos) de cada fase"""
+    estadisticas = cronometro.estadisticas()
+    print(cronometro.resumen(), file=sys.stderr)
+    for fase, valores in estadisticas['fases'].items():
+        if valores['max'] > 0:
+            print(f"  {fase:>12}: media {valores['media']:9.3f} ms  p50 {valores['p50']:9.3f}  "
+                  f"p90 {valores['p90']:9.3f}  p99 {valores['p99']:9.3f}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('modelo', choices=sorted(MODELOS))
+    parser.add_argument('--pasos', type=int, default=1000, help="número de pasos a simular")
+    parser.add_argument('--n', type=int, help="lado de la red (v1, v2) o n_particulas (v3)")
+    parser.add_argument('--motor', help="motor de fuerzas ('bucle', 'vectorizado', 'enlaces', 'hilos')")
+    parser.add_argument('--perturbacion', help="tipo de perturbación inicial (v2, v3)")
+    parser.add_argument('--amplitud', type=float, help="amplitud de la perturbación")
+    parser.add_argument('--integrador', choices=MotorPerfil.INTEGRADORES,
+                        help="integrador temporal ('modal' solo en v3)")
+    parser.add_argument('--dt', type=interpretar_dt,
+                        help="paso de tiempo, o 'estable' para el mayor paso estable del integrador")
+    parser.add_argument('--dtype', choices=PRECISIONES,
+                        help="precisión del estado (float32: mitad de memoria, ver precision.py)")
+    parser.add_argument('--hilos', type=int,
+                        help="con --motor hilos (v2, v3): hilos por paso (por defecto, todos los núcleos)")
+    parser.add_argument('--procesos', type=int,
+                        help="v2: repartir la red en franjas entre N procesos (ver particion.py)")
+    parser.add_argument('--teselas', type=int, metavar='LADO',
+                        help="v2: actualizar solo las teselas de LADO x LADO en movimiento (ver actividad.py)")
+    parser.add_argument('--absorber', nargs='+', metavar='LADO',
+                        help="capas absorbentes en esos lados: izq der (v3), izq der abajo arriba (v2)")
+    parser.add_argument('--grosor', type=int, default=GROSOR,
+                        help="grosor de las capas de --absorber, en partículas")
+    parser.add_argument('--adaptar', type=float, metavar='TOL',
+                        help="v3: malla adaptativa con error de interpolación TOL en metros (ver malla.py)")
+    parser.add_argument('--saltar', type=float, metavar='T',
+                        help="v3: saltar de forma exacta a t=T antes de simular")
+    parser.add_argument('--guardar', metavar='RUTA',
+                        help="instantánea .npz para retomar la corrida (ver --cada, --cada-segundos)")
+    parser.add_argument('--cada', type=int, help="guardar la instantánea cada N pasos")
+    parser.add_argument('--cada-segundos', type=float,
+                        help="guardar la instantánea cada tantos segundos de reloj")
+    parser.add_argument('--reanudar', metavar='RUTA', help="seguir desde una instantánea")
+    parser.add_argument('--grabar', metavar='DIRECTORIO',
+                        help="grabar el campo completo en disco (ver trayectoria.py)")
+    parser.add_argument('--grabar-cada', type=int, default=1, metavar='N',
+                        help="grabar uno de cada N pasos")
+    parser.add_argument('--grabar-tipo', choices=trayectoria.TIPOS, default='float32',
+                        help="tipo con el que se guardan los cuadros")
+    parser.add_argument('--tiempos', metavar='RUTA',
+                        help="medir las fases de cada paso y escribirlas como líneas JSON")
+    parser.add_argument('--tiempos-cada', type=int, default=100, metavar='N',
+                        help="una línea de --tiempos cada N pasos")
+    parser.add_argument('--salida', default='serie.csv', help="archivo .csv o .npz de salida")
+    args = parser.parse_args()
+
+    guardado = None
+    if args.guardar:
+        # Sin intervalo, solo se guarda al final
+        guardado = instantanea.GuardadoPeriodico(args.guardar, args.cada or args.pasos,
+                                                 args.cada_segundos)
+
+    grabador = None
+    if args.grabar:
+        grabador = trayectoria.GrabadorTrayectoria(args.grabar, args.grabar_cada, args.grabar_tipo)
+
+    cronometro = Cronometro(registro=args.tiempos) if args.tiempos else None
+
+    try:
+        simulador, pasos_por_segundo = ejecutar(args.modelo, args.pasos, args.n, args.motor,
+                                                args.perturbacion, args.amplitud,
+                                                args.integrador, args.dt, args.saltar,
+                                                args.reanudar, guardado, grabador,
+                                                cronometro, args.tiempos_cada, args.dtype,
+                                                args.procesos, args.hilos, args.teselas,
+                                                args.absorber, args.grosor, args.adaptar)
+    except ValueError as error:
+        parser.error(str(error))
+    finally:
+        if grabador is not None:
+            grabador.cerrar()
+        if cronometro is not None:
+            cronometro.cerrar()
+
+    guardar_serie(args.salida, MODELOS[args.modelo][2], serie_temporal(simulador, args.modelo))
+    print(f"{args.modelo}: {args.pasos} pasos, {simulador.n_particulas} partículas, "
+          f"dt {simulador.dt:.4g}, {pasos_por_segundo:.1f} pasos/s -> {args.salida}",
+          file=sys.stderr)
+    if cronometro is not None:
+        imprimir_fases(cronometro)
+
+
+if __name__ == "__main__":
+    main()
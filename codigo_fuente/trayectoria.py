@@ -0,0 +1,226 @@
+"""Grabación del campo completo (posiciones de v2, alturas de v3) a disco.
+
+Cada `cada` pasos se copia motor.campo() y un hilo de fondo lo escribe en
+bloques .npy abiertos como memoria mapeada, así el bucle de pasos no espera a
+la escritura y la grabación puede ocupar mucho más que la RAM. Un directorio
+de trayectoria contiene:
+
+    trayectoria.json       formato, versión, forma y tipo de los cuadros, cuadros escritos
+    bloque_00000.npy       cuadros_por_bloque cuadros (el último puede estar a medias)
+    tiempos_00000.npy      tiempo de simulación de cada cuadro del bloque
+
+Los cuadros se pueden guardar en float32 o float16 (la mitad o la cuarta parte
+de espacio; float16 conserva unas 3 cifras significativas). LectorTrayectoria
+recorta por rango de tiempo y por región sin cargar el archivo entero.
+"""
+import json
+import os
+import queue
+import threading
+
+import numpy as np
+
+FORMATO = 'simulador_ondas/trayectoria'
+VERSION = 1
+TIPOS = ('float64', 'float32', 'float16')
+
+# Tamaño orientativo de cada bloque
+BYTES_POR_BLOQUE = 64 * 2**20
+
+
+def ruta_bloque(ruta, indice):
+    return os.path.join(ruta, f'bloque_{indice:05d}.npy')
+
+
+def ruta_tiempos(ruta, indice):
+    return os.path.join(ruta, f'tiempos_{indice:05d}.npy')
+
+
+def escribir_cabecera(ruta, cabecera):
+    archivo = os.path.join(ruta, 'trayectoria.json')
+    with open(f'{archivo}.tmp', 'w') as salida:
+        json.dump(cabecera, salida, indent=2)
+    os.replace(f'{archivo}.tmp', archivo)
+
+
+class GrabadorTrayectoria:
+    """Graba motor.campo() cada `cada` pasos en el directorio `ruta`.
+
+    Se llama a registrar_paso(motor) tras cada paso_simulacion y a cerrar() al
+    terminar (o se usa con `with`). En el bucle solo se copia el cuadro; la
+    conversión de tipo y la escritura las hace el hilo de fondo. Si el disco no
+    da abasto y se acumulan `max_pendientes` cuadros, registrar_paso espera
+    (cuenta `esperas`) en lugar de seguir llenando la memoria.
+    """
+
+    def __init__(self, ruta, cada=1, dtype='float32', cuadros_por_bloque=None,
+                 max_pendientes=32):
+        if dtype not in TIPOS:
+            raise ValueError(f"Tipo de almacenamiento desconocido: {dtype!r} (opciones: {TIPOS})")
+        if cada < 1:
+            raise ValueError(f"cada debe ser positivo, no {cada}")
+        self.ruta = ruta
+        self.cada = int(cada)
+        self.dtype = np.dtype(dtype)
+        self.cuadros_por_bloque = cuadros_por_bloque
+        self.pasos = 0
+        self.cuadros = 0
+        self.esperas = 0
+        self.cabecera = None
+        self.error = None
+        self.pendientes = queue.Queue(maxsize=max_pendientes)
+        self.hilo = None
+
+    def iniciar(self, motor):
+        """Crea el directorio y el hilo escritor con la forma del primer cuadro"""
+        forma = motor.campo().shape
+        if self.cuadros_por_bloque is None:
+            bytes_cuadro = int(np.prod(forma)) * self.dtype.itemsize
+            self.cuadros_por_bloque = max(1, BYTES_POR_BLOQUE // bytes_cuadro)
+        os.makedirs(self.ruta, exist_ok=True)
+        self.cabecera = {
+            'formato': FORMATO,
+            'version': VERSION,
+            'clase': type(motor).__name__,
+            'forma': list(forma),
+            'dtype': self.dtype.name,
+            'cada': self.cada,
+            'dt': motor.dt,
+            'cuadros_por_bloque': self.cuadros_por_bloque,
+            'cuadros': 0,
+        }
+        escribir_cabecera(self.ruta, self.cabecera)
+        self.hilo = threading.Thread(target=self.escribir, name='trayectoria', daemon=True)
+        self.hilo.start()
+
+    def registrar_paso(self, motor):
+        """Cuenta un paso y encola una copia del campo si toca; True si se grabó"""
+        if self.error is not None:
+            raise RuntimeError("Falló la escritura de la trayectoria") from self.error
+        if getattr(motor, 'pausado', False):
+            return False
+        self.pasos += 1
+        if self.pasos % self.cada:
+            return False
+        if self.hilo is None:
+            self.iniciar(motor)
+
+        cuadro = (motor.tiempo, motor.campo().copy())
+        try:
+            self.pendientes.put_nowait(cuadro)
+        except queue.Full:
+            self.esperas += 1
+            self.pendientes.put(cuadro)
+        self.cuadros += 1
+        return True
+
+    def escribir(self):
+        """Bucle del hilo escritor: vuelca los cuadros encolados en bloques mapeados"""
+        bloque = tiempos = None
+        indice = posicion = escritos = 0
+        try:
+            while True:
+                cuadro = self.pendientes.get()
+                if cuadro is None:
+                    break
+                if bloque is None:
+                    forma = (self.cuadros_por_bloque,) + tuple(self.cabecera['forma'])
+                    bloque = np.lib.format.open_memmap(ruta_bloque(self.ruta, indice), mode='w+',
+                                                       dtype=self.dtype, shape=forma)
+                    tiempos = np.empty(self.cuadros_por_bloque)
+                tiempos[posicion], bloque[posicion] = cuadro
+                posicion += 1
+                escritos += 1
+                if posicion == self.cuadros_por_bloque:
+                    self.cerrar_bloque(bloque, tiempos, indice, posicion, escritos)
+                    bloque = None
+                    indice += 1
+                    posicion = 0
+            if bloque is not None:
+                self.cerrar_bloque(bloque, tiempos, indice, posicion, escritos)
+        except Exception as error:  # se informa desde el hilo principal
+            self.error = error
+            # Vaciar la cola para que el bucle de pasos no quede esperando
+            while self.pendientes.get() is not None:
+                pass
+
+    def cerrar_bloque(self, bloque, tiempos, indice, cuadros_bloque, escritos):
+        bloque.flush()
+        np.save(ruta_tiempos(self.ruta, indice), tiempos[:cuadros_bloque])
+        self.cabecera['cuadros'] = escritos
+        escribir_cabecera(self.ruta, self.cabecera)
+
+    def cerrar(self):
+        """Espera a que se escriban los cuadros pendientes y cierra la grabación"""
+        if self.hilo is not None:
+            self.pendientes.put(None)
+            self.hilo.join()
+            self.hilo = None
+        if self.error is not None:
+            raise RuntimeError("Falló la escritura de la trayectoria") from self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+
+class LectorTrayectoria:
+    """Acceso a una trayectoria grabada; los bloques se abren mapeados y solo se
+    lee del disco lo que se pide."""
+
+    def __init__(self, ruta):
+        with open(os.path.join(ruta, 'trayectoria.json')) as archivo:
+            cabecera = json.load(archivo)
+        if cabecera.get('formato') != FORMATO:
+            raise ValueError(f"No es una trayectoria del simulador (formato {cabecera.get('formato')!r})")
+        if cabecera.get('version') != VERSION:
+            raise ValueError(f"Versión de trayectoria {cabecera.get('version')} no soportada "
+                             f"(se esperaba {VERSION})")
+        self.ruta = ruta
+        self.cabecera = cabecera
+        self.forma = tuple(cabecera['forma'])
+        self.dtype = np.dtype(cabecera['dtype'])
+        self.cuadros_por_bloque = cabecera['cuadros_por_bloque']
+        self.cuadros = cabecera['cuadros']
+        n_bloques = -(-self.cuadros // self.cuadros_por_bloque)
+        self.tiempos = np.concatenate([np.load(ruta_tiempos(ruta, i)) for i in range(n_bloques)]
+                                      or [np.empty(0)])
+        self.bloques = {}
+
+    def __len__(self):
+        return self.cuadros
+
+    def bloque(self, indice):
+        if indice not in self.bloques:
+            self.bloques[indice] = np.load(ruta_bloque(self.ruta, indice), mmap_mode='r')
+        return self.bloques[indice]
+
+    def __getitem__(self, indice):
+        """Un cuadro por su número (admite negativos)"""
+        indice = range(self.cuadros)[indice]
+        return np.array(self.bloque(indice // self.cuadros_por_bloque)[indice % self.cuadros_por_bloque])
+
+    def leer(self, t_inicio=None, t_fin=None, region=(), paso=1):
+        """(tiempos, cuadros) con t_inicio <= t <= t_fin, uno de cada `paso`.
+
+        `region` recorta cada cuadro: p. ej. (slice(10, 20), slice(10, 20), 1)
+        en v2 son las y de un cuadrado de 10x10 partículas, y (slice(100, 200),)
+        en v3 un tramo de la superficie.
+        """
+        inicio = 0 if t_inicio is None else int(np.searchsorted(self.tiempos, t_inicio, 'left'))
+        fin = self.cuadros if t_fin is None else int(np.searchsorted(self.tiempos, t_fin, 'right'))
+        indices = np.arange(inicio, max(inicio, fin), paso)
+        region = region if isinstance(region, tuple) else (region,)
+
+        partes = []
+        por_bloque = self.cuadros_por_bloque
+        for numero in np.unique(indices // por_bloque):
+            locales = indices[indices // por_bloque == numero] - numero * por_bloque
+            datos = self.bloque(numero)[locales[0]:locales[-1] + 1:paso]
+            partes.append(np.array(datos[(slice(None),) + region]))
+        if not partes:
+            vacio = np.empty((1,) + self.forma, dtype=self.dtype)[(slice(None),) + region]
+            return self.tiempos[indices], vacio[:0].copy()
+        return self.tiempos[indices], np.concatenate(partes)
@@ -1,145 +1,51 @@
+import time
+
 import numpy as np
 import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 from matplotlib.widgets import Slider, Button, CheckButtons
 import matplotlib.patches as patches
 
-class SimuladorOndas:
-    def __init__(self):
-        # Parámetros configurables
-        self.n = 50
-        self.espaciado = 0.2
-        self.masa = 1.0
-        self.k = 25.0
-        self.damping = 0.02
-        self.dt = 0.03
-        
-        # Control de simulación
-        self.pausado = False
-        self.tiempo = 0
-        self.frame_count = 0
-        
-        # Inicialización de la red
-        self.inicializar_sistema()
-        
-        # Datos para análisis
-        self.amplitudes_centro = []
-        self.amplitudes_borde = []
-        self.tiempos = []
+from cronometro import Cronometro
+from espectro import AnalizadorEspectral
+from historial import CAPACIDAD_HISTORIAL
+from motores import MotorOndas
+from render import GestorBlit, RitmoPasos, ampliar_limites_y, desplazar_ventana
+
+class SimuladorOndas(MotorOndas):
+    # 'blit': solo se redibujan los artistas que cambian; 'completo': toda la figura
+    MODOS_RENDER = ('blit', 'completo')
+    INTERVALO_MS = 50  # Periodo del temporizador de la animación
+    
+    def __init__(self, n=50, motor='vectorizado', capacidad_historial=CAPACIDAD_HISTORIAL,
+                 segmento_espectro=128, modo_render='blit', pasos_por_cuadro='auto',
+                 tiempo_real=1.0, integrador='euler', dt=None, dtype='float64',
+                 cronometrar=False, registro_tiempos=None, hilos=None):
+        if modo_render not in self.MODOS_RENDER:
+            raise ValueError(f"Modo de render desconocido: {modo_render!r} "
+                             f"(opciones: {self.MODOS_RENDER})")
+        self.modo_render = modo_render
+        self.cuadro = 0
+        if cronometrar or registro_tiempos:
+            # Tiempos por fase de pasos y cuadros, en el panel de información y
+            # opcionalmente en un archivo de líneas JSON (ver cronometro.py)
+            self.cronometro = Cronometro(registro=registro_tiempos)
+        
+        # Estado y física (sin interfaz)
+        super().__init__(n=n, motor=motor, capacidad_historial=capacidad_historial,
+                         integrador=integrador, dt=dt, dtype=dtype, hilos=hilos)
+        
+        # Pasos de física por cuadro dibujado (ver render.RitmoPasos)
+        self.ritmo = RitmoPasos(self.dt, pasos_por_cuadro, tiempo_real,
+                                presupuesto=0.8 * self.INTERVALO_MS / 1000)
+        
+        # Espectro en línea de centro y borde (una muestra cada 2 frames)
+        self.analizador = AnalizadorEspectral(self.dt * 2, segmento=segmento_espectro,
+                                              solapamiento=0.75, n_sondas=2)
+        self.muestras_analizadas = 0
         
         # Configuración de visualización
         self.setup_visualizacion()
         
-    def inicializar_sistema(self):
-        """Inicializa las posiciones y velocidades de las partículas"""
-        x_coords = np.linspace(0, (self.n - 1) * self.espaciado, self.n)
-        y_coords = np.linspace(0, (self.n - 1) * self.espaciado, self.n)
-        X, Y = np.meshgrid(x_coords, y_coords)
-        
-        self.posiciones_iniciales = np.stack((X.flatten(), Y.flatten()), axis=-1)
-        self.posiciones = self.posiciones_iniciales.copy()
-        self.velocidades = np.zeros_like(self.posiciones)
-        self.n_particulas = self.posiciones.shape[0]
-        
-        # Índices importantes
-        self.indice_centro = (self.n // 2) * self.n + (self.n // 2)
-        self.indice_borde = (self.n - 1) * self.n + (self.n // 2)
-        
-        # Calcular vecinos
-        self.calcular_vecinos()
-        
-    def calcular_vecinos(self):
-        """Calcula los vecinos directos de cada partícula"""
-        self.vecinos = []
-        for i in range(self.n_particulas):
-            fila_i = i // self.n
-            col_i = i % self.n
-            conexiones = []
-            
-            # Vecinos directos (4-conectividad)
-            for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
-                f, c = fila_i + dy, col_i + dx
-                if 0 <= f < self.n and 0 <= c < self.n:
-                    j = f * self.n + c
-                    conexiones.append(j)
-            
-            self.vecinos.append(conexiones)
-    
-    def aplicar_perturbacion(self, tipo='pulso', centro=None, amplitud=3.0, ancho=1.5):
-        """Aplica diferentes tipos de perturbaciones"""
-        if centro is None:
-            centro = np.array([self.posiciones_iniciales[self.indice_centro, 0], 
-                             self.posiciones_iniciales[self.indice_centro, 1]])
-        
-        if tipo == 'pulso':
-            # Perturbación circular (pulso)
-            for i in range(self.n_particulas):
-                dist = np.linalg.norm(self.posiciones_iniciales[i] - centro)
-                if dist < ancho:
-                    factor = np.exp(-dist**2 / (ancho/2)**2)
-                    self.velocidades[i][1] += factor * amplitud
-                    
-        elif tipo == 'senoidal':
-            # Fuente senoidal continua en el centro
-            self.fuente_activa = True
-            self.frecuencia_fuente = 0.5
-            self.amplitud_fuente = amplitud
-            
-        elif tipo == 'lineal':
-            # Perturbación lineal (frente de onda)
-            fila_centro = int(centro[1] / self.espaciado)
-            for i in range(self.n_particulas):
-                fila_i = i // self.n
-                if abs(fila_i - fila_centro) <= 2:
-                    self.velocidades[i][1] += amplitud * np.exp(-abs(fila_i - fila_centro))
-    
-    def paso_simulacion(self):
-        """Ejecuta un paso de la simulación"""
-        if self.pausado:
-            return
-            
-        # Calcular fuerzas elásticas
-        aceleraciones = np.zeros_like(self.posiciones)
-        
-        for i in range(self.n_particulas):
-            for j in self.vecinos[i]:
-                # Vector entre partículas
-                delta = self.posiciones[j] - self.posiciones[i]
-                delta_inicial = (self.posiciones_iniciales[j] - 
-                               self.posiciones_iniciales[i])
-                
-                # Deformación respecto a la posición de equilibrio
-                deformacion = delta - delta_inicial
-                
-                # Fuerza elástica proporcional a la deformación
-                fuerza = self.k * deformacion
-                aceleraciones[i] += fuerza / self.masa
-        
-        # Aplicar fuente senoidal si está activa
-        if hasattr(self, 'fuente_activa') and self.fuente_activa:
-            fase = 2 * np.pi * self.frecuencia_fuente * self.tiempo
-            fuerza_fuente = self.amplitud_fuente * np.sin(fase)
-            self.velocidades[self.indice_centro][1] += fuerza_fuente * self.dt
-        
-        # Integración temporal
-        self.velocidades += aceleraciones * self.dt
-        self.velocidades *= (1 - self.damping)  # Amortiguamiento
-        self.posiciones += self.velocidades * self.dt
-        
-        self.tiempo += self.dt
-        self.frame_count += 1
-        
-        # Guardar datos para análisis
-        if self.frame_count % 2 == 0:  # Cada 2 frames
-            amp_centro = (self.posiciones[self.indice_centro][1] - 
-                         self.posiciones_iniciales[self.indice_centro][1])
-            amp_borde = (self.posiciones[self.indice_borde][1] - 
-                        self.posiciones_iniciales[self.indice_borde][1])
-            
-            self.amplitudes_centro.append(amp_centro)
-            self.amplitudes_borde.append(amp_borde)
-            self.tiempos.append(self.tiempo)
-    
     def setup_visualizacion(self):
         """Configura la interfaz gráfica"""
         self.fig = plt.figure(figsize=(16, 10))
@@ -165,12 +71,19 @@ class SimuladorOndas:
         self.ax_info = self.fig.add_subplot(self.gs[0, 2])
         self.ax_info.set_title("Parámetros Físicos")
         self.ax_info.axis('off')
+        self.texto_info = self.ax_info.text(0.05, 0.95, "", transform=self.ax_info.transAxes,
+                                            fontsize=9, verticalalignment='top',
+                                            fontfamily='monospace')
         
         # Análisis de frecuencia
         self.ax_freq = self.fig.add_subplot(self.gs[1, 2])
         self.ax_freq.set_title("Espectro de Frecuencia")
         self.ax_freq.set_xlabel("Frecuencia")
-        self.ax_freq.set_ylabel("Amplitud")
+        self.ax_freq.set_ylabel("Densidad espectral")
+        self.ax_freq.grid(True, alpha=0.3)
+        self.texto_pico = self.ax_freq.text(0.97, 0.95, "", transform=self.ax_freq.transAxes,
+                                            fontsize=9, verticalalignment='top',
+                                            horizontalalignment='right')
         
         # Controles
         self.setup_controles()
@@ -184,6 +97,10 @@ class SimuladorOndas:
         self.line_borde, = self.ax_amp.plot([], [], 'b-', label='Borde', linewidth=2)
         self.ax_amp.legend()
         
+        # Líneas del espectro (se actualizan, no se vuelven a crear)
+        self.line_freq_centro, = self.ax_freq.plot([], [], 'r-', linewidth=2)
+        self.line_freq_borde, = self.ax_freq.plot([], [], 'b-', linewidth=1)
+        
         # Marcadores especiales
         self.marcar_puntos_importantes()
         
@@ -248,30 +165,26 @@ class SimuladorOndas:
         self.ax_sim.legend()
     
     def actualizar_k(self, val):
-        self.k = self.slider_k.val
+        self.k = float(self.slider_k.val)
         
     def actualizar_damping(self, val):
-        self.damping = self.slider_damp.val
+        self.damping = float(self.slider_damp.val)
         
     def actualizar_frecuencia(self, val):
         if hasattr(self, 'frecuencia_fuente'):
-            self.frecuencia_fuente = self.slider_freq.val
+            self.frecuencia_fuente = float(self.slider_freq.val)
     
     def reset_simulacion(self, event):
         """Reinicia la simulación"""
-        self.posiciones = self.posiciones_iniciales.copy()
-        self.velocidades = np.zeros_like(self.posiciones)
-        self.tiempo = 0
-        self.frame_count = 0
-        self.amplitudes_centro.clear()
-        self.amplitudes_borde.clear()
-        self.tiempos.clear()
-        self.fuente_activa = False
+        self.reiniciar()
+        self.analizador.reiniciar()
+        self.muestras_analizadas = 0
         
     def toggle_pausa(self, event):
         """Pausa/reanuda la simulación"""
         self.pausado = not self.pausado
         self.btn_pause.label.set_text('Reanudar' if self.pausado else 'Pausa')
+        self.fig.canvas.draw_idle()
         
     def on_click(self, event):
         """Maneja clicks en la simulación"""
@@ -283,14 +196,17 @@ class SimuladorOndas:
         """Actualiza el panel de información"""
         if len(self.amplitudes_centro) > 10:
             # Calcular velocidad de onda aproximada
-            max_amp = max(self.amplitudes_centro[-50:]) if len(self.amplitudes_centro) >= 50 else max(self.amplitudes_centro)
+            max_amp = np.max(self.amplitudes_centro.vista(50))
             
             # Información física
+            rendimiento = f"\n• {self.cronometro.resumen()}" if self.cronometro.activo else ""
             info_text = f"""
 PARÁMETROS ACTUALES:
 • Rigidez (k): {self.k:.1f}
 • Amortiguamiento: {self.damping:.3f}
 • Tiempo: {self.tiempo:.1f}s
+• Pasos por cuadro: {self.ritmo.pasos}
+• Integrador: {self.integrador} (dt {self.dt:.3f}, máx. {self.dt_estable():.3f}){rendimiento}
 
 MEDICIONES:
 • Amplitud máxima: {max_amp:.2f}
@@ -303,76 +219,103 @@ INSTRUCCIONES:
 • Observar propagación y reflexiones
             """
             
-            self.ax_info.clear()
-            self.ax_info.text(0.05, 0.95, info_text, transform=self.ax_info.transAxes,
-                            fontsize=9, verticalalignment='top', fontfamily='monospace')
-            self.ax_info.axis('off')
+            self.texto_info.set_text(info_text)
     
     def analizar_frecuencia(self):
-        """Analiza el espectro de frecuencia"""
-        if len(self.amplitudes_centro) > 50:
-            # FFT de las amplitudes del centro
-            y = np.array(self.amplitudes_centro[-100:]) if len(self.amplitudes_centro) >= 100 else np.array(self.amplitudes_centro)
-            if len(y) > 10:
-                fft = np.fft.fft(y)
-                freqs = np.fft.fftfreq(len(y), self.dt * 2)  # *2 porque guardamos cada 2 frames
-                
-                # Solo frecuencias positivas
-                pos_mask = freqs > 0
-                freqs_pos = freqs[pos_mask]
-                fft_pos = np.abs(fft[pos_mask])
-                
-                self.ax_freq.clear()
-                self.ax_freq.plot(freqs_pos, fft_pos, 'b-', linewidth=2)
-                self.ax_freq.set_xlabel("Frecuencia")
-                self.ax_freq.set_ylabel("Amplitud")
-                self.ax_freq.set_title("Espectro de Frecuencia")
-                self.ax_freq.grid(True, alpha=0.3)
+        """Pasa las muestras nuevas al analizador y redibuja el espectro si cambió"""
+        nuevas = min(self.amplitudes_centro.total - self.muestras_analizadas,
+                     len(self.amplitudes_centro))
+        self.muestras_analizadas = self.amplitudes_centro.total
+        if nuevas <= 0:
+            return
+        
+        bloque = np.column_stack((self.amplitudes_centro.vista(nuevas),
+                                  self.amplitudes_borde.vista(nuevas)))
+        if self.analizador.agregar_bloque(bloque):
+            freqs = self.analizador.frecuencias
+            self.line_freq_centro.set_data(freqs, self.analizador.densidad[0])
+            self.line_freq_borde.set_data(freqs, self.analizador.densidad[1])
+            self.ax_freq.relim()
+            self.ax_freq.autoscale_view()
+            self.texto_pico.set_text(f"pico: {self.analizador.frecuencia_dominante[0]:.3f}")
     
     def actualizar_animacion(self, frame):
         """Actualiza la animación"""
-        self.paso_simulacion()
+        if not self.pausado:
+            self.ritmo.avanzar(self.paso_simulacion)
+        self.cronometro.iniciar()
         
         # Actualizar posiciones de partículas
         colores = plt.cm.viridis((self.posiciones[:, 1] - self.posiciones_iniciales[:, 1] + 2) / 4)
         self.scatter.set_offsets(self.posiciones)
         self.scatter.set_color(colores)
         
-        # Actualizar gráficos de amplitud
+        # Actualizar gráficos de amplitud (solo la ventana visible, sin copiar el historial)
         if len(self.tiempos) > 1:
-            self.line_centro.set_data(self.tiempos, self.amplitudes_centro)
-            self.line_borde.set_data(self.tiempos, self.amplitudes_borde)
+            self.line_centro.set_data(self.tiempos.vista(100), self.amplitudes_centro.vista(100))
+            self.line_borde.set_data(self.tiempos.vista(100), self.amplitudes_borde.vista(100))
+            
+            # Mínimo y máximo acumulados por el historial: O(1)
+            y_max = max(self.amplitudes_centro.maximo, self.amplitudes_borde.maximo) * 1.1
+            y_min = min(self.amplitudes_centro.minimo, self.amplitudes_borde.minimo) * 1.1
             
-            # Ajustar límites
-            if len(self.tiempos) > 100:
-                self.ax_amp.set_xlim(self.tiempos[-100], self.tiempos[-1])
+            # Ajustar límites (con blit, a saltos, para no invalidar el fondo cada frame)
+            if self.modo_render == 'blit':
+                desplazar_ventana(self.ax_amp, self.tiempos[-1], 100 * 2 * self.dt)
+                ampliar_limites_y(self.ax_amp, y_min, y_max)
             else:
-                self.ax_amp.set_xlim(0, max(self.tiempos))
-                
-            if self.amplitudes_centro:
-                y_max = max(max(self.amplitudes_centro), max(self.amplitudes_borde)) * 1.1
-                y_min = min(min(self.amplitudes_centro), min(self.amplitudes_borde)) * 1.1
+                if len(self.tiempos) > 100:
+                    self.ax_amp.set_xlim(self.tiempos[-100], self.tiempos[-1])
+                else:
+                    self.ax_amp.set_xlim(0, self.tiempos[-1])
                 self.ax_amp.set_ylim(y_min, y_max)
         
         # Actualizar información cada cierto tiempo
-        if self.frame_count % 20 == 0:
+        if frame % 20 == 0:
+            self.cronometro.vuelta('render')
             self.actualizar_info()
             self.analizar_frecuencia()
+            self.cronometro.vuelta('analisis')
         
-        return self.scatter, self.line_centro, self.line_borde
+        return self.artistas_animados()
+    
+    def artistas_animados(self):
+        """Artistas que cambian de un frame a otro"""
+        return (self.scatter, self.line_centro, self.line_borde, self.line_freq_centro,
+                self.line_freq_borde, self.texto_info, self.texto_pico)
+    
+    def cuadro_animacion(self):
+        """Un cuadro: los pasos de física que toquen y un solo dibujado"""
+        self.actualizar_animacion(self.cuadro)
+        self.cuadro += 1
+        
+        inicio = time.perf_counter()
+        if self.modo_render == 'blit':
+            self.gestor_blit.actualizar()
+        else:
+            self.fig.canvas.draw()
+            self.fig.canvas.flush_events()
+        self.ritmo.registrar_render(time.perf_counter() - inicio)
+        self.cronometro.vuelta('render')
+        self.cronometro.cerrar_cuadro(tiempo=self.tiempo)
     
     def ejecutar(self):
         """Ejecuta la simulación"""
         # Aplicar perturbación inicial
         self.aplicar_perturbacion('pulso')
         
-        # Crear animación
-        self.ani = animation.FuncAnimation(
-            self.fig, self.actualizar_animacion, 
-            frames=1000, interval=50, blit=False, repeat=True
-        )
-        
         plt.tight_layout()
+        
+        if self.modo_render == 'blit':
+            # El fondo se renueva solo cuando cambian los límites
+            self.gestor_blit = GestorBlit(self.fig.canvas, self.artistas_animados())
+        
+        # Temporizador propio: un dibujado por cuadro, con varios pasos de física
+        self.timer = self.fig.canvas.new_timer(interval=self.INTERVALO_MS)
+        self.timer.add_callback(self.cuadro_animacion)
+        self.timer.start()
+        
+        self.fig.canvas.mpl_connect('close_event', lambda evento: self.cronometro.cerrar())
         plt.show()
 
 # Ejecutar el simulador
@@ -1,172 +1,57 @@
+import time
+
 import numpy as np
 import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 from matplotlib.widgets import Slider, Button
 import matplotlib.patches as patches
 
-class SimuladorOndasPerfil:
-    def __init__(self):
-        # Parámetros del sistema
-        self.n_particulas = 80
-        self.longitud = 20.0
-        self.altura_equilibrio = 5.0
-        self.espaciado = self.longitud / (self.n_particulas - 1)
-        
-        # Parámetros físicos
-        self.tension_superficial = 15.0
-        self.gravedad = 9.8
-        self.viscosidad = 0.05
-        self.densidad = 1.0
-        self.dt = 0.02
-        
-        # Control de simulación
-        self.tiempo = 0
-        self.pausado = False
+from cronometro import Cronometro
+from espectro import AnalizadorEspectral
+from historial import CAPACIDAD_HISTORIAL
+from motores import MotorPerfil
+from render import GestorBlit, RitmoPasos, ampliar_limites_y, desplazar_ventana
+
+class SimuladorOndasPerfil(MotorPerfil):
+    # 'blit': solo se redibujan los artistas que cambian; 'completo': toda la figura
+    MODOS_RENDER = ('blit', 'completo')
+    INTERVALO_MS = 50  # Periodo del temporizador de la animación
+    
+    def __init__(self, n_particulas=80, motor='vectorizado',
+                 capacidad_historial=CAPACIDAD_HISTORIAL, segmento_espectro=256,
+                 modo_render='blit', pasos_por_cuadro='auto', tiempo_real=1.0,
+                 integrador='euler', dt=None, dtype='float64', cronometrar=False,
+                 registro_tiempos=None, hilos=None):
+        if modo_render not in self.MODOS_RENDER:
+            raise ValueError(f"Modo de render desconocido: {modo_render!r} "
+                             f"(opciones: {self.MODOS_RENDER})")
+        self.modo_render = modo_render
+        self.cuadro = 0
+        if cronometrar or registro_tiempos:
+            # Tiempos por fase de pasos y cuadros, en el panel de información y
+            # opcionalmente en un archivo de líneas JSON (ver cronometro.py)
+            self.cronometro = Cronometro(registro=registro_tiempos)
+        
+        # Estado y física (sin interfaz)
+        super().__init__(n_particulas=n_particulas, motor=motor,
+                         capacidad_historial=capacidad_historial,
+                         integrador=integrador, dt=dt, dtype=dtype, hilos=hilos)
+        
+        # Pasos de física por cuadro dibujado (ver render.RitmoPasos)
+        self.ritmo = RitmoPasos(self.dt, pasos_por_cuadro, tiempo_real,
+                                presupuesto=0.8 * self.INTERVALO_MS / 1000)
+        
+        # Espectro en línea de la altura en el centro (una muestra por paso)
+        self.analizador = AnalizadorEspectral(self.dt, segmento=segmento_espectro,
+                                              solapamiento=0.75)
+        self.muestras_analizadas = 0
+        
+        # Opciones de visualización
         self.mostrar_particulas = True
         self.mostrar_superficie = True
         
-        # Inicializar sistema
-        self.inicializar_agua()
-        
-        # Datos para análisis
-        self.alturas_tiempo = []
-        self.tiempos = []
-        self.energias = []
-        
         # Configurar visualización
         self.setup_visualizacion()
         
-    def inicializar_agua(self):
-        """Inicializa las posiciones de las partículas de agua"""
-        # Posiciones horizontales fijas
-        self.x_particulas = np.linspace(0, self.longitud, self.n_particulas)
-        
-        # Alturas iniciales (superficie en equilibrio)
-        self.y_particulas = np.full(self.n_particulas, self.altura_equilibrio)
-        self.y_equilibrio = self.y_particulas.copy()
-        
-        # Velocidades verticales
-        self.velocidades = np.zeros(self.n_particulas)
-        
-        # Condiciones de frontera (paredes del tanque)
-        self.pared_izq = True
-        self.pared_der = True
-        
-    def aplicar_perturbacion(self, tipo='gota', posicion=None, amplitud=2.0, ancho=2.0):
-        """Aplica diferentes tipos de perturbaciones"""
-        if posicion is None:
-            posicion = self.longitud / 2  # Centro por defecto
-            
-        # Encontrar índice más cercano a la posición
-        idx_centro = np.argmin(np.abs(self.x_particulas - posicion))
-        
-        if tipo == 'gota':
-            # Simula una gota cayendo
-            for i in range(self.n_particulas):
-                dist = abs(self.x_particulas[i] - posicion)
-                if dist < ancho:
-                    factor = np.exp(-(dist/ancho)**2)
-                    self.y_particulas[i] -= amplitud * factor
-                    self.velocidades[i] = -amplitud * factor * 2
-                    
-        elif tipo == 'onda_senoidal':
-            # Fuente senoidal continua
-            self.fuente_activa = True
-            self.pos_fuente = posicion
-            self.frecuencia = 1.0
-            self.amplitud_fuente = amplitud
-            
-        elif tipo == 'piston':
-            # Simulación de pistón en un extremo
-            if posicion < self.longitud / 2:  # Lado izquierdo
-                for i in range(min(5, self.n_particulas//4)):
-                    self.velocidades[i] = amplitud
-            else:  # Lado derecho
-                for i in range(max(self.n_particulas-5, 3*self.n_particulas//4), self.n_particulas):
-                    self.velocidades[i] = amplitud
-                    
-        elif tipo == 'tsunami':
-            # Levantamiento súbito del fondo (tsunami)
-            inicio = max(0, idx_centro - int(ancho))
-            fin = min(self.n_particulas, idx_centro + int(ancho))
-            for i in range(inicio, fin):
-                self.y_particulas[i] += amplitud
-                self.velocidades[i] += amplitud * 0.5
-    
-    def calcular_fuerzas(self):
-        """Calcula las fuerzas que actúan sobre cada partícula"""
-        fuerzas = np.zeros(self.n_particulas)
-        
-        for i in range(self.n_particulas):
-            # Fuerza gravitacional (restauradora hacia equilibrio)
-            fuerza_gravedad = -self.gravedad * (self.y_particulas[i] - self.y_equilibrio[i])
-            
-            # Fuerza de tensión superficial (interacción con vecinos)
-            fuerza_tension = 0
-            if i > 0:  # Vecino izquierdo
-                diff_izq = (self.y_particulas[i-1] - self.y_particulas[i])
-                fuerza_tension += self.tension_superficial * diff_izq
-                
-            if i < self.n_particulas - 1:  # Vecino derecho
-                diff_der = (self.y_particulas[i+1] - self.y_particulas[i])
-                fuerza_tension += self.tension_superficial * diff_der
-            
-            # Fuerza de viscosidad (proporcional a la velocidad)
-            fuerza_viscosidad = -self.viscosidad * self.velocidades[i]
-            
-            fuerzas[i] = fuerza_gravedad + fuerza_tension + fuerza_viscosidad
-            
-        return fuerzas
-    
-    def aplicar_condiciones_frontera(self):
-        """Aplica condiciones de frontera en las paredes"""
-        if self.pared_izq:
-            # Pared rígida izquierda (reflexión)
-            self.y_particulas[0] = self.y_equilibrio[0]
-            self.velocidades[0] = 0
-            
-        if self.pared_der:
-            # Pared rígida derecha (reflexión)
-            self.y_particulas[-1] = self.y_equilibrio[-1]
-            self.velocidades[-1] = 0
-    
-    def paso_simulacion(self):
-        """Ejecuta un paso de la simulación"""
-        if self.pausado:
-            return
-            
-        # Aplicar fuente senoidal si está activa
-        if hasattr(self, 'fuente_activa') and self.fuente_activa:
-            idx_fuente = np.argmin(np.abs(self.x_particulas - self.pos_fuente))
-            fase = 2 * np.pi * self.frecuencia * self.tiempo
-            self.velocidades[idx_fuente] += self.amplitud_fuente * np.sin(fase) * self.dt
-        
-        # Calcular fuerzas
-        fuerzas = self.calcular_fuerzas()
-        
-        # Integración temporal (Verlet)
-        aceleraciones = fuerzas / self.densidad
-        
-        # Actualizar velocidades y posiciones
-        self.velocidades += aceleraciones * self.dt
-        self.y_particulas += self.velocidades * self.dt
-        
-        # Aplicar condiciones de frontera
-        self.aplicar_condiciones_frontera()
-        
-        self.tiempo += self.dt
-        
-        # Guardar datos para análisis
-        altura_centro = self.y_particulas[self.n_particulas//2] - self.y_equilibrio[self.n_particulas//2]
-        self.alturas_tiempo.append(altura_centro)
-        self.tiempos.append(self.tiempo)
-        
-        # Calcular energía total
-        energia_cinetica = 0.5 * np.sum(self.velocidades**2)
-        energia_potencial = 0.5 * self.gravedad * np.sum((self.y_particulas - self.y_equilibrio)**2)
-        energia_total = energia_cinetica + energia_potencial
-        self.energias.append(energia_total)
-    
     def setup_visualizacion(self):
         """Configura la interfaz gráfica"""
         self.fig = plt.figure(figsize=(16, 10))
@@ -198,6 +83,9 @@ class SimuladorOndasPerfil:
         self.ax_info = self.fig.add_subplot(self.gs[0, 2])
         self.ax_info.set_title("Parámetros Físicos")
         self.ax_info.axis('off')
+        self.texto_info = self.ax_info.text(0.05, 0.95, "", transform=self.ax_info.transAxes,
+                                            fontsize=9, verticalalignment='top',
+                                            fontfamily='monospace')
         
         # Gráfico de energía
         self.ax_energia = self.fig.add_subplot(self.gs[1, 2])
@@ -278,10 +166,10 @@ class SimuladorOndasPerfil:
         self.btn_tsunami = Button(ax_tsunami, 'Tsunami')
         
         # Conectar eventos
-        self.slider_tension.on_changed(lambda val: setattr(self, 'tension_superficial', val))
-        self.slider_viscosidad.on_changed(lambda val: setattr(self, 'viscosidad', val))
-        self.slider_gravedad.on_changed(lambda val: setattr(self, 'gravedad', val))
-        self.slider_frecuencia.on_changed(lambda val: setattr(self, 'frecuencia', val))
+        self.slider_tension.on_changed(lambda val: setattr(self, 'tension_superficial', float(val)))
+        self.slider_viscosidad.on_changed(lambda val: setattr(self, 'viscosidad', float(val)))
+        self.slider_gravedad.on_changed(lambda val: setattr(self, 'gravedad', float(val)))
+        self.slider_frecuencia.on_changed(lambda val: setattr(self, 'frecuencia', float(val)))
         
         self.btn_reset.on_clicked(self.reset_simulacion)
         self.btn_pause.on_clicked(self.toggle_pausa)
@@ -295,17 +183,15 @@ class SimuladorOndasPerfil:
     
     def reset_simulacion(self, event):
         """Reinicia la simulación"""
-        self.inicializar_agua()
-        self.tiempo = 0
-        self.alturas_tiempo.clear()
-        self.tiempos.clear()
-        self.energias.clear()
-        self.fuente_activa = False
+        self.reiniciar()
+        self.analizador.reiniciar()
+        self.muestras_analizadas = 0
         
     def toggle_pausa(self, event):
         """Pausa/reanuda la simulación"""
         self.pausado = not self.pausado
         self.btn_pause.label.set_text('Reanudar' if self.pausado else 'Pausa')
+        self.fig.canvas.draw_idle()
         
     def on_click(self, event):
         """Maneja clicks en la simulación"""
@@ -316,36 +202,31 @@ class SimuladorOndasPerfil:
     def actualizar_info(self):
         """Actualiza el panel de información"""
         if len(self.alturas_tiempo) > 5:
-            altura_max = max(self.alturas_tiempo[-50:]) if len(self.alturas_tiempo) >= 50 else max(self.alturas_tiempo)
+            altura_max = np.max(self.alturas_tiempo.vista(50))
             energia_actual = self.energias[-1] if self.energias else 0
             
-            # Calcular longitud de onda aproximada
+            # Longitud de onda a partir de la frecuencia dominante (Welch en línea)
+            nuevas = min(self.alturas_tiempo.total - self.muestras_analizadas,
+                         len(self.alturas_tiempo))
+            self.muestras_analizadas = self.alturas_tiempo.total
+            if nuevas > 0:
+                self.analizador.agregar_bloque(self.alturas_tiempo.vista(nuevas))
+            
             longitud_onda = "N/A"
-            if len(self.alturas_tiempo) > 10:
-                # Análisis simple de período
-                alturas_recientes = self.alturas_tiempo[-50:]
-                if len(alturas_recientes) > 20:
-                    # Encontrar picos
-                    picos = []
-                    for i in range(1, len(alturas_recientes)-1):
-                        if (alturas_recientes[i] > alturas_recientes[i-1] and 
-                            alturas_recientes[i] > alturas_recientes[i+1] and
-                            alturas_recientes[i] > 0.1):
-                            picos.append(i)
-                    
-                    if len(picos) >= 2:
-                        periodo_frames = np.mean(np.diff(picos))
-                        periodo_tiempo = periodo_frames * self.dt
-                        if periodo_tiempo > 0:
-                            velocidad = np.sqrt(self.tension_superficial / self.densidad)
-                            longitud_onda = f"{velocidad * periodo_tiempo:.2f}m"
+            frecuencia = self.analizador.frecuencia_dominante[0]
+            if np.isfinite(frecuencia) and frecuencia > 0:
+                velocidad = np.sqrt(self.tension_superficial / self.densidad)
+                longitud_onda = f"{velocidad / frecuencia:.2f}m"
             
+            rendimiento = f"\n• {self.cronometro.resumen()}" if self.cronometro.activo else ""
             info_text = f"""
 PARÁMETROS ACTUALES:
 • Tensión Superficial: {self.tension_superficial:.1f}
 • Viscosidad: {self.viscosidad:.3f}
 • Gravedad: {self.gravedad:.1f} m/s²
 • Tiempo: {self.tiempo:.1f}s
+• Pasos por cuadro: {self.ritmo.pasos}
+• Integrador: {self.integrador} (dt {self.dt:.3f}, máx. {self.dt_estable():.3f}){rendimiento}
 
 MEDICIONES:
 • Amplitud máxima: {altura_max:.3f}m
@@ -360,14 +241,13 @@ INSTRUCCIONES:
 • Observar reflexiones en paredes
             """
             
-            self.ax_info.clear()
-            self.ax_info.text(0.05, 0.95, info_text, transform=self.ax_info.transAxes,
-                            fontsize=9, verticalalignment='top', fontfamily='monospace')
-            self.ax_info.axis('off')
+            self.texto_info.set_text(info_text)
     
     def actualizar_animacion(self, frame):
         """Actualiza la animación"""
-        self.paso_simulacion()
+        if not self.pausado:
+            self.ritmo.avanzar(self.paso_simulacion)
+        self.cronometro.iniciar()
         
         # Actualizar superficie del agua
         self.line_superficie.set_data(self.x_particulas, self.y_particulas)
@@ -379,48 +259,83 @@ INSTRUCCIONES:
             self.scatter_particulas.set_offsets(np.column_stack([self.x_particulas, self.y_particulas]))
             self.scatter_particulas.set_color(colores)
         
-        # Actualizar gráfico de altura
+        # Actualizar gráfico de altura (solo la ventana visible, sin copiar el historial)
         if len(self.tiempos) > 1:
-            self.line_altura.set_data(self.tiempos, self.alturas_tiempo)
-            if len(self.tiempos) > 200:
-                self.ax_altura.set_xlim(self.tiempos[-200], self.tiempos[-1])
-            else:
-                self.ax_altura.set_xlim(0, max(self.tiempos))
+            self.line_altura.set_data(self.tiempos.vista(200), self.alturas_tiempo.vista(200))
+            
+            # Mínimo y máximo acumulados por el historial: O(1)
+            y_max = self.alturas_tiempo.maximo * 1.1
+            y_min = self.alturas_tiempo.minimo * 1.1
             
-            if self.alturas_tiempo:
-                y_max = max(self.alturas_tiempo) * 1.1
-                y_min = min(self.alturas_tiempo) * 1.1
+            # Con blit los límites cambian a saltos, para no invalidar el fondo cada frame
+            if self.modo_render == 'blit':
+                desplazar_ventana(self.ax_altura, self.tiempos[-1], 200 * self.dt)
+                ampliar_limites_y(self.ax_altura, y_min, y_max)
+            else:
+                if len(self.tiempos) > 200:
+                    self.ax_altura.set_xlim(self.tiempos[-200], self.tiempos[-1])
+                else:
+                    self.ax_altura.set_xlim(0, self.tiempos[-1])
                 self.ax_altura.set_ylim(y_min, y_max)
         
         # Actualizar gráfico de energía
         if len(self.energias) > 1:
-            self.line_energia.set_data(self.tiempos, self.energias)
-            if len(self.tiempos) > 200:
-                self.ax_energia.set_xlim(self.tiempos[-200], self.tiempos[-1])
+            self.line_energia.set_data(self.tiempos.vista(200), self.energias.vista(200))
+            if self.modo_render == 'blit':
+                desplazar_ventana(self.ax_energia, self.tiempos[-1], 200 * self.dt)
+                ampliar_limites_y(self.ax_energia, 0, self.energias.maximo * 1.1)
             else:
-                self.ax_energia.set_xlim(0, max(self.tiempos))
-            
-            if self.energias:
-                self.ax_energia.set_ylim(0, max(self.energias) * 1.1)
+                if len(self.tiempos) > 200:
+                    self.ax_energia.set_xlim(self.tiempos[-200], self.tiempos[-1])
+                else:
+                    self.ax_energia.set_xlim(0, self.tiempos[-1])
+                self.ax_energia.set_ylim(0, self.energias.maximo * 1.1)
         
         # Actualizar información cada cierto tiempo
         if frame % 20 == 0:
+            self.cronometro.vuelta('render')
             self.actualizar_info()
+            self.cronometro.vuelta('analisis')
         
-        return self.line_superficie, self.scatter_particulas, self.line_altura, self.line_energia
+        return self.artistas_animados()
+    
+    def artistas_animados(self):
+        """Artistas que cambian de un frame a otro"""
+        return (self.line_superficie, self.scatter_particulas, self.line_altura,
+                self.line_energia, self.texto_info)
+    
+    def cuadro_animacion(self):
+        """Un cuadro: los pasos de física que toquen y un solo dibujado"""
+        self.actualizar_animacion(self.cuadro)
+        self.cuadro += 1
+        
+        inicio = time.perf_counter()
+        if self.modo_render == 'blit':
+            self.gestor_blit.actualizar()
+        else:
+            self.fig.canvas.draw()
+            self.fig.canvas.flush_events()
+        self.ritmo.registrar_render(time.perf_counter() - inicio)
+        self.cronometro.vuelta('render')
+        self.cronometro.cerrar_cuadro(tiempo=self.tiempo)
     
     def ejecutar(self):
         """Ejecuta la simulación"""
         # Aplicar perturbación inicial
         self.aplicar_perturbacion('gota')
         
-        # Crear animación
-        self.ani = animation.FuncAnimation(
-            self.fig, self.actualizar_animacion,
-            frames=2000, interval=50, blit=False, repeat=True
-        )
-        
         plt.tight_layout()
+        
+        if self.modo_render == 'blit':
+            # El fondo se renueva solo cuando cambian los límites
+            self.gestor_blit = GestorBlit(self.fig.canvas, self.artistas_animados())
+        
+        # Temporizador propio: un dibujado por cuadro, con varios pasos de física
+        self.timer = self.fig.canvas.new_timer(interval=self.INTERVALO_MS)
+        self.timer.add_callback(self.cuadro_animacion)
+        self.timer.start()
+        
+        self.fig.canvas.mpl_connect('close_event', lambda evento: self.cronometro.cerrar())
         plt.show()
 
 # Ejecutar el simulador
@@ -0,0 +1,5 @@
+"""Las pruebas importan los módulos de codigo_fuente como hermanos, igual que los scripts"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, 'codigo_fuente'))
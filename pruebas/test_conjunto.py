@@ -0,0 +1,29 @@
+"""Cada miembro de un conjunto avanza igual que su motor suelto"""
+import numpy as np
+
+from conjunto import ConjuntoOndas, ConjuntoPerfil
+from motores import MotorOndas, MotorPerfil
+
+
+def test_miembro_de_conjunto_ondas_igual_a_motor():
+    conjunto = ConjuntoOndas(k=[10.0, 40.0], damping=[0.0, 0.05], n=20)
+    motor = MotorOndas(n=20)
+    motor.k, motor.damping = 40.0, 0.05
+    motor.velocidades[:, 1] = np.random.default_rng(0).normal(size=motor.n_particulas)
+    conjunto.velocidades[1] = motor.velocidades
+    for _ in range(50):
+        conjunto.paso_simulacion()
+        motor.paso_simulacion()
+    np.testing.assert_array_equal(conjunto.posiciones[1], motor.posiciones)
+
+
+def test_miembro_de_conjunto_perfil_igual_a_motor():
+    conjunto = ConjuntoPerfil(tension_superficial=[5.0, 15.0], gravedad=9.8,
+                              viscosidad=[0.0, 0.05], n_particulas=60)
+    motor = MotorPerfil(n_particulas=60)
+    motor.velocidades[1:-1] = np.random.default_rng(0).normal(size=58)
+    conjunto.velocidades[1] = motor.velocidades
+    for _ in range(50):
+        conjunto.paso_simulacion()
+        motor.paso_simulacion()
+    np.testing.assert_array_equal(conjunto.y_particulas[1], motor.y_particulas)
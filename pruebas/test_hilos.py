@@ -0,0 +1,27 @@
+"""Motor 'hilos': mismos resultados que 'vectorizado', con el paso repartido por bloques"""
+import numpy as np
+
+import motores
+from motores import MotorOndas
+
+
+def test_v2_hilos_igual_a_vectorizado_y_por_bloques(monkeypatch):
+    llamadas = []
+    original = motores.euler_por_bloques
+
+    def contar(*args, **kwargs):
+        llamadas.append(1)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(motores, 'euler_por_bloques', contar)
+    resultados = []
+    for motor in ('vectorizado', 'hilos'):
+        simulador = MotorOndas(n=40, motor=motor, hilos=2)
+        simulador.aplicar_perturbacion('pulso')
+        for _ in range(20):
+            simulador.paso_simulacion()
+        resultados.append((simulador.posiciones.copy(), simulador.velocidades.copy()))
+
+    assert len(llamadas) >= 20
+    np.testing.assert_array_equal(resultados[0][0], resultados[1][0])
+    np.testing.assert_array_equal(resultados[0][1], resultados[1][1])
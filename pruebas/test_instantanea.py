@@ -0,0 +1,62 @@
+"""Retomar desde una instantánea reproduce la corrida sin interrumpir"""
+import numpy as np
+
+import instantanea
+from motores import MotorOndas, MotorPerfil
+
+
+def retomar_a_mitad(crear, pasos, tmp_path):
+    """(motor continuo, motor retomado tras guardar y cargar a mitad), ambos tras `pasos`"""
+    continuo = crear()
+    for _ in range(pasos):
+        continuo.paso_simulacion()
+
+    interrumpido = crear()
+    for _ in range(pasos // 2 + 1):
+        interrumpido.paso_simulacion()
+    retomado = instantanea.cargar(instantanea.guardar(interrumpido, tmp_path / 'estado.npz'))
+    assert retomado.capas_absorbentes == interrumpido.capas_absorbentes
+    for _ in range(pasos - pasos // 2 - 1):
+        retomado.paso_simulacion()
+    return continuo, retomado
+
+
+def test_v2_con_capas_ida_y_vuelta(tmp_path):
+    def crear():
+        motor = MotorOndas(n=30)
+        motor.absorber(('izq', 'arriba'), grosor=5)
+        motor.aplicar_perturbacion('pulso')
+        return motor
+
+    continuo, retomado = retomar_a_mitad(crear, 40, tmp_path)
+    np.testing.assert_array_equal(retomado.posiciones, continuo.posiciones)
+    np.testing.assert_array_equal(retomado.velocidades, continuo.velocidades)
+
+
+def test_v3_con_capas_ida_y_vuelta(tmp_path):
+    def crear():
+        motor = MotorPerfil(n_particulas=80, integrador='leapfrog')
+        motor.absorber(('izq', 'der'), grosor=10)
+        motor.aplicar_perturbacion('gota', amplitud=1.0)
+        return motor
+
+    continuo, retomado = retomar_a_mitad(crear, 60, tmp_path)
+    np.testing.assert_array_equal(retomado.y_particulas, continuo.y_particulas)
+    np.testing.assert_array_equal(retomado.velocidades, continuo.velocidades)
+
+
+def test_v3_adaptativo_con_capas_ida_y_vuelta(tmp_path):
+    def crear():
+        motor = MotorPerfil(n_particulas=80, integrador='leapfrog')
+        motor.absorber(('izq', 'der'), grosor=10)
+        motor.adaptar(tolerancia=1e-3, cada=3)  # 60 // 2 + 1 pasos: a mitad de un ciclo
+        motor.aplicar_perturbacion('gota', amplitud=1.0)
+        return motor
+
+    continuo, retomado = retomar_a_mitad(crear, 60, tmp_path)
+    assert retomado.n_particulas == continuo.n_particulas != 80
+    assert retomado.ajustes_adaptacion == continuo.ajustes_adaptacion
+    np.testing.assert_array_equal(retomado.x_particulas, continuo.x_particulas)
+    np.testing.assert_array_equal(retomado.y_particulas, continuo.y_particulas)
+    np.testing.assert_array_equal(retomado.velocidades, continuo.velocidades)
+    assert retomado.esponja.forma == continuo.esponja.forma
@@ -0,0 +1,29 @@
+"""Malla no uniforme de v3 (ver malla.py)"""
+import numpy as np
+
+from motores import MotorPerfil
+
+
+def test_energia_ponderada_se_conserva_en_malla_no_uniforme():
+    x = np.sort(np.r_[0, np.random.default_rng(0).uniform(0, 20, 118), 20])
+    motor = MotorPerfil(x_particulas=x, espaciado=20 / 119, integrador='leapfrog', dt='estable')
+    motor.viscosidad = 0
+    motor.pared_izq = motor.pared_der = False
+    motor.aplicar_perturbacion('gota', amplitud=1.0)
+    inicial = motor.calcular_energia()
+    for _ in range(500):
+        motor.paso_simulacion()
+    assert abs(motor.calcular_energia() / inicial - 1) < 1e-3
+
+
+def test_adaptar_con_capas_absorbentes_conserva_su_ancho():
+    motor = MotorPerfil(n_particulas=40)
+    motor.absorber(('izq', 'der'), grosor=15)
+    motor.adaptar(1e-3, cada=1)
+    izquierda, derecha = motor.x_particulas[:15].copy(), motor.x_particulas[-15:].copy()
+    for _ in range(20):
+        motor.paso_simulacion()
+    assert motor.n_particulas < 40
+    np.testing.assert_array_equal(motor.x_particulas[:15], izquierda)
+    np.testing.assert_array_equal(motor.x_particulas[-15:], derecha)
+    assert motor.esponja.grosor == 15
@@ -0,0 +1,26 @@
+"""Modo float32: el estado no se promueve a float64"""
+import numpy as np
+import pytest
+
+from motores import MotorOndas, MotorPerfil
+
+
+@pytest.mark.parametrize('integrador', ['euler', 'leapfrog', 'rk4'])
+def test_v3_float32_con_parametro_float64(integrador):
+    motor = MotorPerfil(dtype='float32', integrador=integrador)
+    motor.aplicar_perturbacion('gota')
+    motor.viscosidad = np.float64(0.1)  # Lo que entrega un slider de matplotlib
+    motor.paso_simulacion()
+    assert motor.y_particulas.dtype == np.float32
+    assert motor.velocidades.dtype == np.float32
+
+
+@pytest.mark.parametrize('integrador', ['euler', 'verlet'])
+def test_v2_float32_con_parametro_float64(integrador):
+    motor = MotorOndas(n=20, dtype='float32', integrador=integrador)
+    motor.aplicar_perturbacion('pulso')
+    motor.k = np.float64(30.0)
+    motor.paso_simulacion()
+    assert type(motor.k) is float  # Los temporales del paso ya no se promueven
+    assert motor.posiciones.dtype == np.float32
+    assert motor.velocidades.dtype == np.float32